@@ -5,3 +5,6 @@ class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
     verbose_name = "アカウント管理" 
+
+    def ready(self) -> None:
+        from . import signals  # noqa: F401  シグナルハンドラの登録（キャッシュしたユーザーの無効化）
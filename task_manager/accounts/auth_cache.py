@@ -0,0 +1,80 @@
+# task_manager/accounts/auth_cache.py
+
+"""
+ログイン中のユーザーのキャッシュ（認証の高速経路）。
+
+Django の AuthenticationMiddleware は、リクエストごとにセッションからユーザー id を読み、
+CustomUser を DB から取得する。ここでは取得したユーザーを settings.AUTH_USER_CACHE_TIMEOUT 秒
+キャッシュし、キャッシュにあれば DB を読まずに request.user にする。
+
+キャッシュのキーはユーザー id（同じユーザーの全セッションで共有する）。
+セッションキーごとに持たないのは、プロフィール変更やパスワード変更の際に、
+そのユーザーの全セッションのキャッシュを1回の削除で無効にできるようにするため。
+
+キャッシュから返す場合も、セッションに記録されたハッシュ（パスワード変更で変わる）を照合し、
+一致しなければ Django の通常の取得（get_user）に任せる。
+
+無効化（invalidate_user）は accounts.signals が行う:
+- ユーザーの保存・削除（profile_edit_view、mark_email_verified、set_password 後の保存、管理画面など）
+- ログアウト
+QuerySet.update() のようにシグナルを経由しない変更は、タイムアウトまで反映されない。
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.http import HttpRequest
+from django.utils.crypto import constant_time_compare
+
+KEY_PREFIX = "accounts:user"
+
+
+def _cache() -> BaseCache:
+    return caches[settings.AUTH_USER_CACHE_ALIAS]
+
+
+def user_cache_key(user_id: Any) -> str:
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+def invalidate_user(user_id: Any) -> None:
+    """ユーザーのキャッシュを削除する（次のリクエストで DB から取得し直す）"""
+    if user_id is not None:
+        _cache().delete(user_cache_key(user_id))
+
+
+def _session_is_valid(request: HttpRequest, user: Any) -> bool:
+    """セッションのバックエンドとハッシュが、キャッシュしたユーザーと一致するか"""
+    if request.session.get(auth.BACKEND_SESSION_KEY) not in settings.AUTHENTICATION_BACKENDS:
+        return False
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    return bool(session_hash) and constant_time_compare(session_hash, user.get_session_auth_hash())
+
+
+def get_cached_user(request: HttpRequest) -> Any:
+    """
+    リクエストのユーザーを返す（キャッシュにあれば DB を読まない）。
+
+    未ログインなら AnonymousUser。キャッシュにない場合・セッションのハッシュが一致しない場合は
+    django.contrib.auth.get_user で取得し（不一致ならセッションは破棄される）、ログイン中ならキャッシュする。
+    """
+    user_id = request.session.get(auth.SESSION_KEY)
+    if user_id is None:
+        return AnonymousUser()
+
+    cache = _cache()
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is not None and _session_is_valid(request, user):
+        return user
+
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+    return user
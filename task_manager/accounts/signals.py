@@ -0,0 +1,29 @@
+# task_manager/accounts/signals.py
+
+from typing import Any
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .auth_cache import invalidate_user
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_cached_user(sender: Any, instance: Any, raw: bool = False, **kwargs: Any) -> None:
+    """
+    ユーザーの保存・削除で、キャッシュしたユーザーを無効にする。
+    プロフィール編集・メール認証（mark_email_verified）・パスワード変更もここを通る。
+    """
+    if raw:
+        return
+    invalidate_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def invalidate_cached_user_on_logout(sender: Any, request: Any, user: Any, **kwargs: Any) -> None:
+    """ログアウトで、キャッシュしたユーザーを無効にする"""
+    if user is not None:
+        invalidate_user(user.pk)
@@ -1,3 +1,76 @@
-from django.test import TestCase
+# task_manager/accounts/tests.py
 
-# Create your tests here.
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from accounts.auth_cache import user_cache_key
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(email="cache@example.com", password="pw")
+
+
+@pytest.mark.django_db
+class TestCachedAuthentication:
+    """ログイン中のユーザーのキャッシュ（accounts.auth_cache）のテスト"""
+
+    def test_second_request_skips_session_and_user_queries(self, client, user, django_assert_num_queries):
+        """2回目以降のリクエストはセッション・ユーザーを DB から読まない"""
+        # Arrange
+        client.force_login(user)
+        url = reverse("user_home")
+        client.get(url)
+
+        # Act / Assert: ホーム画面の集計 1 クエリだけ
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        assert response.context["user"] == user
+
+    def test_profile_edit_invalidates_cache(self, client, user):
+        """プロフィール編集の保存で、キャッシュしたユーザーが更新される"""
+        client.force_login(user)
+        client.get(reverse("user_home"))
+
+        client.post(reverse("accounts:profile_edit"), {"email": user.email, "nickname": "新しい名前"})
+
+        assert cache.get(user_cache_key(user.pk)) is None
+        assert client.get(reverse("user_home")).context["user"].nickname == "新しい名前"
+
+    def test_mark_email_verified_invalidates_cache(self, client, user):
+        client.force_login(user)
+        client.get(reverse("user_home"))
+
+        user.mark_email_verified()
+
+        assert cache.get(user_cache_key(user.pk)) is None
+
+    def test_password_change_logs_out_other_sessions(self, client, user):
+        """パスワード変更後は、キャッシュが残っていても古いセッションはログアウト扱いになる"""
+        client.force_login(user)
+        client.get(reverse("user_home"))
+
+        user.set_password("new-password")
+        user.save()
+        response = client.get(reverse("user_home"))
+
+        assert response.status_code == 302  # ログイン画面へ
+
+    def test_logout_invalidates_cache(self, client, user):
+        client.force_login(user)
+        client.get(reverse("user_home"))
+
+        client.get(reverse("accounts:logout"))
+
+        assert cache.get(user_cache_key(user.pk)) is None
+        assert client.get(reverse("user_home")).status_code == 302
+
+    def test_drf_session_authentication_uses_cache(self, client, user, django_assert_num_queries):
+        """DRF の SessionAuthentication もキャッシュしたユーザーを使う"""
+        client.force_login(user)
+        url = reverse("tasks_api:task_stats")
+        client.get(url)
+
+        with django_assert_num_queries(1):
+            assert client.get(url).status_code == 200
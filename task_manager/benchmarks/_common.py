@@ -0,0 +1,244 @@
+# task_manager/benchmarks/_common.py
+
+"""
+ベンチマークスクリプト共通の準備処理。
+
+- Django のセットアップ（DJANGO_SETTINGS_MODULE は task_manager.settings）
+- 一時ファイルの SQLite にテスト用 DB を作り、データを投入して終了時に削除する
+- 大規模データ（多数のユーザー・タスク・深い子タスクのツリー）の投入（seed_dataset）
+- 計測結果の表示
+
+開発用 DB（db.sqlite3）には触れない。
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django() -> None:
+    """manage.py と同じ設定で Django を初期化する"""
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_manager.settings")
+
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def temporary_database() -> Iterator[None]:
+    """一時ファイルにマイグレーション済みの DB を作り、終了時に削除する"""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.settings_dict["TEST"]["NAME"] = str(Path(tmp) / "bench.sqlite3")
+        # テストクライアントが使う ALLOWED_HOSTS="testserver" などを有効にする
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+
+def seed_tasks(n_tasks: int, n_users: int = 10) -> list[int]:
+    """
+    ユーザー n_users 人とタスク n_tasks 件を投入し、ユーザー id の一覧を返す。
+    タスクは bulk_create で作るため、シグナル（階層・カウンタ）は発火しない。
+    """
+    from django.contrib.auth import get_user_model
+    from tasks.models import Task
+
+    User = get_user_model()
+    users = [
+        User.objects.create_user(email=f"bench{i}@example.com", password="bench")
+        for i in range(n_users)
+    ]
+    Task.objects.bulk_create(
+        (
+            Task(
+                title=f"ベンチマーク用タスク {i}",
+                description="説明 " * 20,
+                is_completed=i % 3 == 0,
+                is_archived=i % 7 == 0,
+                user=users[i % n_users],
+            )
+            for i in range(n_tasks)
+        ),
+        batch_size=1000,
+    )
+    return [user.pk for user in users]
+
+
+@dataclass(frozen=True)
+class DatasetShape:
+    """
+    seed_dataset で投入するデータの規模と形。
+
+    タスクは block_size 件ごとのブロックで作る。ブロックの先頭 standalone 件は子を持たない
+    トップレベルタスク、残りは1本のツリー（深さ depth の鎖と、鎖の各段にぶら下がる葉）。
+    ブロックは順番にユーザーへ割り当てる。
+    """
+
+    users: int
+    tasks: int
+    depth: int = 12
+    standalone: int = 64
+
+    @property
+    def tree_size(self) -> int:
+        return self.depth * 3
+
+    @property
+    def block_size(self) -> int:
+        return self.standalone + self.tree_size
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """投入済みデータのうち、ベンチマークで対象にする代表的な行"""
+
+    shape: DatasetShape
+    user_ids: list[int]
+    tree_root_id: int  # 最初のユーザーが持つ深いツリーの根
+    deepest_id: int  # その鎖の末端（最も深い子孫）
+    leaf_ids: list[int]  # 完了にできる未完了の葉タスク（最初のユーザー所有）
+
+
+WORDS = ("会議", "資料", "レビュー", "請求書", "デプロイ", "調査", "設計", "テスト", "報告", "予約")
+
+
+def _task_row(task_id: int, shape: DatasetShape, user_ids: list[int]) -> dict[str, object]:
+    """id から決定的にタスクの内容（親・所有者・状態）を決める"""
+    index = task_id - 1
+    block, offset = divmod(index, shape.block_size)
+    row: dict[str, object] = {
+        "id": task_id,
+        "title": f"{WORDS[task_id % len(WORDS)]} {WORDS[(task_id // 7) % len(WORDS)]} #{task_id}",
+        "description": f"{WORDS[task_id % 3]}の詳細メモ " * (task_id % 8),
+        "user_id": user_ids[block % len(user_ids)],
+        "parent_id": None,
+        "is_completed": False,
+        "is_archived": False,
+    }
+    if offset < shape.standalone:
+        row["is_completed"] = task_id % 3 == 0
+        row["is_archived"] = task_id % 10 == 0
+        return row
+
+    # ツリー内の位置 k: 0..depth-1 が鎖（k の親は k-1）、それ以降は鎖の各段にぶら下がる葉
+    k = offset - shape.standalone
+    tree_root = task_id - k
+    if k == 0:
+        pass
+    elif k < shape.depth:
+        row["parent_id"] = task_id - 1
+    else:
+        row["parent_id"] = tree_root + (k % shape.depth)
+        row["is_completed"] = k % 2 == 0
+    return row
+
+
+def seed_dataset(shape: DatasetShape, batch_size: int = 10000) -> Dataset:
+    """
+    shape に従ってユーザーとタスクを投入し、クロージャテーブルと子タスク数カウンタを作る。
+
+    既に同じ件数が投入済みの DB（pytest --reuse-db で再利用した場合など）では投入を省略する。
+    タスクは bulk_create で作るため、階層・カウンタはシグナルではなく
+    rebuild_task_closure / refresh_subtask_counters でまとめて作る。
+    created_at / updated_at は id 順に1分ずつずらす（新しい id ほど新しい）。
+    """
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from django.db import connection, transaction
+    from django.utils import timezone
+    from tasks.models import Task
+    from tasks.services import rebuild_task_closure, refresh_subtask_counters
+
+    User = get_user_model()
+    emails = [f"bench{i}@example.com" for i in range(shape.users)]
+
+    if User.objects.filter(email__in=emails[:1]).exists() and Task.objects.count() == shape.tasks:
+        user_ids = list(User.objects.filter(email__in=emails).order_by("pk").values_list("pk", flat=True))
+    else:
+        with transaction.atomic():
+            password = make_password("bench")
+            users = User.objects.bulk_create(
+                (User(email=email, password=password) for email in emails), batch_size=batch_size
+            )
+            user_ids = [user.pk for user in users]
+
+            for start in range(1, shape.tasks + 1, batch_size):
+                stop = min(start + batch_size, shape.tasks + 1)
+                Task.objects.bulk_create(
+                    Task(**_task_row(task_id, shape, user_ids)) for task_id in range(start, stop)
+                )
+
+            # auto_now_add / auto_now を上書きして時系列に並べる（SQLite の日時関数を使う）
+            if connection.vendor == "sqlite":
+                newest = timezone.now().replace(tzinfo=None, microsecond=0).isoformat(" ")
+                timestamp = "strftime('%%Y-%%m-%%d %%H:%%M:%%f', %s, '-' || (%s - id) || ' minutes')"
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"UPDATE {Task._meta.db_table} SET created_at = {timestamp}, updated_at = {timestamp}",
+                        [newest, shape.tasks, newest, shape.tasks],
+                    )
+            rebuild_task_closure()
+            refresh_subtask_counters()
+
+    tree_root_id = shape.standalone + 1
+    return Dataset(
+        shape=shape,
+        user_ids=user_ids,
+        tree_root_id=tree_root_id,
+        deepest_id=tree_root_id + shape.depth - 1,
+        leaf_ids=[
+            tree_root_id + k
+            for k in range(shape.depth, shape.tree_size)
+            if k % 2 == 1
+        ],
+    )
+
+
+class Timer:
+    """経過時間（秒）を測るコンテキストマネージャ"""
+
+    elapsed: float = 0.0
+
+    def __enter__(self) -> Timer:
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.elapsed = time.perf_counter() - self._start
+
+
+def summarize(label: str, latencies: list[float], elapsed: float) -> dict[str, float | str]:
+    """レイテンシ（秒）の一覧からスループットとパーセンタイルを計算して表示する"""
+    ordered = sorted(latencies)
+    result: dict[str, float | str] = {
+        "label": label,
+        "requests": len(ordered),
+        "req_per_sec": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+    print(
+        f"{label:<28} {result['req_per_sec']:>8} req/s  "
+        f"p50 {result['p50_ms']:>7} ms  p95 {result['p95_ms']:>7} ms  max {result['max_ms']:>7} ms"
+    )
+    return result
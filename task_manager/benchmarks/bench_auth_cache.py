@@ -0,0 +1,104 @@
+# task_manager/benchmarks/bench_auth_cache.py
+
+"""
+ログイン中のリクエストで、セッション・ユーザーの取得にかかる SQL クエリ数とレイテンシを比較する。
+
+    cd task_manager
+    python benchmarks/bench_auth_cache.py --requests 500
+
+プロファイル:
+- django-default: DB セッション（django.contrib.sessions.backends.db）+ AuthenticationMiddleware
+- cached-session: キャッシュ併用のセッション（cached_db）+ AuthenticationMiddleware
+- cached-session+user: settings.py の設定（cached_db + accounts.middleware.CachedAuthenticationMiddleware）
+
+対象は HTML（login_required のホーム画面）と DRF（SessionAuthentication の /api/tasks/stats/）。
+どちらもビュー本体のクエリは1回（ユーザー別タスク集計）なので、それ以外が認証のコスト。
+プロファイルごとに新しいテストクライアントでログインし、1回目（キャッシュなし）を除いて計測する。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+
+from _common import Timer, setup_django, summarize, temporary_database
+
+PROFILES = ("django-default", "cached-session", "cached-session+user")
+
+DJANGO_AUTH_MIDDLEWARE = "django.contrib.auth.middleware.AuthenticationMiddleware"
+CACHED_AUTH_MIDDLEWARE = "accounts.middleware.CachedAuthenticationMiddleware"
+
+
+def profile_settings(name: str, middleware: list[str]) -> dict[str, object]:
+    """プロファイルの SESSION_ENGINE と MIDDLEWARE"""
+    if name == "cached-session+user":
+        return {"SESSION_ENGINE": "django.contrib.sessions.backends.cached_db", "MIDDLEWARE": middleware}
+    return {
+        "SESSION_ENGINE": (
+            "django.contrib.sessions.backends.db" if name == "django-default"
+            else "django.contrib.sessions.backends.cached_db"
+        ),
+        "MIDDLEWARE": [DJANGO_AUTH_MIDDLEWARE if m == CACHED_AUTH_MIDDLEWARE else m for m in middleware],
+    }
+
+
+def run(url: str, n_requests: int, user: object) -> dict[str, object]:
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    cache.clear()
+    client = Client()
+    client.force_login(user)
+    client.get(url)  # 1回目はキャッシュに載せるだけ
+
+    latencies = []
+    with CaptureQueriesContext(connection) as ctx, Timer() as total:
+        for _ in range(n_requests):
+            with Timer() as t:
+                response = client.get(url)
+            assert response.status_code == 200, response.status_code
+            latencies.append(t.elapsed)
+    return {
+        "latencies": latencies,
+        "elapsed": total.elapsed,
+        "queries_per_request": len(ctx.captured_queries) / n_requests,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="プロファイル・URL ごとのリクエスト数")
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+    parser.add_argument("--json", action="store_true", help="結果を JSON で出力する")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.test import override_settings
+    from django.urls import reverse
+
+    # Server-Timing の計測自体のオーバーヘッドを除く
+    middleware = [m for m in settings.MIDDLEWARE if m != "task_manager.middleware.SQLInstrumentationMiddleware"]
+
+    results = []
+    with temporary_database():
+        user = get_user_model().objects.create_user(email="bench@example.com", password="pw")
+        urls = {"html": reverse("user_home"), "drf": reverse("tasks_api:task_stats")}
+        for name in args.profiles:
+            with override_settings(**profile_settings(name, middleware)):
+                for kind, url in urls.items():
+                    outcome = run(url, args.requests, user)
+                    result = summarize(f"{name} [{kind}]", outcome["latencies"], outcome["elapsed"])
+                    result["queries_per_request"] = outcome["queries_per_request"]
+                    print(f"{'':<28} SQL {outcome['queries_per_request']:.1f} クエリ/リクエスト")
+                    results.append(result)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
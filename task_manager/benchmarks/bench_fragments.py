@@ -0,0 +1,91 @@
+# task_manager/benchmarks/bench_fragments.py
+
+"""
+タスク一覧ページのレンダリング時間を、行の断片キャッシュ（tasks.fragments）の有無で比較する。
+
+    cd task_manager
+    python benchmarks/bench_fragments.py --rows 50 200 1000
+
+- no-cache: 断片キャッシュなし（DummyCache。毎回すべての行をレンダリングする、従来と同じ処理量）
+- cold: キャッシュが空の状態（すべての行をレンダリングして保存する）
+- warm: すべての行がキャッシュにある状態（get_many 1回だけ）
+- one-changed: 1行だけ updated_at が変わった状態（その行だけをレンダリングする）
+
+いずれもページ全体（task_list.html）のレンダリング時間で、DB からの読み出しと HTTP 層は含めない。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from datetime import timedelta
+
+from _common import Timer, seed_tasks, setup_django, temporary_database
+
+PROFILES = ("no-cache", "cold", "warm", "one-changed")
+
+
+def render_page(request, tasks) -> str:
+    from django.template.loader import render_to_string
+    from tasks.fragments import render_fragments
+
+    rows = render_fragments("tasks/task_list_row.html", tasks)
+    return render_to_string("tasks/task_list.html", {"tasks": tasks, "rows": rows}, request=request)
+
+
+def measure(label: str, n: int, func, prepare, repeat: int) -> dict[str, float | str]:
+    best = float("inf")
+    for _ in range(repeat):
+        prepare()
+        with Timer() as t:
+            func()
+        best = min(best, t.elapsed)
+    result = {"label": label, "rows": n, "seconds": round(best, 5), "rows_per_sec": round(n / best)}
+    print(f"{label:<12} rows={n:>6}  {best * 1000:>9.2f} ms  {result['rows_per_sec']:>10,} rows/s")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[50, 200, 1000], help="1ページの行数")
+    parser.add_argument("--repeat", type=int, default=5, help="各計測の繰り返し回数（最速値を採用）")
+    parser.add_argument("--json", action="store_true", help="結果を JSON で出力する")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.models import AnonymousUser
+    from django.core.cache import caches
+    from django.test import RequestFactory, override_settings
+    from tasks.models import Task
+
+    request = RequestFactory().get("/tasks/")
+    request.user = AnonymousUser()
+    dummy_caches = {**settings.CACHES, "dummy": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+    results = []
+    with temporary_database():
+        seed_tasks(max(args.rows))
+        all_tasks = list(Task.objects.order_by("-created_at", "-id")[: max(args.rows)])
+        for n in args.rows:
+            tasks = all_tasks[:n]
+            cache = caches[settings.TASKS_CACHE_ALIAS]
+
+            def touch_one() -> None:
+                render_page(request, tasks)  # 全行をキャッシュに載せてから
+                tasks[n // 2].updated_at += timedelta(microseconds=1)
+
+            with override_settings(CACHES=dummy_caches, TASKS_CACHE_ALIAS="dummy"):
+                results.append(measure("no-cache", n, lambda: render_page(request, tasks), lambda: None, args.repeat))
+            results.append(measure("cold", n, lambda: render_page(request, tasks), cache.clear, args.repeat))
+            results.append(measure(
+                "warm", n, lambda: render_page(request, tasks), lambda: render_page(request, tasks), args.repeat
+            ))
+            results.append(measure("one-changed", n, lambda: render_page(request, tasks), touch_one, args.repeat))
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
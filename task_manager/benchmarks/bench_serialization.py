@@ -0,0 +1,90 @@
+# task_manager/benchmarks/bench_serialization.py
+
+"""
+タスク一覧 API の行シリアライズを、従来のループと tasks.api.serialization で比較する（rows/sec）。
+
+    cd task_manager
+    python benchmarks/bench_serialization.py --sizes 10000 100000
+
+- legacy: Task インスタンスを作り、1行ずつ dict を組み立てて isoformat() し、
+  JsonResponse と同じ DjangoJSONEncoder でエンコードする（user-011 以前の実装）
+- engine[json] / engine[orjson]: values_list() のタプルを列単位で変換し、エンコーダで一括エンコード
+
+いずれも DB からの読み出しを含めた時間で、HTTP 層は含めない。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+
+from _common import Timer, seed_tasks, setup_django, temporary_database
+
+
+def legacy(n: int) -> bytes:
+    from django.core.serializers.json import DjangoJSONEncoder
+    from tasks.models import Task
+
+    data = []
+    for task in Task.objects.order_by("-created_at", "-id")[:n]:
+        data.append({
+            "id": task.id,
+            "title": task.title,
+            "description": task.description,
+            "is_completed": task.is_completed,
+            "is_archived": task.is_archived,
+            "completed_comment": task.completed_comment,
+            "created_at": task.created_at.isoformat(),
+            "updated_at": task.updated_at.isoformat(),
+            "parent_id": task.parent_id,
+            "user_id": task.user_id,
+        })
+    return json.dumps({"tasks": data, "next": None, "prev": None}, cls=DjangoJSONEncoder).encode()
+
+
+def engine(n: int, encoder_name: str) -> bytes:
+    from tasks.api.fields import TASK_FIELDS
+    from tasks.api.serialization import TaskRowSerializer, get_encoder
+    from tasks.models import Task
+
+    serializer = TaskRowSerializer(TASK_FIELDS, encoder=get_encoder(encoder_name))
+    rows = list(serializer.rows(Task.objects.order_by("-created_at", "-id"))[:n])
+    return serializer.page_content(rows, None, None)
+
+
+def measure(label: str, n: int, func, repeat: int) -> dict[str, float | str]:
+    best = float("inf")
+    for _ in range(repeat):
+        with Timer() as t:
+            func()
+        best = min(best, t.elapsed)
+    result = {"label": label, "rows": n, "seconds": round(best, 4), "rows_per_sec": round(n / best)}
+    print(f"{label:<16} rows={n:>7}  {best * 1000:>9.1f} ms  {result['rows_per_sec']:>10,} rows/s")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="シリアライズする行数")
+    parser.add_argument("--repeat", type=int, default=3, help="各計測の繰り返し回数（最速値を採用）")
+    parser.add_argument("--json", action="store_true", help="結果を JSON で出力する")
+    args = parser.parse_args()
+
+    setup_django()
+    from tasks.api.serialization import _ENCODERS
+
+    results = []
+    with temporary_database():
+        seed_tasks(max(args.sizes))
+        for n in args.sizes:
+            results.append(measure("legacy", n, lambda: legacy(n), args.repeat))
+            for name in ("json", "orjson"):
+                if name in _ENCODERS:
+                    results.append(measure(f"engine[{name}]", n, lambda: engine(n, name), args.repeat))
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
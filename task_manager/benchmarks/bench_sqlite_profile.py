@@ -0,0 +1,137 @@
+# task_manager/benchmarks/bench_sqlite_profile.py
+
+"""
+SQLite の接続設定（settings.DATABASES / SQLITE_PRAGMAS / SQLITE_WRITE_LOCK_ENABLED）を変えて、
+マルチスレッドの同時書き込み・読み取りのスループットとエラー数を比較する。
+
+    cd task_manager
+    python benchmarks/bench_sqlite_profile.py --writers 16 --readers 4 --writes 50
+
+プロファイル:
+- django-default: Django の既定（rollback journal・DEFERRED トランザクション・PRAGMA なし）
+- production: settings.py の本番向け設定（SQLITE_PRODUCTION_DATABASE / SQLITE_PRAGMAS。
+  WAL・synchronous=NORMAL・mmap・cache・busy_timeout・IMMEDIATE）
+- production+write-lock: production に加えて、プロセス内の書き込みロックで書き込みを1つずつ実行する
+
+書き込みは1トランザクションで「親タスクの存在確認 → 子タスクの作成（階層・カウンタの更新を含む）」を行う。
+リクエスト処理でよくある「読んでから書く」トランザクションで、DEFERRED では読み取りロックから
+書き込みロックへの昇格が他の書き込みと衝突し、busy_timeout を待たずに "database is locked" になる。
+プロファイルごとに新しい一時ファイルの DB を使う（journal_mode は DB ファイルに残るため）。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from _common import Timer, seed_tasks, setup_django, summarize, temporary_database
+
+PROFILES = ("django-default", "production", "production+write-lock")
+
+
+def apply_profile(name: str, production: dict) -> None:
+    """新しく作られる接続（スレッドごと）に効くよう、接続設定と settings を書き換える"""
+    from django.conf import settings
+    from django.db import connections
+
+    is_production = name != "django-default"
+    connections.settings["default"]["OPTIONS"] = dict(production["OPTIONS"]) if is_production else {}
+    settings.SQLITE_PRODUCTION_PROFILE = is_production
+    settings.SQLITE_PRAGMAS = dict(production["SQLITE_PRAGMAS"])
+    settings.SQLITE_WRITE_LOCK_ENABLED = name == "production+write-lock"
+
+
+def run(writers: int, readers: int, writes: int, parent_ids: list[int]) -> dict[str, object]:
+    from django.db import OperationalError, connections, transaction
+    from task_manager.db import serialized_writes
+    from tasks.models import Task
+
+    errors: list[str] = []
+    reads = 0
+    reads_lock = threading.Lock()
+    done = threading.Event()
+
+    def write(worker: int) -> list[float]:
+        latencies = []
+        try:
+            for i in range(writes):
+                parent_id = parent_ids[(worker * writes + i) % len(parent_ids)]
+                with Timer() as t:
+                    try:
+                        with serialized_writes(), transaction.atomic():
+                            if Task.objects.filter(pk=parent_id).exists():
+                                Task.objects.create(title=f"子タスク {worker}-{i}", parent_id=parent_id)
+                    except OperationalError as e:
+                        errors.append(str(e))
+                        continue
+                latencies.append(t.elapsed)
+        finally:
+            connections.close_all()
+        return latencies
+
+    def read() -> None:
+        nonlocal reads
+        try:
+            while not done.is_set():
+                try:
+                    list(Task.objects.order_by("-created_at", "-id")[:50])
+                except OperationalError as e:
+                    errors.append(str(e))
+                    continue
+                with reads_lock:
+                    reads += 1
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=writers + readers) as pool:
+        reader_futures = [pool.submit(read) for _ in range(readers)]
+        with Timer() as total:
+            latencies = [lat for result in pool.map(write, range(writers)) for lat in result]
+        done.set()
+        for future in reader_futures:
+            future.result()
+    return {"latencies": latencies, "elapsed": total.elapsed, "errors": errors, "reads": reads}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=5000, help="事前に投入するタスク数")
+    parser.add_argument("--writers", type=int, default=16, help="書き込みスレッド数")
+    parser.add_argument("--readers", type=int, default=4, help="書き込みの間、一覧を読み続けるスレッド数")
+    parser.add_argument("--writes", type=int, default=50, help="書き込みスレッドあたりのトランザクション数")
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+    parser.add_argument("--json", action="store_true", help="結果を JSON で出力する")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+
+    production = {
+        "OPTIONS": settings.SQLITE_PRODUCTION_DATABASE["OPTIONS"],
+        "SQLITE_PRAGMAS": settings.SQLITE_PRAGMAS,
+    }
+
+    results = []
+    for name in args.profiles:
+        apply_profile(name, production)
+        with temporary_database():
+            seed_tasks(args.tasks)
+            from tasks.models import Task
+
+            parent_ids = list(Task.objects.order_by("pk").values_list("pk", flat=True)[:200])
+            outcome = run(args.writers, args.readers, args.writes, parent_ids)
+
+        result = summarize(name, outcome["latencies"], outcome["elapsed"])
+        result["errors"] = len(outcome["errors"])
+        result["reads_per_sec"] = round(outcome["reads"] / outcome["elapsed"], 1)
+        print(f"{'':<28} 失敗 {result['errors']:>5} 件  読み取り {result['reads_per_sec']:>8} req/s")
+        results.append(result)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
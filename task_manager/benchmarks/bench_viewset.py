@@ -0,0 +1,98 @@
+# task_manager/benchmarks/bench_viewset.py
+
+"""
+ログイン中のユーザーのタスク一覧を返す API のスループットを比較する（req/s）。
+
+    cd task_manager
+    python benchmarks/bench_viewset.py --page-sizes 50 200 1000 --requests 200
+
+- json-view: 手書きの JsonResponse 系ビュー（/api/tasks/?user_id=N。values_list + TaskRowSerializer）
+- viewset: TaskViewSet（/api/tasks/mine/。values_list + TaskReadSerializer）
+- viewset[model]: 比較用。同じ ViewSet で Task インスタンスを TaskSerializer（ModelSerializer）で変換する
+
+いずれも同じユーザーの同じページをビューの呼び出しから計測し、ミドルウェアと HTTP 層は含めない。
+レスポンスのキャッシュ（tasks.cache）は無効にする。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+
+from _common import Timer, seed_tasks, setup_django, summarize, temporary_database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[50, 200, 1000], help="1ページの件数")
+    parser.add_argument("--requests", type=int, default=200, help="各計測のリクエスト数")
+    parser.add_argument("--tasks", type=int, default=20000, help="投入するタスク数（10ユーザーに分配）")
+    parser.add_argument("--json", action="store_true", help="結果を JSON で出力する")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.test import RequestFactory, override_settings
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from tasks.api.serializers import TaskSerializer
+    from tasks.api.views import task_list_api
+    from tasks.api.viewsets import TaskCursorPagination, TaskViewSet
+    from tasks.models import Task
+
+    class ModelPagination(TaskCursorPagination):
+        key = staticmethod(lambda task: (task.created_at, task.pk))
+
+    class ModelSerializerViewSet(TaskViewSet):
+        pagination_class = ModelPagination
+
+        def get_queryset(self):
+            return Task.objects.filter(user=self.request.user).order_by("-created_at", "-id")
+
+        def get_serializer_class(self):
+            return TaskSerializer
+
+    dummy_caches = {**settings.CACHES, "dummy": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+    viewset = TaskViewSet.as_view({"get": "list"})
+    model_viewset = ModelSerializerViewSet.as_view({"get": "list"})
+
+    results = []
+    with temporary_database(), override_settings(
+        CACHES=dummy_caches, TASKS_CACHE_ALIAS="dummy", TASKS_MAX_PAGE_SIZE=max(args.page_sizes)
+    ):
+        user = get_user_model().objects.get(pk=seed_tasks(args.tasks)[0])
+
+        def json_view(page_size: int):
+            request = RequestFactory().get("/api/tasks/", {"user_id": user.pk, "page_size": page_size})
+            request.user = user
+            return task_list_api(request)
+
+        def drf(view, page_size: int):
+            request = APIRequestFactory().get("/api/tasks/mine/", {"page_size": page_size})
+            force_authenticate(request, user=user)
+            response = view(request)
+            response.render()
+            return response
+
+        for page_size in args.page_sizes:
+            profiles = {
+                "json-view": lambda: json_view(page_size),
+                "viewset": lambda: drf(viewset, page_size),
+                "viewset[model]": lambda: drf(model_viewset, page_size),
+            }
+            for label, func in profiles.items():
+                assert func().status_code == 200
+                latencies = []
+                with Timer() as total:
+                    for _ in range(args.requests):
+                        with Timer() as t:
+                            func()
+                        latencies.append(t.elapsed)
+                results.append(summarize(f"{label} page_size={page_size}", latencies, total.elapsed))
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# task_manager/benchmarks/bench_wsgi_vs_asgi.py
+
+"""
+同期版（WSGI）と async ORM 版（ASGI）のタスク一覧 API を、同じデータ・同じ同時実行数で比較する。
+
+    cd task_manager
+    python benchmarks/bench_wsgi_vs_asgi.py --tasks 20000 --requests 400 --concurrency 32
+
+- WSGI: スレッドプール（--threads、既定は同時実行数と同じ）から同期版 /api/tasks/ を呼ぶ。
+  gunicorn の sync / gthread ワーカーに相当し、1リクエストが DB 応答待ちの間も1スレッドを占有する。
+- ASGI: 1つのイベントループから /api/tasks/async/ を同時実行数分だけ並行に呼ぶ。
+
+どちらも Django のテストクライアント（WSGI / ASGI ハンドラと同じミドルウェア・URL 解決）を使い、
+ネットワークとサーバープロセスの影響は含めない。
+レスポンスキャッシュは各リクエストで異なる page_size を指定して無効化する。
+
+注意: SQLite の async ORM は内部で同期ドライバをスレッドで実行するため、
+DB 待ちが短いローカル SQLite では ASGI の方が速いとは限らない。
+スレッド数を絞った WSGI（--threads 4 など）と比べると、待ち行列の差が見える。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from _common import Timer, seed_tasks, setup_django, summarize, temporary_database
+
+
+def run_wsgi(path: str, n_requests: int, threads: int) -> tuple[list[float], float]:
+    from django.test import Client
+
+    def one(i: int) -> float:
+        with Timer() as t:
+            response = Client().get(path, {"page_size": 50 + i % 50})
+        assert response.status_code == 200, response.status_code
+        return t.elapsed
+
+    with Timer() as total, ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(one, range(n_requests)))
+    return latencies, total.elapsed
+
+
+async def _run_asgi(path: str, n_requests: int, concurrency: int) -> tuple[list[float], float]:
+    from django.test import AsyncClient
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> float:
+        async with semaphore:
+            with Timer() as t:
+                response = await AsyncClient().get(path, {"page_size": 50 + i % 50})
+        assert response.status_code == 200, response.status_code
+        return t.elapsed
+
+    with Timer() as total:
+        latencies = await asyncio.gather(*(one(i) for i in range(n_requests)))
+    return list(latencies), total.elapsed
+
+
+def run_asgi(path: str, n_requests: int, concurrency: int) -> tuple[list[float], float]:
+    return asyncio.run(_run_asgi(path, n_requests, concurrency))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10000, help="投入するタスク数")
+    parser.add_argument("--requests", type=int, default=300, help="各方式のリクエスト数")
+    parser.add_argument("--concurrency", type=int, default=32, help="同時実行数")
+    parser.add_argument("--threads", type=int, default=None, help="WSGI のスレッド数（既定は同時実行数）")
+    parser.add_argument("--json", action="store_true", help="結果を JSON で出力する")
+    args = parser.parse_args()
+
+    setup_django()
+    with temporary_database():
+        seed_tasks(args.tasks)
+        threads = args.threads or args.concurrency
+        print(f"tasks={args.tasks} requests={args.requests} concurrency={args.concurrency} threads={threads}")
+
+        # ウォームアップ（接続確立・URL 解決・テンプレート等の初回コスト）
+        run_wsgi("/api/tasks/", 5, 1)
+        run_asgi("/api/tasks/async/", 5, 1)
+
+        results = [
+            summarize("WSGI  /api/tasks/", *run_wsgi("/api/tasks/", args.requests, threads)),
+            summarize("ASGI  /api/tasks/async/", *run_asgi("/api/tasks/async/", args.requests, args.concurrency)),
+        ]
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# task_manager/benchmarks/conftest.py
+
+"""
+pytest で実行するベンチマークスイートの設定。
+
+通常の pytest 実行では収集しない。環境変数 TASKS_BENCHMARK=1 のときだけ動く。
+
+    cd task_manager
+    TASKS_BENCHMARK=1 pytest -c ../pytest.ini --rootdir . benchmarks/ --reuse-db
+
+環境変数:
+    TASKS_BENCHMARK_USERS   投入するユーザー数（既定 2000）
+    TASKS_BENCHMARK_TASKS   投入するタスク数（既定 1000000）
+    TASKS_BENCHMARK_DEPTH   子タスクの鎖の深さ（既定 12）
+    TASKS_BENCHMARK_ROUNDS  各計測の繰り返し回数（既定 5）
+    TASKS_BENCHMARK_OUTPUT  結果 JSON の出力先（既定 benchmarks/results.json）
+
+テスト DB は一時ファイルではなく benchmarks/.benchmark.sqlite3 に作る。
+--reuse-db を付けると投入済みのデータを次回以降も使い回す（規模を変えた場合は作り直される）。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import sqlite3
+import statistics
+from pathlib import Path
+from typing import Any, Callable
+
+import django
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from _common import DatasetShape, Timer, seed_dataset
+
+ENABLED = os.environ.get("TASKS_BENCHMARK") == "1"
+
+# TASKS_BENCHMARK=1 でない場合はベンチマークを収集しない
+collect_ignore_glob = [] if ENABLED else ["test_*.py"]
+
+HERE = Path(__file__).resolve().parent
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+SHAPE = DatasetShape(
+    users=_env_int("TASKS_BENCHMARK_USERS", 2000),
+    tasks=_env_int("TASKS_BENCHMARK_TASKS", 1_000_000),
+    depth=_env_int("TASKS_BENCHMARK_DEPTH", 12),
+)
+ROUNDS = _env_int("TASKS_BENCHMARK_ROUNDS", 5)
+OUTPUT = Path(os.environ.get("TASKS_BENCHMARK_OUTPUT", HERE / "results.json"))
+
+
+@pytest.fixture(scope="session")
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    """大量データをメモリに載せないよう、テスト DB をファイルに作る"""
+    from django.conf import settings
+
+    settings.DATABASES["default"].setdefault("TEST", {})
+    settings.DATABASES["default"]["TEST"]["NAME"] = str(HERE / ".benchmark.sqlite3")
+
+
+@pytest.fixture(scope="session")
+def dataset(django_db_setup, django_db_blocker):
+    """セッションで1回だけデータを投入する（コミットされ、各テストのロールバック対象外）"""
+    with django_db_blocker.unblock():
+        return seed_dataset(SHAPE)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _disable_response_cache():
+    """
+    レスポンスキャッシュを無効にして、毎回ビュー本体を実行した時間を測る。
+    （キャッシュヒット時の時間はほぼ一定で、回帰検出の役に立たないため）
+    """
+    dummy = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+    with override_settings(CACHES=dummy):
+        yield
+
+
+class Recorder:
+    """計測結果を集め、セッション終了時に JSON で書き出す"""
+
+    def __init__(self) -> None:
+        self.results: list[dict[str, Any]] = []
+
+    def add(self, result: dict[str, Any]) -> None:
+        self.results.append(result)
+
+    def write(self, path: Path) -> None:
+        payload = {
+            "meta": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "dataset": {
+                    "users": SHAPE.users,
+                    "tasks": SHAPE.tasks,
+                    "depth": SHAPE.depth,
+                },
+                "rounds": ROUNDS,
+            },
+            "results": self.results,
+        }
+        path.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+@pytest.fixture(scope="session")
+def recorder():
+    recorder = Recorder()
+    yield recorder
+    if recorder.results:
+        recorder.write(OUTPUT)
+
+
+@pytest.fixture
+def bench(recorder, request) -> Callable[..., Any]:
+    """
+    計測用の関数を返す。
+
+        bench(func, max_queries=3)            # 名前はテスト名
+        bench(func, max_queries=3, rounds=1)  # 重い処理は回数を減らす
+
+    func を rounds 回実行して時間を記録し、1回あたりの SQL クエリ数が
+    max_queries を超えたらテストを失敗させる（クエリ数の予算）。
+    計測前に1回実行して、初回だけのコスト（FTS 可否の確認・テンプレートの読み込み等）を除く。
+    func に round 番号を渡す場合は takes_round=True を指定する（この場合は事前実行しない）。
+    """
+
+    def run(
+        func: Callable[..., Any],
+        *,
+        max_queries: int,
+        rounds: int = ROUNDS,
+        takes_round: bool = False,
+        name: str | None = None,
+    ) -> Any:
+        timings: list[float] = []
+        queries = 0
+        result = None if takes_round else func()
+        for i in range(rounds):
+            with CaptureQueriesContext(connection) as ctx, Timer() as t:
+                result = func(i) if takes_round else func()
+            timings.append(t.elapsed)
+            queries = max(queries, len(ctx.captured_queries))
+
+        entry = {
+            "name": name or request.node.name,
+            "rounds": rounds,
+            "min_ms": round(min(timings) * 1000, 3),
+            "median_ms": round(statistics.median(timings) * 1000, 3),
+            "max_ms": round(max(timings) * 1000, 3),
+            "queries": queries,
+            "query_budget": max_queries,
+        }
+        recorder.add(entry)
+        assert queries <= max_queries, (
+            f"{entry['name']}: SQL クエリ数 {queries} が予算 {max_queries} を超えました\n"
+            + "\n".join(q["sql"] for q in ctx.captured_queries)
+        )
+        return result
+
+    return run
@@ -0,0 +1,194 @@
+# task_manager/benchmarks/test_benchmarks.py
+
+"""
+大規模データでのサービス・ビュー・API の計測と SQL クエリ数の予算。
+
+実行方法と設定は conftest.py を参照。
+クエリ数の予算にはログイン中のリクエストのセッション・ユーザー取得（2クエリ）を含む。
+"""
+
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from tasks.models import Task
+from tasks.services import complete_task, get_filtered_tasks
+
+pytestmark = pytest.mark.django_db
+
+# ログイン中のリクエストで発生するセッション・ユーザー取得
+AUTH = 2
+
+
+@pytest.fixture
+def user(dataset):
+    return get_user_model().objects.get(pk=dataset.user_ids[0])
+
+
+@pytest.fixture
+def logged_in(client, user):
+    client.force_login(user)
+    return client
+
+
+# ------------------------------------
+# サービス
+# ------------------------------------
+class TestServices:
+    """tasks.services の計測"""
+
+    def test_get_filtered_tasks_first_page(self, bench, dataset):
+        bench(lambda: list(get_filtered_tasks(None, None, None)[:50]), max_queries=1)
+
+    def test_get_filtered_tasks_keyword(self, bench, dataset):
+        bench(lambda: list(get_filtered_tasks("レビュー", False, False)[:50]), max_queries=1)
+
+    def test_get_filtered_tasks_keyword_ranked(self, bench, dataset):
+        bench(lambda: list(get_filtered_tasks("請求書", None, None, ranked=True)[:50]), max_queries=1)
+
+    def test_complete_task(self, bench, dataset):
+        # 完了にできる未完了の葉タスクを毎回替えて完了にする（テスト終了時にロールバック）
+        leaves = list(Task.objects.filter(pk__in=dataset.leaf_ids, is_completed=False))
+        rounds = min(len(leaves), 5)
+        # 子タスク判定 1 + 更新 1 + 親のカウンタ更新 1 + ユーザー別集計 1 + SAVEPOINT / RELEASE 2
+        bench(lambda i: complete_task(leaves[i]), max_queries=6, rounds=rounds, takes_round=True)
+
+
+# ------------------------------------
+# HTML ビュー
+# ------------------------------------
+class TestViews:
+    """tasks.views の計測（ログイン済み）"""
+
+    def test_task_list(self, bench, logged_in):
+        url = reverse("tasks:task_list")
+        # 検証子の集計 1 + ページ 1
+        bench(lambda: logged_in.get(url), max_queries=AUTH + 2)
+
+    def test_task_list_search(self, bench, logged_in):
+        url = reverse("tasks:task_list")
+        bench(lambda: logged_in.get(url, {"q": "デプロイ", "is_completed": "false"}), max_queries=AUTH + 2)
+
+    def test_task_list_next_page(self, bench, logged_in):
+        url = reverse("tasks:task_list")
+        first = logged_in.get(url).context["next_query"]
+        bench(lambda: logged_in.get(f"{url}?{first}"), max_queries=AUTH + 2)
+
+    def test_task_detail_deep_tree(self, bench, logged_in, dataset):
+        url = reverse("tasks:task_detail", args=[dataset.tree_root_id])
+        # 検証子の集計 1 + タスク 1 + ツリー 1
+        bench(lambda: logged_in.get(url), max_queries=AUTH + 3)
+
+    def test_task_detail_deepest(self, bench, logged_in, dataset):
+        url = reverse("tasks:task_detail", args=[dataset.deepest_id])
+        # 上記 + 親タスク名 1
+        bench(lambda: logged_in.get(url), max_queries=AUTH + 4)
+
+
+# ------------------------------------
+# JSON API（/api/tasks/）
+# ------------------------------------
+class TestApi:
+    """/api/tasks/ 以下の全エンドポイントの計測"""
+
+    # 同期版は検証子の集計 1 + ページ 1、非同期版は検証子なしでページ 1
+    @pytest.mark.parametrize("name, args, params, budget", [
+        ("tasks_api:task_list", [], {}, 2),
+        ("tasks_api:task_list", [], {"is_completed": "false", "is_archived": "false"}, 2),
+        ("tasks_api:task_list", [], {"fields": "id,title", "page_size": 200}, 2),
+        ("tasks_api:task_list_by_completion", ["true"], {}, 2),
+        ("tasks_api:task_list_async", [], {}, 1),
+        ("tasks_api:task_list_by_completion_async", ["false"], {}, 1),
+    ], ids=["list", "list-filtered", "list-fields", "by-completion", "async-list", "async-by-completion"])
+    def test_list_endpoints(self, bench, client, name, args, params, budget):
+        url = reverse(name, args=args)
+        bench(lambda: client.get(url, params), max_queries=budget, name=f"api[{name}]{params}")
+
+    def test_list_by_user(self, bench, client, dataset):
+        url = reverse("tasks_api:task_list_by_user", args=[dataset.user_ids[0]])
+        bench(lambda: client.get(url), max_queries=2)
+
+    def test_list_by_user_async(self, bench, client, dataset):
+        url = reverse("tasks_api:task_list_by_user_async", args=[dataset.user_ids[0]])
+        bench(lambda: client.get(url), max_queries=1)
+
+    def test_list_next_page(self, bench, client):
+        url = reverse("tasks_api:task_list")
+        cursor = client.get(url).json()["next"]
+        bench(lambda: client.get(url, {"cursor": cursor}), max_queries=2)
+
+    def test_viewset_list(self, bench, logged_in):
+        # TaskViewSet はページ 1 のみ（検証子・レスポンスのキャッシュなし）
+        url = reverse("tasks_api:task-list")
+        bench(lambda: logged_in.get(url, {"page_size": 200}), max_queries=AUTH + 1)
+
+    def test_simple(self, bench, client):
+        # 簡素版はページ分割しないため全件を返す（重いので1回だけ）
+        url = reverse("tasks_api:task_list_simple")
+        bench(lambda: client.get(url, {"is_completed": "true"}), max_queries=1, rounds=1)
+
+    def test_simple_async(self, bench, client):
+        url = reverse("tasks_api:task_list_simple_async")
+        bench(lambda: client.get(url, {"is_completed": "true"}), max_queries=1, rounds=1)
+
+    @pytest.mark.parametrize("output_format", ["json", "ndjson"])
+    def test_export(self, bench, client, output_format):
+        url = reverse("tasks_api:task_export")
+
+        def export():
+            response = client.get(url, {"format": output_format, "is_archived": "false"})
+            return b"".join(response.streaming_content)
+
+        # チャンク単位のサーバーサイドカーソルだが、SQL としては1クエリ
+        bench(export, max_queries=1, rounds=1)
+
+    def test_preview(self, bench, client):
+        bench(lambda: client.get(reverse("tasks_api:task_preview")), max_queries=0)
+
+    def test_bulk_create(self, bench, logged_in, dataset):
+        url = reverse("tasks_api:task_bulk_create")
+        payload = {"tasks": [{"title": f"一括 {i}", "parent": dataset.tree_root_id} for i in range(100)]}
+
+        def create():
+            response = logged_in.post(url, payload, content_type="application/json")
+            assert response.status_code == 201, response.content
+            return response
+
+        # 件数によらず一定（親の所有者確認・INSERT・階層・カウンタ・ユーザー別集計・SAVEPOINT）
+        bench(create, max_queries=AUTH + 9)
+
+    def test_bulk_update(self, bench, logged_in, dataset):
+        url = reverse("tasks_api:task_bulk_update")
+        ids = list(Task.objects.filter(user_id=dataset.user_ids[0], parent__isnull=True).values_list("pk", flat=True)[:100])
+        payload = {"tasks": [{"id": pk, "title": f"更新 {pk}"} for pk in ids]}
+
+        def update():
+            response = logged_in.post(url, payload, content_type="application/json")
+            assert response.status_code == 200, response.content
+            return response
+
+        # 件数によらず一定（対象の取得・UPDATE・カウンタ・ユーザー別集計・SAVEPOINT）
+        bench(update, max_queries=AUTH + 4)
+
+    def test_bulk_complete(self, bench, logged_in, dataset):
+        url = reverse("tasks_api:task_bulk_complete")
+        payload = {"ids": dataset.leaf_ids}
+
+        def complete():
+            response = logged_in.post(url, payload, content_type="application/json")
+            assert response.status_code == 200, response.content
+            return response
+
+        bench(complete, max_queries=AUTH + 6)
+
+    def test_bulk_archive(self, bench, logged_in, dataset):
+        url = reverse("tasks_api:task_bulk_archive")
+        ids = list(Task.objects.filter(user_id=dataset.user_ids[0]).values_list("pk", flat=True)[:200])
+
+        def archive():
+            response = logged_in.post(url, json.dumps({"ids": ids}), content_type="application/json")
+            assert response.status_code == 200, response.content
+            return response
+
+        bench(archive, max_queries=AUTH + 4)
@@ -0,0 +1,15 @@
+# task_manager/conftest.py
+
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    テストごとにキャッシュ（一覧のレスポンス・セッション・ユーザー）を空にする。
+    DB はテストごとにロールバックされるが、ローカルメモリキャッシュは残るため。
+    """
+    cache.clear()
+    yield
+    cache.clear()
@@ -0,0 +1,82 @@
+# task_manager/db.py
+
+"""
+SQLite を本番で使うための DB 接続設定。
+
+configure_sqlite:
+    connection_created シグナルで、新しい接続ごとに settings.SQLITE_PRAGMAS を実行する
+    （WAL・synchronous=NORMAL・mmap・キャッシュ・busy_timeout など）。
+    本番向け設定（settings.SQLITE_PRODUCTION_PROFILE）が有効な場合だけ実行する。
+    CONN_MAX_AGE で接続を使い回すため、PRAGMA の実行は接続の作成時の1回だけで済む。
+
+serialized_writes:
+    同じプロセス内の書き込みを1つずつ順番に実行する（settings.SQLITE_WRITE_LOCK_ENABLED）。
+    SQLite の書き込みロックはデータベースに1つしかないため、同時に書き込もうとしたスレッドは
+    busy_timeout の間ロックの取得を再試行（スリープしながらポーリング）する。
+    プロセス内のロックで先に並ばせると、解放と同時に次の書き込みが始まり、待ち時間が揃う。
+    ロックはプロセス単位のため、複数プロセスの間は busy_timeout で待つ。
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+logger = logging.getLogger("task_manager.db")
+
+_PRAGMA_NAME = re.compile(r"^[a-z_]+$")
+
+# 同じスレッドの入れ子（serialized_writes の中で再度呼ぶ）を許すため RLock
+_write_lock = threading.RLock()
+
+
+def configure_sqlite(sender: Any, connection: BaseDatabaseWrapper, **kwargs: Any) -> None:
+    """
+    connection_created シグナルのハンドラ。SQLite の接続に settings.SQLITE_PRAGMAS を適用する。
+    settings.SQLITE_PRODUCTION_PROFILE が False（既定）の場合は何もしない。
+
+    Raises:
+        ImproperlyConfigured: PRAGMA 名が英小文字とアンダースコア以外を含む場合
+    """
+    if connection.vendor != "sqlite" or not getattr(settings, "SQLITE_PRODUCTION_PROFILE", False):
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            if not _PRAGMA_NAME.match(name):
+                raise ImproperlyConfigured(f"SQLITE_PRAGMAS に不正な PRAGMA 名があります: {name!r}")
+            # PRAGMA の値はパラメータにできないため、名前と同様に設定値をそのまま埋め込む
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+@contextmanager
+def serialized_writes() -> Iterator[None]:
+    """
+    ブロック内の処理を、同じプロセスの他の serialized_writes と同時に実行しない。
+
+    settings.SQLITE_WRITE_LOCK_ENABLED が False の場合は何もしない。
+    SQLITE_WRITE_LOCK_TIMEOUT 秒待ってもロックを取れない場合は、警告を出して
+    ロックなしで続行する（以降は SQLite の busy_timeout で待つ）。
+    """
+    if not getattr(settings, "SQLITE_WRITE_LOCK_ENABLED", False):
+        yield
+        return
+
+    acquired = _write_lock.acquire(timeout=float(settings.SQLITE_WRITE_LOCK_TIMEOUT))
+    if not acquired:
+        logger.warning(
+            "書き込みロックを %s 秒待っても取得できなかったため、ロックなしで続行します",
+            settings.SQLITE_WRITE_LOCK_TIMEOUT,
+        )
+    try:
+        yield
+    finally:
+        if acquired:
+            _write_lock.release()
@@ -0,0 +1,204 @@
+# task_manager/task_manager/middleware.py
+
+"""
+プロジェクト共通のミドルウェア。
+
+SQLInstrumentationMiddleware:
+    リクエストごとに SQL の件数と DB 時間を集計し、Server-Timing ヘッダで返す。
+    同じ SQL（パラメータ違い）が何度も実行されたリクエストは N+1 の疑いとしてログに出す。
+    DEBUG を有効にしなくても本番で使える。同期（WSGI）・非同期（ASGI）の両方に対応する。
+
+SerializedWriteMiddleware:
+    書き込みを伴うリクエスト（GET / HEAD / OPTIONS / TRACE 以外）を、プロセス内の書き込みロック
+    （task_manager.db.serialized_writes）で1つずつ処理する。
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Callable
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse
+
+from .db import serialized_writes
+
+logger = logging.getLogger("task_manager.sql")
+
+# IN (%s, %s, ...) のようにパラメータ数だけが違う SQL を同じテンプレートとみなす
+_PLACEHOLDER_LIST = re.compile(r"\(\s*%s(?:\s*,\s*%s)+\s*\)")
+
+
+def sql_template(sql: str) -> str:
+    """SQL からパラメータ数の違いを取り除いたテンプレート"""
+    return _PLACEHOLDER_LIST.sub("(%s, ...)", sql)
+
+
+class QueryStats:
+    """
+    リクエストごとの SQL の件数・時間の集計（execute_wrapper の形式。_record_query から呼ばれる）。
+
+    SQL 文字列は実行時にはそのまま数え、テンプレート化は集計時（repeated）にだけ行う。
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0  # 秒
+        self._statements: Counter[str] = Counter()
+
+    def __call__(self, execute: Callable[..., Any], sql: str, params: Any, many: bool, context: dict[str, Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self._statements[sql] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """threshold 回以上実行された SQL テンプレートと回数（多い順）"""
+        templates: Counter[str] = Counter()
+        for sql, n in self._statements.items():
+            templates[sql_template(sql)] += n
+        return [(sql, n) for sql, n in templates.most_common() if n >= threshold]
+
+
+# 計測中のリクエストの QueryStats。コンテキスト変数のため、async ビューから sync_to_async で
+# 別スレッド（別の DB 接続）に渡った SQL も、そのリクエストの集計に入る
+_current_stats: ContextVar[QueryStats | None] = ContextVar("sql_instrumentation_stats", default=None)
+
+
+def _record_query(execute: Callable[..., Any], sql: str, params: Any, many: bool, context: dict[str, Any]) -> Any:
+    """全接続に登録する execute_wrapper。計測中のリクエストがあればその QueryStats に渡す"""
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+def _add_recorder(sender: Any, connection: BaseDatabaseWrapper, **kwargs: Any) -> None:
+    """connection_created シグナルのハンドラ。接続ごとに1回だけ _record_query を登録する"""
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def install_query_recorder() -> None:
+    """
+    これから作られる接続と、このスレッドで作成済みの接続に _record_query を登録する。
+
+    DB 接続はスレッドごとのため、リクエストの間だけ connection.execute_wrapper を使う方法では、
+    ASGI で sync_to_async のスレッドが実行する SQL を数えられない。
+    """
+    connection_created.connect(_add_recorder, dispatch_uid="task_manager.middleware.record_query")
+    for connection in connections.all(initialized_only=True):
+        _add_recorder(None, connection)
+
+
+class SQLInstrumentationMiddleware:
+    """
+    リクエストごとの SQL 計測。
+
+    settings:
+        SQL_INSTRUMENTATION_ENABLED (bool): False の場合はミドルウェア自体を読み込まない
+            （MiddlewareNotUsed。無効時のオーバーヘッドはゼロ）
+        SQL_INSTRUMENTATION_REPEAT_THRESHOLD (int): 同じ SQL テンプレートがこの回数以上
+            実行されたら N+1 の疑いとして WARNING を出す
+
+    レスポンスヘッダの例:
+        Server-Timing: db;dur=3.214;desc="5 queries", total;dur=12.870
+
+    ストリーミングレスポンスは、ビューが返るまでに実行された SQL だけを数える。
+    MIDDLEWARE の先頭に置くと、セッション・認証のクエリも含めて計測できる。
+
+    同期・非同期の両方に対応する。ASGI では後続のミドルウェアとビューを非同期のまま呼ぶため、
+    async ビューや SSE の接続ごとにスレッドを占有しない（async ORM のクエリも数える）。
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        if not getattr(settings, "SQL_INSTRUMENTATION_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = int(getattr(settings, "SQL_INSTRUMENTATION_REPEAT_THRESHOLD", 10))
+        install_query_recorder()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if self.async_mode:
+            return self.__acall__(request)
+        stats = QueryStats()
+        start = time.perf_counter()
+        token = _current_stats.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        return self._finish(request, response, stats, start)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        stats = QueryStats()
+        start = time.perf_counter()
+        token = _current_stats.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        return self._finish(request, response, stats, start)
+
+    def _finish(self, request: HttpRequest, response: HttpResponse, stats: QueryStats, start: float) -> HttpResponse:
+        """Server-Timing ヘッダを付け、N+1 の疑いをログに出す"""
+        total = time.perf_counter() - start
+
+        response["Server-Timing"] = (
+            f'db;dur={stats.duration * 1000:.3f};desc="{stats.count} queries", '
+            f"total;dur={total * 1000:.3f}"
+        )
+        for sql, n in stats.repeated(self.threshold):
+            logger.warning(
+                "N+1 の疑い: %s %s で同じ SQL が %d 回実行されました（全 %d 件, DB %.1f ms）: %s",
+                request.method,
+                request.path,
+                n,
+                stats.count,
+                stats.duration * 1000,
+                sql,
+            )
+        return response
+
+
+class SerializedWriteMiddleware:
+    """
+    書き込みを伴うリクエストを順番に処理し、SQLite の "database is locked" を避ける。
+
+    settings:
+        SQLITE_WRITE_LOCK_ENABLED (bool): False の場合はミドルウェア自体を読み込まない
+        SQLITE_WRITE_LOCK_TIMEOUT (float): ロックを待つ上限（秒）。超えたらロックなしで処理する
+
+    読み取りのリクエストは待たせない（WAL では読み取りが書き込みを妨げないため）。
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        if not getattr(settings, "SQLITE_WRITE_LOCK_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if request.method in self.SAFE_METHODS:
+            return self.get_response(request)
+        with serialized_writes():
+            return self.get_response(request)
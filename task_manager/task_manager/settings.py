@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -49,11 +50,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # 先頭に置き、セッション・認証を含むリクエスト全体の SQL を計測する
+    "task_manager.middleware.SQLInstrumentationMiddleware",
+    # 書き込みを伴うリクエストをプロセス内で順番に処理する（SQLITE_WRITE_LOCK_ENABLED）
+    "task_manager.middleware.SerializedWriteMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # AuthenticationMiddleware の置き換え。ログイン中のユーザーをキャッシュし、毎リクエストの取得を省く
+    "accounts.middleware.CachedAuthenticationMiddleware",
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 
@@ -90,6 +96,41 @@ DATABASES = {
     }
 }
 
+# SQLite の本番向け設定（task_manager.db）。環境変数 TASK_MANAGER_SQLITE_PROFILE=production で有効にする。
+# 開発・テストでは Django の既定のまま（synchronous=NORMAL は電源断で直近のコミットを失う可能性があるため）
+SQLITE_PRODUCTION_PROFILE = os.environ.get("TASK_MANAGER_SQLITE_PROFILE") == "production"
+
+# 本番向け設定で DATABASES['default'] に上書きする値
+SQLITE_PRODUCTION_DATABASE = {
+    # 接続をリクエストをまたいで使い回す（秒）。接続ごとの PRAGMA の実行も省ける
+    'CONN_MAX_AGE': 600,
+    'CONN_HEALTH_CHECKS': True,
+    'OPTIONS': {
+        # 書き込むトランザクションは開始時に書き込みロックを取る（BEGIN IMMEDIATE）。
+        # 読み取りから書き込みへの昇格時に busy_timeout を待たずに
+        # "database is locked" になるのを防ぐ
+        'transaction_mode': 'IMMEDIATE',
+    },
+}
+
+# 本番向け設定で SQLite の接続ごとに実行する PRAGMA（task_manager.db.configure_sqlite）
+SQLITE_PRAGMAS = {
+    "journal_mode": "wal",     # 読み取りと書き込みが互いを待たない
+    "synchronous": "normal",   # WAL では NORMAL でも DB は壊れない（電源断で直近のコミットを失う可能性のみ）
+    "mmap_size": 268435456,    # 256 MiB までメモリマップで読む
+    "cache_size": -65536,      # ページキャッシュ 64 MiB（負の値は KiB 単位）
+    "busy_timeout": 5000,      # 他の接続の書き込みロックを待つ上限（ミリ秒）
+    "temp_store": "memory",    # 一時テーブル・ソート用の領域をメモリに置く
+}
+
+if SQLITE_PRODUCTION_PROFILE:
+    DATABASES['default'].update(SQLITE_PRODUCTION_DATABASE)
+
+# プロセス内の書き込みロック（task_manager.db.serialized_writes / SerializedWriteMiddleware）。
+# マルチスレッドのサーバー（gthread・runserver 等）で書き込みが集中する場合に有効にする
+SQLITE_WRITE_LOCK_ENABLED = False
+SQLITE_WRITE_LOCK_TIMEOUT = 10  # 秒。超えたらロックなしで続行し、busy_timeout で待つ
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -166,4 +207,79 @@ REST_FRAMEWORK = {
 
 #LOGIN_REDIRECT_URL = '/tasks/'
 LOGIN_REDIRECT_URL = '/home/'
-LOGOUT_REDIRECT_URL = '/accounts/login/'
\ No newline at end of file
+LOGOUT_REDIRECT_URL = '/accounts/login/'
+
+# タスク一覧のページネーション（キーセット方式）
+TASKS_PAGE_SIZE = 50        # 既定の1ページ件数
+TASKS_MAX_PAGE_SIZE = 200   # page_size パラメータの上限
+
+# ストリーミングエクスポートで1回に DB から読み出す件数
+TASKS_EXPORT_CHUNK_SIZE = 2000
+
+# SQL 計測ミドルウェア（task_manager.middleware.SQLInstrumentationMiddleware）
+# Server-Timing ヘッダで SQL 件数・DB 時間を返し、同じ SQL が閾値回以上実行されたら警告ログを出す。
+# False にするとミドルウェアごと読み込まれない
+SQL_INSTRUMENTATION_ENABLED = True
+SQL_INSTRUMENTATION_REPEAT_THRESHOLD = 10
+
+# タスク API の JSON エンコーダ（tasks.api.serialization）
+# "auto" は orjson がインストールされていれば orjson、なければ標準の json
+TASKS_JSON_ENCODER = "auto"
+
+# 差分同期 API（/api/tasks/changes/）の削除記録の保持日数。
+# これより古いカーソルは 410 を返し、クライアントに全件の取り直しを求める
+TASKS_TOMBSTONE_RETENTION_DAYS = 30
+
+# archive_tasks コマンドが保管テーブル（ArchivedTask）に移す、アーカイブ後の経過日数と
+# 1トランザクションで移すツリー（トップレベルタスク）の数
+TASKS_ARCHIVE_AFTER_DAYS = 90
+TASKS_ARCHIVE_BATCH_SIZE = 500
+
+# タスク変更フィード（/api/tasks/events/ の Server-Sent Events。tasks.events）
+TASKS_EVENTS_HEARTBEAT = 15        # 秒。イベントがない間もこの間隔でコメント行を送り、接続を保つ
+TASKS_EVENTS_QUEUE_SIZE = 100      # 接続ごとの未送信イベントの上限。超えたらクライアントに取り直しを求める
+TASKS_EVENTS_REPLAY_SIZE = 1000    # 再接続（Last-Event-ID）時に再送できる直近のイベント数
+
+# 一括操作 API（/api/tasks/bulk/）で1リクエストに含められる件数の上限
+TASKS_BULK_MAX_ITEMS = 500
+
+# import_tasks コマンドで1回の bulk_create（1トランザクション）に含める件数
+TASKS_IMPORT_BATCH_SIZE = 1000
+
+# 管理画面のタスク一覧（tasks.pagination.EstimatedCountPaginator）で、絞り込み時に数える件数の上限
+TASKS_ADMIN_COUNT_LIMIT = 10000
+
+# バックグラウンドジョブ（tasks.jobs / run_workers コマンド / /api/tasks/jobs/）
+TASKS_JOBS_WORKERS = 2             # run_workers のワーカー（スレッド）数の既定値
+TASKS_JOBS_POLL_INTERVAL = 1.0     # 秒。キューが空のときにワーカーが待つ間隔
+TASKS_JOBS_STALE_AFTER = 600       # 秒。進捗がこの時間ないまま running のジョブは、ワーカーの起動時に queued に戻す
+TASKS_JOBS_HEARTBEAT_INTERVAL = 60  # 秒。実行中のジョブの updated_at を進める間隔（TASKS_JOBS_STALE_AFTER より十分短くする）
+TASKS_JOBS_EXPORT_DIR = BASE_DIR / "job_exports"   # 書き出しジョブの出力先
+
+
+# キャッシュ
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# 既定はプロセス内のローカルメモリ。Redis / Memcached 等に差し替えても tasks.cache はそのまま動く
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "task-manager",
+        # 一覧の行の断片キャッシュ（tasks.fragments）は1行1エントリのため、既定の 300 では足りない
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
+
+# セッションはキャッシュに置き、DB にも書く（キャッシュにあればセッションテーブルを読まない）
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
+# ログイン中のユーザーのキャッシュ（accounts.auth_cache）。
+# ユーザーの保存・ログアウトで無効にする。QuerySet.update() 等による変更はタイムアウトまで反映されない
+AUTH_USER_CACHE_ALIAS = "default"
+AUTH_USER_CACHE_TIMEOUT = 60  # 秒
+
+# タスク一覧レスポンスのキャッシュ（tasks.cache）
+TASKS_CACHE_ALIAS = "default"
+TASKS_CACHE_TIMEOUT = 300  # 秒
+# 一覧の行の断片キャッシュ（tasks.fragments）。キーに updated_at を含むため、長めでも古い行は表示されない
+TASKS_FRAGMENT_CACHE_TIMEOUT = 3600  # 秒
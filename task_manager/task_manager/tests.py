@@ -0,0 +1,200 @@
+# task_manager/task_manager/tests.py
+
+import logging
+import threading
+import time
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+from tasks.models import Task
+
+from task_manager import db
+from task_manager.middleware import SerializedWriteMiddleware, SQLInstrumentationMiddleware, sql_template
+
+
+@pytest.mark.django_db
+class TestSQLInstrumentationMiddleware:
+    """SQL 計測ミドルウェアのテスト"""
+
+    def test_server_timing_header(self, client):
+        # Arrange
+        Task.objects.create(title="Task")
+
+        # Act
+        response = client.get(reverse("tasks_api:task_list"))
+
+        # Assert: 検証子の集計とページの2クエリが数えられる
+        assert 'desc="2 queries"' in response["Server-Timing"]
+        assert "total;dur=" in response["Server-Timing"]
+
+    def test_repeated_sql_is_logged(self, caplog, settings):
+        # Arrange: 1行ずつ SELECT するビュー（N+1）
+        settings.SQL_INSTRUMENTATION_REPEAT_THRESHOLD = 3
+        tasks = [Task.objects.create(title=f"Task {i}") for i in range(4)]
+
+        def view(request):
+            for task in tasks:
+                Task.objects.get(pk=task.pk)
+            return HttpResponse("ok")
+
+        middleware = SQLInstrumentationMiddleware(view)
+
+        # Act
+        with caplog.at_level(logging.WARNING, logger="task_manager.sql"):
+            response = middleware(RequestFactory().get("/n-plus-one/"))
+
+        # Assert
+        assert 'desc="4 queries"' in response["Server-Timing"]
+        assert len(caplog.records) == 1
+        assert "/n-plus-one/" in caplog.records[0].getMessage()
+        assert "4 回" in caplog.records[0].getMessage()
+
+    def test_async_chain_stays_async(self):
+        """async のビューの前では非同期のまま動き、async ORM のクエリも数える"""
+        # Arrange
+        async def view(request):
+            await Task.objects.acount()
+            await Task.objects.filter(is_completed=True).aexists()
+            return HttpResponse("ok")
+
+        middleware = SQLInstrumentationMiddleware(view)
+
+        # Act
+        response = async_to_sync(middleware)(RequestFactory().get("/async/"))
+
+        # Assert
+        assert iscoroutinefunction(middleware)
+        assert 'desc="2 queries"' in response["Server-Timing"]
+
+    def test_asgi_middleware_chain_is_async(self):
+        """ASGI でミドルウェアの連鎖全体が同期に変換されない（async ビュー・SSE がスレッドを占有しない）"""
+        assert iscoroutinefunction(ASGIHandler()._middleware_chain)
+
+    def test_disabled_middleware_is_not_used(self, settings):
+        settings.SQL_INSTRUMENTATION_ENABLED = False
+        with pytest.raises(MiddlewareNotUsed):
+            SQLInstrumentationMiddleware(lambda request: HttpResponse())
+
+
+def test_sql_template_collapses_in_lists():
+    assert sql_template("SELECT 1 WHERE id IN (%s, %s, %s)") == sql_template("SELECT 1 WHERE id IN (%s, %s)")
+
+
+def _pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+class TestConfigureSqlite:
+    """接続ごとの PRAGMA 適用のテスト"""
+
+    def test_pragmas_are_skipped_by_default(self, settings):
+        """本番向け設定が無効（既定）なら PRAGMA を実行しない"""
+        # Arrange
+        original = _pragma("busy_timeout")
+        settings.SQLITE_PRAGMAS = {"busy_timeout": 1234}
+
+        # Act
+        db.configure_sqlite(sender=None, connection=connection)
+
+        # Assert
+        assert not settings.SQLITE_PRODUCTION_PROFILE
+        assert _pragma("busy_timeout") == original
+
+    def test_custom_pragmas(self, settings):
+        # Arrange
+        original = _pragma("busy_timeout")
+        settings.SQLITE_PRODUCTION_PROFILE = True
+        settings.SQLITE_PRAGMAS = {"busy_timeout": 1234}
+
+        # Act
+        db.configure_sqlite(sender=None, connection=connection)
+
+        # Assert
+        try:
+            assert _pragma("busy_timeout") == 1234
+        finally:
+            connection.cursor().execute(f"PRAGMA busy_timeout = {original}")
+
+    def test_invalid_pragma_name(self, settings):
+        settings.SQLITE_PRODUCTION_PROFILE = True
+        settings.SQLITE_PRAGMAS = {"busy_timeout; DROP TABLE x": 1}
+        with pytest.raises(ImproperlyConfigured):
+            db.configure_sqlite(sender=None, connection=connection)
+
+
+class TestSerializedWrites:
+    """プロセス内の書き込みロックのテスト"""
+
+    def test_writers_run_one_at_a_time(self, settings):
+        # Arrange
+        settings.SQLITE_WRITE_LOCK_ENABLED = True
+        active, overlaps = [], []
+
+        def write():
+            with db.serialized_writes():
+                active.append(1)
+                overlaps.append(len(active))
+                time.sleep(0.01)
+                active.pop()
+
+        # Act
+        threads = [threading.Thread(target=write) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert: 同時に2つ以上のブロックが実行されていない
+        assert overlaps == [1] * 8
+
+    def test_disabled_lock_does_not_block(self, settings):
+        # Arrange: 別スレッドがロックを握っていても、無効なら待たない
+        settings.SQLITE_WRITE_LOCK_ENABLED = False
+        db._write_lock.acquire()
+        try:
+            # Act / Assert
+            with db.serialized_writes():
+                pass
+        finally:
+            db._write_lock.release()
+
+    def test_middleware_locks_only_unsafe_methods(self, settings):
+        # Arrange: ビューの実行中に、別スレッドからロックを取れるかを調べる
+        settings.SQLITE_WRITE_LOCK_ENABLED = True
+
+        def try_lock(result):
+            acquired = db._write_lock.acquire(blocking=False)
+            if acquired:
+                db._write_lock.release()
+            result.append(acquired)
+
+        def view(request):
+            result = []
+            thread = threading.Thread(target=try_lock, args=(result,))
+            thread.start()
+            thread.join()
+            return HttpResponse("free" if result[0] else "locked")
+
+        middleware = SerializedWriteMiddleware(view)
+
+        # Act
+        post = middleware(RequestFactory().post("/"))
+        get = middleware(RequestFactory().get("/"))
+
+        # Assert
+        assert post.content == b"locked"
+        assert get.content == b"free"
+
+    def test_disabled_middleware_is_not_used(self, settings):
+        settings.SQLITE_WRITE_LOCK_ENABLED = False
+        with pytest.raises(MiddlewareNotUsed):
+            SerializedWriteMiddleware(lambda request: HttpResponse())
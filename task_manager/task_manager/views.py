@@ -3,6 +3,9 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 
+from tasks.stats import get_user_stats
+
 @login_required
 def user_home(request):
-    return render(request, "home.html")
+    # 件数はユーザー別タスク集計（UserTaskStats）から読む（Task は集計しない）
+    return render(request, "home.html", {"stats": get_user_stats(request.user)})
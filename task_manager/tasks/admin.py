@@ -1,7 +1,10 @@
 # tasks/admin.py
 
-from django.contrib import admin
-from .models import Task
+from django.contrib import admin, messages
+from .models import Job, Task
+from .pagination import EstimatedCountPaginator
+from .search import can_use_fts, filter_by_fts
+from .services import archive_tasks, complete_tasks, reopen_tasks
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
@@ -12,6 +15,7 @@ class TaskAdmin(admin.ModelAdmin):
         'title'        : タスク名
         'status'       : 完了状態（カスタムメソッド）
         'is_archived'  : アーカイブ状態
+        'user'         : 所有者（list_select_related で一覧と同じクエリで取得）
         'created_at'   : 作成日時
         'updated_at'   : 最終更新日
 
@@ -21,16 +25,30 @@ class TaskAdmin(admin.ModelAdmin):
 
     - search_fields: 検索対象フィールド
         'title'            : タスク名
+        'description'      : タスク詳細
         'completed_comment' : 完了時コメント
+        3文字以上のキーワードは FTS5 索引（tasks.search）で検索し、使えない場合だけ部分一致にする
 
     - ordering: 一覧のデフォルトソート順
         '-created_at' : 最新作成順
+
+    大量のタスクでも一覧が重くならないよう、以下を設定している。
+
+    - paginator: 件数は推定値・上限付きの COUNT（EstimatedCountPaginator）
+    - show_full_result_count: 絞り込み時の「全 N 件」のための全件 COUNT を行わない
+    - raw_id_fields: 親タスク・所有者を全件の選択肢ではなく id 入力にする
+    - actions: 完了・未完了に戻す・アーカイブを、それぞれ UPDATE 1文で行う
     """
 
-    list_display = ('title', 'status', 'is_archived', 'created_at', 'updated_at')
+    list_display = ('title', 'status', 'is_archived', 'user', 'created_at', 'updated_at')
     list_filter = ('is_completed', 'is_archived')
-    search_fields = ('title', 'completed_comment')
+    list_select_related = ('user',)
+    search_fields = ('title', 'description', 'completed_comment')
     ordering = ('-created_at',)
+    raw_id_fields = ('parent', 'user')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('complete_selected', 'reopen_selected', 'archive_selected')
 
     def status(self, obj):
         """
@@ -42,3 +60,51 @@ class TaskAdmin(admin.ModelAdmin):
 
     # 管理画面上の列名として表示
     status.short_description = "状態"
+
+    def get_search_results(self, request, queryset, search_term):
+        """キーワードが FTS5 索引で検索できる場合は、部分一致（LIKE による全件走査）の代わりに使う"""
+        search_term = search_term.strip()
+        if search_term and can_use_fts(search_term):
+            return filter_by_fts(queryset, search_term), False
+        return super().get_search_results(request, queryset, search_term)
+
+    @admin.action(description="選択したタスクを完了にする")
+    def complete_selected(self, request, queryset):
+        """未完了の子タスクが残るタスクは除いて完了にする"""
+        updated, blocked = complete_tasks(queryset)
+        self.message_user(request, f"{updated} 件のタスクを完了にしました。", messages.SUCCESS)
+        if blocked:
+            self.message_user(
+                request,
+                f"子タスクが未完了のため、{len(blocked)} 件は完了にできませんでした: {blocked}",
+                messages.WARNING,
+            )
+
+    @admin.action(description="選択したタスクを未完了に戻す")
+    def reopen_selected(self, request, queryset):
+        updated = reopen_tasks(queryset)
+        self.message_user(request, f"{updated} 件のタスクを未完了に戻しました。", messages.SUCCESS)
+
+    @admin.action(description="選択したタスクをアーカイブする")
+    def archive_selected(self, request, queryset):
+        updated = archive_tasks(queryset)
+        self.message_user(request, f"{updated} 件のタスクをアーカイブしました。", messages.SUCCESS)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """
+    バックグラウンドジョブ（tasks.jobs）の状態を確認するための設定。
+    ジョブの登録・実行は API と run_workers コマンドで行うため、管理画面からは編集しない。
+    """
+
+    list_display = ('id', 'kind', 'status', 'user', 'progress', 'total', 'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
+    list_select_related = ('user',)
+    ordering = ('-id',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
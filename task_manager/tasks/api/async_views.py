@@ -0,0 +1,157 @@
+# task_manager/tasks/api/async_views.py
+
+"""
+タスク一覧 JSON API の非同期版（/api/tasks/async/...）と、変更フィード（/api/tasks/events/）。
+
+ASGI（task_manager/asgi.py）で動かすと、DB の応答を待つ間もワーカースレッドを占有しない。
+返す JSON は同期版（views.py）と同じ。
+レスポンスキャッシュと条件付き GET は同期版のデコレータが同期 ORM 前提のため、
+同期版のエンドポイントでのみ提供する。
+
+変更フィードは接続を開いたまま待ち続けるため、ASGI でのみ使う
+（WSGI ではワーカースレッドを接続の数だけ占有する）。
+"""
+
+import asyncio
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from ..events import Subscription, TaskEvent, hub
+from ..pagination import CursorPage, InvalidCursor, apaginate_merged
+from .fields import InvalidFields, SIMPLE_FIELDS, parse_fields, row_to_json
+from .serialization import get_encoder
+from .views import _row_serializer, _simple_tasks, _task_sources, _tasks_by_completion, _tasks_by_user
+
+
+async def _apaginate(request, sources, key) -> CursorPage | JsonResponse:
+    """views._paginate の非同期版"""
+    try:
+        return await apaginate_merged(
+            sources,
+            cursor=request.GET.get("cursor") or None,
+            page_size=request.GET.get("page_size"),
+            key=key,
+        )
+    except InvalidCursor as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except ValueError:
+        return JsonResponse({"error": "page_size は整数で指定してください。"}, status=400)
+
+
+async def _task_page_response(request, *sources) -> HttpResponse:
+    """views._task_page_response の非同期版"""
+    serializer = _row_serializer(request)
+    if isinstance(serializer, JsonResponse):
+        return serializer
+
+    rows = [serializer.rows(tasks) for tasks in sources]
+    page = await _apaginate(request, rows, key=serializer.position)
+    if isinstance(page, JsonResponse):
+        return page
+
+    content = serializer.page_content(page.items, page.next_cursor, page.prev_cursor)
+    return HttpResponse(content, content_type="application/json")
+
+
+@require_GET
+async def task_list_api_simple_async(request):
+    """task_list_api_simple の非同期版"""
+    try:
+        fields = parse_fields(request.GET.get("fields"), default=SIMPLE_FIELDS)
+    except InvalidFields as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    tasks = _simple_tasks(request.GET)
+    data = [row_to_json(row, fields) async for row in tasks.values(*fields).aiterator()]
+    return JsonResponse(data, safe=False)
+
+
+@require_GET
+async def task_list_api_async(request):
+    """task_list_api の非同期版（is_completed / is_archived / user_id / cursor / page_size / fields）"""
+    return await _task_page_response(request, *_task_sources(request.GET))
+
+
+@require_GET
+async def task_list_by_completion_async(request, is_completed: str):
+    """task_list_by_completion の非同期版"""
+    return await _task_page_response(request, _tasks_by_completion(request, is_completed))
+
+
+@require_GET
+async def task_list_by_user_async(request, user_id: int):
+    """task_list_by_user の非同期版"""
+    return await _task_page_response(request, _tasks_by_user(request, user_id))
+
+
+# ------------------------------------
+# 変更フィード（Server-Sent Events）
+# ------------------------------------
+def _sse(event_type: str, data: bytes, event_id: int | None = None) -> bytes:
+    """SSE の1イベント分のバイト列"""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event_type}\n".encode() + b"data: " + data + b"\n\n"
+
+
+async def _event_stream(subscription: Subscription, replay: list[TaskEvent] | None):
+    """
+    購読したイベントを SSE として送り続ける。
+
+    replay が None（取りこぼしを補えない）またはキューがあふれた場合は reset イベントを送って終了し、
+    クライアントに一覧の取り直しを求める。クライアントの切断でジェネレータが閉じられると購読を解除する。
+    """
+    encoder = get_encoder()
+    heartbeat = settings.TASKS_EVENTS_HEARTBEAT
+    try:
+        # 切断時の再接続までの待ち時間（ミリ秒）
+        yield b"retry: 3000\n\n"
+        if replay is None:
+            yield _sse("reset", b"{}")
+            return
+
+        last_id = 0
+        for event in replay:
+            yield _sse(event.type, encoder.dumps(event.data), event.id)
+            last_id = event.id
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+            except TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            if subscription.overflowed:
+                yield _sse("reset", b"{}")
+                return
+            if event.id <= last_id:
+                continue  # 再送分と重複したイベント
+            yield _sse(event.type, encoder.dumps(event.data), event.id)
+    finally:
+        hub.unsubscribe(subscription)
+
+
+@require_GET
+async def task_events_stream(request):
+    """
+    ログイン中のユーザーのタスクの変更を Server-Sent Events で送り続ける。
+
+    イベント: created / updated / completed / deleted（data は {"id": ..., 変更後の値}）、
+    subtree（サブツリーの一括操作。一覧を取り直す）、reset（取りこぼしがあったため一覧を取り直す）
+    再接続時はブラウザが送る Last-Event-ID 以降のイベントを再送する。
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({"error": "ログインが必要です。"}, status=403)
+
+    # 再送分を読む前に購読を始め、その間のイベントを取りこぼさない（重複は id で除く）
+    subscription = hub.subscribe(user.pk)
+    last_event_id = request.headers.get("Last-Event-ID", "")
+    replay = hub.replay(user.pk, int(last_event_id)) if last_event_id.isdigit() else []
+
+    response = StreamingHttpResponse(_event_stream(subscription, replay), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # リバースプロキシ（nginx）にバッファさせず、イベントをすぐに送る
+    response["X-Accel-Buffering"] = "no"
+    return response
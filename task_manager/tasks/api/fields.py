@@ -0,0 +1,75 @@
+# task_manager/tasks/api/fields.py
+
+"""
+タスク API の ?fields= （返す列の指定）。
+
+例: /api/tasks/?fields=id,title
+
+指定された列だけを SELECT するため、
+description のような大きな列は要求されない限り DB から読み出さない。
+列名は TASK_FIELDS の許可リストで検証する。
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+# API で返せる列（許可リスト）。指定がない場合もこの順で返す
+TASK_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "is_completed",
+    "is_archived",
+    "completed_comment",
+    "created_at",
+    "updated_at",
+    "parent_id",
+    "user_id",
+)
+
+# 簡素版 API（/api/tasks/simple/）の既定の列
+SIMPLE_FIELDS = ("title", "created_at", "is_completed")
+
+# JSON にする際に ISO 8601 文字列へ変換する列
+DATETIME_FIELDS = frozenset({"created_at", "updated_at"})
+
+# キーセットページネーションのカーソル作成に必要な列（並び順の列, 主キー）
+CURSOR_FIELDS = ("created_at", "id")
+
+
+class InvalidFields(ValueError):
+    """許可リストにない列が指定された場合の例外"""
+
+
+def parse_fields(value: str | None, default: Iterable[str] = TASK_FIELDS) -> tuple[str, ...]:
+    """
+    ?fields= の値を検証し、返す列のタプルにする。
+
+    - 未指定・空の場合は default
+    - 重複は除き、指定された順序を保つ
+
+    Raises:
+        InvalidFields: 許可リストにない列が含まれる場合
+    """
+    if not value:
+        return tuple(default)
+
+    fields = tuple(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in fields if name not in TASK_FIELDS]
+    if unknown or not fields:
+        raise InvalidFields(
+            f"fields に指定できない列です: {', '.join(unknown)}（指定可能: {', '.join(TASK_FIELDS)}）"
+        )
+    return fields
+
+
+def row_to_json(row: dict[str, Any], fields: Iterable[str]) -> dict[str, Any]:
+    """values() の行から要求された列だけを取り出し、日時を文字列に変換する"""
+    data = {}
+    for name in fields:
+        value = row[name]
+        if name in DATETIME_FIELDS and value is not None:
+            value = value.isoformat()
+        data[name] = value
+    return data
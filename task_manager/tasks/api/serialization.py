@@ -0,0 +1,173 @@
+# task_manager/tasks/api/serialization.py
+
+"""
+タスク API の行シリアライズ。
+
+一覧・エクスポート API は、モデルインスタンスを作らずに values_list() のタプルを読み、
+日時の列は列単位でまとめて文字列に変換し、エンコーダで一度に JSON のバイト列にする。
+
+エンコーダは差し替え可能で、settings.TASKS_JSON_ENCODER で選ぶ。
+- "auto"（既定）: orjson がインストールされていれば orjson、なければ標準の json
+- "orjson" / "json": 明示的に指定
+- register_encoder() で独自のエンコーダを追加できる
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Protocol, Sequence
+
+from django.conf import settings
+from django.db.models import QuerySet
+
+from .fields import CURSOR_FIELDS, DATETIME_FIELDS
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson は任意の依存
+    orjson = None
+
+
+class Encoder(Protocol):
+    """JSON エンコーダのインターフェース"""
+
+    # True の場合は datetime をそのまま渡せる（ISO 8601 への変換をエンコーダに任せる）
+    native_datetime: bool
+
+    def dumps(self, obj: Any) -> bytes: ...
+
+
+class StdlibEncoder:
+    """標準ライブラリの json によるエンコーダ（区切りは最小、UTF-8 のまま出力）"""
+
+    native_datetime = False
+
+    def __init__(self) -> None:
+        self._encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encode(obj).encode()
+
+
+class OrjsonEncoder:
+    """orjson によるエンコーダ。datetime は isoformat() と同じ形式で出力される"""
+
+    native_datetime = True
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+
+_ENCODERS: dict[str, Callable[[], Encoder]] = {"json": StdlibEncoder}
+if orjson is not None:
+    _ENCODERS["orjson"] = OrjsonEncoder
+
+
+def register_encoder(name: str, factory: Callable[[], Encoder]) -> None:
+    """settings.TASKS_JSON_ENCODER で選べるエンコーダを追加する"""
+    _ENCODERS[name] = factory
+
+
+def get_encoder(name: str | None = None) -> Encoder:
+    """
+    名前（省略時は settings.TASKS_JSON_ENCODER）に対応するエンコーダを返す。
+
+    Raises:
+        ValueError: 未登録の名前が指定された場合
+    """
+    name = name or settings.TASKS_JSON_ENCODER
+    if name == "auto":
+        name = "orjson" if "orjson" in _ENCODERS else "json"
+    try:
+        return _ENCODERS[name]()
+    except KeyError:
+        raise ValueError(f"未登録の JSON エンコーダです: {name}") from None
+
+
+def _isoformat(value: datetime | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+class TaskRowSerializer:
+    """
+    values_list() の行を JSON に変換する。
+
+    Args:
+        fields (Sequence[str]): 出力する列（fields.TASK_FIELDS の中から）
+        encoder (Encoder | None): エンコーダ。省略時は get_encoder()
+        cursor_fields (tuple[str, str]): カーソルに使う (並び順の列, 主キー)。
+            一覧は (created_at, id)、差分同期は (updated_at, id)
+
+    行タプルの並びは columns（出力列 + カーソル用の列）に従う。
+    """
+
+    def __init__(
+        self,
+        fields: Sequence[str],
+        encoder: Encoder | None = None,
+        cursor_fields: tuple[str, str] = CURSOR_FIELDS,
+    ) -> None:
+        self.fields = tuple(fields)
+        self.encoder = encoder or get_encoder()
+        # 出力列のあとに、ページ分割に必要で出力しない列を並べる
+        self.columns = tuple(dict.fromkeys((*self.fields, *cursor_fields)))
+        self._width = len(self.fields)
+        self._datetime_positions = (
+            ()
+            if self.encoder.native_datetime
+            else tuple(i for i, name in enumerate(self.fields) if name in DATETIME_FIELDS)
+        )
+        self._order_index = self.columns.index(cursor_fields[0])
+        self._id_index = self.columns.index(cursor_fields[1])
+
+    def rows(self, queryset: QuerySet[Any]) -> QuerySet[Any]:
+        """queryset から columns の順にタプルで読み出すクエリセット"""
+        return queryset.values_list(*self.columns)
+
+    def position(self, row: Sequence[Any]) -> tuple[datetime, int]:
+        """キーセットページネーション用の (並び順の列の値, id)"""
+        return row[self._order_index], row[self._id_index]
+
+    def to_dicts(self, rows: Sequence[Sequence[Any]]) -> list[dict[str, Any]]:
+        """
+        行タプルを出力用の dict のリストにする。
+        日時の列は行ごとではなく、列単位で map() してまとめて変換する。
+        """
+        if not rows:
+            return []
+        width = self._width
+        columns = [list(column) for column in islice(zip(*rows), width)]
+        for i in self._datetime_positions:
+            columns[i] = list(map(_isoformat, columns[i]))
+        fields = self.fields
+        return [dict(zip(fields, values)) for values in zip(*columns)]
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.encoder.dumps(obj)
+
+    def page_content(self, rows: Sequence[Sequence[Any]], next_cursor: str | None, prev_cursor: str | None) -> bytes:
+        """一覧 API のレスポンス本文 {"tasks": [...], "next": ..., "prev": ...}"""
+        return self.dumps({"tasks": self.to_dicts(rows), "next": next_cursor, "prev": prev_cursor})
+
+    def stream_json(self, rows: Iterable[Sequence[Any]], chunk_size: int) -> Iterator[bytes]:
+        """{"tasks": [...]} を chunk_size 行ずつエンコードして出力する"""
+        yield b'{"tasks":['
+        separator = b""
+        for chunk in _chunks(rows, chunk_size):
+            # リストとしてエンコードし、両端の [] を外して前のチャンクとつなぐ
+            yield separator + self.dumps(self.to_dicts(chunk))[1:-1]
+            separator = b","
+        yield b"]}"
+
+    def stream_ndjson(self, rows: Iterable[Sequence[Any]], chunk_size: int) -> Iterator[bytes]:
+        """1行1タスクの NDJSON を chunk_size 行ずつ出力する"""
+        for chunk in _chunks(rows, chunk_size):
+            yield b"".join(self.dumps(row) + b"\n" for row in self.to_dicts(chunk))
+
+
+def _chunks(rows: Iterable[Sequence[Any]], size: int) -> Iterator[list[Sequence[Any]]]:
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -1,7 +1,9 @@
 # task_manager/tasks/serializers.py
 
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
-from ..models import Task
+from ..models import Job, Task
 
 class TaskSerializer(serializers.ModelSerializer):
     class Meta:
@@ -16,3 +18,113 @@ class TaskSerializer(serializers.ModelSerializer):
             "created_at",
         ]
         read_only_fields = ["id", "created_at"]
+
+
+class TaskReadListSerializer(serializers.ListSerializer):
+    """TaskReadSerializer(many=True)。ページの行をまとめて TaskReadSerializer.to_dicts で変換する"""
+
+    def to_representation(self, data):
+        return self.child.to_dicts(data)
+
+
+class TaskReadSerializer(serializers.BaseSerializer):
+    """
+    TaskViewSet の一覧・詳細用の読み出し専用シリアライザ。TaskSerializer と同じ JSON を返す。
+
+    Task インスタンスではなく values_list(*columns) の行タプルを受け取り、
+    ModelSerializer のように行ごとにフィールドを辿らず、列の並びのまま dict にする。
+    """
+
+    # TaskSerializer.Meta.fields と同じ並び。parent は id だけを読む
+    columns = ("id", "title", "description", "is_completed", "is_archived", "parent_id", "created_at")
+
+    class Meta:
+        list_serializer_class = TaskReadListSerializer
+
+    @staticmethod
+    def position(row):
+        """キーセットページネーション用の (created_at, id)"""
+        return row[6], row[0]
+
+    def to_dicts(self, rows):
+        # 日時は TaskSerializer と同じ DateTimeField で変換する。
+        # 既定では1値ごとに現在のタイムゾーンを調べるため、ページごとに1回だけ解決して渡す
+        created_at = serializers.DateTimeField(
+            default_timezone=timezone.get_current_timezone() if settings.USE_TZ else None
+        ).to_representation
+        return [
+            {
+                "id": row[0],
+                "title": row[1],
+                "description": row[2],
+                "is_completed": row[3],
+                "is_archived": row[4],
+                "parent": row[5],
+                "created_at": created_at(row[6]),
+            }
+            for row in rows
+        ]
+
+    def to_representation(self, row):
+        return self.to_dicts([row])[0]
+
+
+class TaskBulkCreateSerializer(TaskSerializer):
+    """
+    一括作成用。
+    parent は id のまま受け取り、存在・所有者のチェックはサービス層でまとめて1クエリで行う
+    （PrimaryKeyRelatedField だと1件ごとに親タスクを検索してしまうため）。
+    """
+
+    parent = serializers.IntegerField(required=False, allow_null=True)
+
+
+class TaskBulkUpdateSerializer(TaskBulkCreateSerializer):
+    """一括更新用。partial=True で使い、id 以外は指定したフィールドだけを更新する"""
+
+    id = serializers.IntegerField()
+
+    def validate(self, attrs):
+        if "id" not in attrs:
+            raise serializers.ValidationError({"id": "更新するタスクの id を指定してください。"})
+        return attrs
+
+
+class TaskIdsSerializer(serializers.Serializer):
+    """一括完了・一括アーカイブ用の id 一覧"""
+
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """ジョブの状態・進捗（/api/tasks/jobs/）"""
+
+    # トレースバック全体は返さず、例外のメッセージ（最終行）だけを返す
+    error = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "kind",
+            "params",
+            "status",
+            "progress",
+            "total",
+            "result",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+
+    def get_error(self, job):
+        lines = job.error.strip().splitlines()
+        return lines[-1] if lines else None
+
+
+class JobCreateSerializer(serializers.Serializer):
+    """ジョブの登録（params の検証は tasks.jobs の各ジョブの種類で行う）"""
+
+    kind = serializers.CharField()
+    params = serializers.DictField(required=False, default=dict)
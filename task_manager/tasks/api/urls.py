@@ -1,10 +1,16 @@
 # task_manager/tasks/urls.py
 
 from django.urls import path
-from . import views
+from rest_framework.routers import SimpleRouter
+from . import async_views, views
+from .viewsets import TaskViewSet
 
 app_name = "tasks_api"
 
+# ログイン中のユーザーのタスク (例: GET /api/tasks/mine/?q=請求書, PATCH /api/tasks/mine/1/)
+router = SimpleRouter()
+router.register("mine", TaskViewSet, basename="task")
+
 urlpatterns = [
     # --- API ---
 
@@ -16,6 +22,35 @@ urlpatterns = [
     path("completed/<str:is_completed>/", views.task_list_by_completion, name="task_list_by_completion"),
     # URLパラメータでユーザー別取得 (例: /api/tasks/user/1/)
     path("user/<int:user_id>/", views.task_list_by_user, name="task_list_by_user"),
+    # 差分同期 (例: /api/tasks/changes/?since=<cursor>&user_id=1)
+    path("changes/", views.task_changes_api, name="task_changes"),
+    # ログイン中のユーザーのタスク件数 (例: /api/tasks/stats/)
+    path("stats/", views.task_stats_api, name="task_stats"),
+    # 全件ストリーミングエクスポート (例: /api/tasks/export/?format=ndjson)
+    path("export/", views.task_export_api, name="task_export"),
+    # 一括操作 (例: POST /api/tasks/bulk/complete/ {"ids": [1, 2]})
+    path("bulk/create/", views.task_bulk_create_api, name="task_bulk_create"),
+    path("bulk/update/", views.task_bulk_update_api, name="task_bulk_update"),
+    path("bulk/complete/", views.task_bulk_complete_api, name="task_bulk_complete"),
+    path("bulk/archive/", views.task_bulk_archive_api, name="task_bulk_archive"),
+    # サブツリー操作 (例: POST /api/tasks/1/subtree/complete/)
+    path("<int:pk>/subtree/complete/", views.task_subtree_complete_api, name="task_subtree_complete"),
+    path("<int:pk>/subtree/archive/", views.task_subtree_archive_api, name="task_subtree_archive"),
+    path("<int:pk>/subtree/delete/", views.task_subtree_delete_api, name="task_subtree_delete"),
+    # バックグラウンドジョブ (例: POST /api/tasks/jobs/ {"kind": "export_tasks", "params": {"format": "csv"}})
+    path("jobs/", views.job_list_api, name="job_list"),
+    path("jobs/<int:pk>/", views.job_detail_api, name="job_detail"),
+    path("jobs/<int:pk>/download/", views.job_download_api, name="job_download"),
+    # ViewSet（一覧・詳細・作成・更新・削除。names: task-list / task-detail）
+    *router.urls,
+
+    # 非同期版（ASGI 向け。レスポンスは同期版と同じ）
+    path("async/", async_views.task_list_api_async, name="task_list_async"),
+    path("async/simple/", async_views.task_list_api_simple_async, name="task_list_simple_async"),
+    path("async/completed/<str:is_completed>/", async_views.task_list_by_completion_async, name="task_list_by_completion_async"),
+    path("async/user/<int:user_id>/", async_views.task_list_by_user_async, name="task_list_by_user_async"),
+    # ログイン中のユーザーのタスクの変更フィード（Server-Sent Events。ASGI 向け）
+    path("events/", async_views.task_events_stream, name="task_events"),
 
 
     # --- HTML画面 ---
@@ -1,45 +1,88 @@
 # task_manager/tasks/api/views.py
 
-from django.shortcuts import render
-from django.http import JsonResponse
+import heapq
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.shortcuts import get_object_or_404, render
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.views.decorators.http import require_GET
-from ..models import Task
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from ..models import ArchivedTask, Job, Task, TaskTombstone
+from ..services import (
+    archive_subtree,
+    bulk_archive_tasks,
+    bulk_complete_tasks,
+    bulk_create_tasks,
+    bulk_update_tasks,
+    complete_subtree,
+    delete_subtree,
+)
+from .serializers import (
+    JobCreateSerializer,
+    JobSerializer,
+    TaskBulkCreateSerializer,
+    TaskBulkUpdateSerializer,
+    TaskIdsSerializer,
+    TaskSerializer,
+)
+from ..pagination import CursorPage, InvalidCursor, paginate_merged
+from .fields import InvalidFields, SIMPLE_FIELDS, parse_fields, row_to_json
+from .serialization import TaskRowSerializer
+from ..cache import ALL_USERS, all_users_scope, cache_task_list
+from ..conditional import conditional_task_view, task_list_validator
+from ..jobs import enqueue, export_path
+from ..stats import get_user_stats
+from ..sync import CursorExpired, get_changes
 
 
 # ------------------------------------
 # 簡素版
 # ------------------------------------
-@require_GET
-def task_list_api_simple(request):
+def _simple_tasks(params):
     """
-    学習用の簡素版タスク一覧API
-    - is_completed=true/false のみサポート
-    - title / created_at / is_completed を返す
+    簡素版の条件（is_completed=true/false と user_id）で絞り込んだタスクを返す。
+    task_list_api_simple と非同期版（async_views.task_list_api_simple_async）で共通の条件解釈。
     """
     tasks = Task.objects.all()
 
-    is_completed = request.GET.get("is_completed")
+    is_completed = params.get("is_completed")
     if is_completed in ["true", "false"]:
         tasks = tasks.filter(is_completed=(is_completed == "true"))
 
-    # forを使った基本的なリスト作成
+    user_id = params.get("user_id")
+    if user_id is not None and user_id.isdigit():
+        tasks = tasks.filter(user_id=int(user_id))
+
+    return tasks
+
+
+@require_GET
+@cache_task_list("task_list_api_simple", all_users_scope)
+def task_list_api_simple(request):
+    """
+    学習用の簡素版タスク一覧API
+    - is_completed=true/false と user_id=1 のみサポート
+    - title / created_at / is_completed を返す（fields=id,title のように変更可）
+    - Ajax から繰り返し呼ばれるため、レスポンスをキャッシュする（tasks.cache）
+    """
+    try:
+        fields = parse_fields(request.GET.get("fields"), default=SIMPLE_FIELDS)
+    except InvalidFields as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    tasks = _simple_tasks(request.GET)
+
+    # 指定された列だけを SELECT し、dict のまま JSON にする
     data = []
-    for task in tasks:
-        data.append({
-            "title": task.title,
-            "created_at": task.created_at.isoformat() if task.created_at else None,
-            "is_completed": task.is_completed,
-        })
+    for row in tasks.values(*fields):
+        data.append(row_to_json(row, fields))
 
     # リスト内包表記版
-    #data = [
-    #    {
-    #        "title": task.title,
-    #        "created_at": task.created_at.isoformat() if task.created_at else None,
-    #        "is_completed": task.is_completed,
-    #    }
-    #    for task in tasks
-    #]
+    #data = [row_to_json(row, fields) for row in tasks.values(*fields)]
 
     return JsonResponse(data, safe=False)
 
@@ -54,7 +97,95 @@ def task_preview(request):
 # ------------------------------------
 # 運用版
 # ------------------------------------
+def _paginate(request, sources, key) -> CursorPage | JsonResponse:
+    """
+    クエリパラメータ cursor / page_size に従ってキーセットページネーションを行う。
+    sources は取得元（Task / ArchivedTask）ごとのクエリセットのリストで、併合して1つの一覧にする。
+    パラメータが不正な場合は 400 の JsonResponse を返す。
+    key には行から (created_at, pk) を取り出す関数を指定する。
+    """
+    try:
+        return paginate_merged(
+            sources,
+            cursor=request.GET.get("cursor") or None,
+            page_size=request.GET.get("page_size"),
+            key=key,
+        )
+    except InvalidCursor as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except ValueError:
+        return JsonResponse({"error": "page_size は整数で指定してください。"}, status=400)
+
+
+def _row_serializer(request) -> TaskRowSerializer | JsonResponse:
+    """?fields= を検証して TaskRowSerializer を作る。不正な場合は 400 の JsonResponse"""
+    try:
+        return TaskRowSerializer(parse_fields(request.GET.get("fields")))
+    except InvalidFields as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+
+def _task_page_response(request, *sources) -> HttpResponse:
+    """
+    ?fields= で指定された列だけを values_list() で読み出してページ分割し、
+    {"tasks": [...], "next": ..., "prev": ...} の JSON を返す。
+    task_list_api / task_list_by_completion / task_list_by_user で共通のシリアライズ経路。
+    sources に複数のクエリセット（Task / ArchivedTask）を渡すと、併合してページ分割する。
+    """
+    serializer = _row_serializer(request)
+    if isinstance(serializer, JsonResponse):
+        return serializer
+
+    rows = [serializer.rows(tasks) for tasks in sources]
+    page = _paginate(request, rows, key=serializer.position)
+    if isinstance(page, JsonResponse):
+        return page
+
+    content = serializer.page_content(page.items, page.next_cursor, page.prev_cursor)
+    return HttpResponse(content, content_type="application/json")
+
+
+def _filter_tasks(tasks, params):
+    """
+    クエリパラメータ is_completed / is_archived / user_id で tasks を絞り込む。
+    task_list_api と task_export_api で共通の条件解釈。
+    """
+    is_completed = params.get("is_completed")
+    if is_completed is not None:
+        tasks = tasks.filter(is_completed=is_completed.lower() == "true")
+
+    is_archived = params.get("is_archived")
+    if is_archived is not None:
+        tasks = tasks.filter(is_archived=is_archived.lower() == "true")
+
+    user_id = params.get("user_id")
+    if user_id is not None and user_id.isdigit():
+        tasks = tasks.filter(user_id=int(user_id))
+
+    return tasks
+
+
+def _task_sources(params):
+    """
+    条件に合うタスクを取得元ごとのクエリセットのリストで返す。
+    is_archived=true の場合は、保管テーブル（ArchivedTask）も取得元に含める（read-through）。
+    """
+    sources = [Task.objects.all()]
+    is_archived = params.get("is_archived")
+    if is_archived is not None and is_archived.lower() == "true":
+        sources.append(ArchivedTask.objects.all())
+    return [_filter_tasks(tasks, params) for tasks in sources]
+
+
+def _user_id_scope(request, *args, **kwargs):
+    """user_id で絞り込んだ場合はそのユーザー、それ以外は全ユーザーのスコープ"""
+    user_id = request.GET.get("user_id")
+    return int(user_id) if user_id is not None and user_id.isdigit() else ALL_USERS
+
+
 @require_GET
+@cache_task_list("task_list_api", _user_id_scope)
+@conditional_task_view(task_list_validator(lambda request: _task_sources(request.GET)))
 def task_list_api(request):
     """
     タスク一覧を条件付きでJSON形式で返すAPI
@@ -62,82 +193,320 @@ def task_list_api(request):
     - is_completed=true/false
     - is_archived=true/false
     - user_id=1
-    """
-    tasks = Task.objects.all()
+    - cursor=<前回レスポンスの next / prev>
+    - page_size=50（上限は settings.TASKS_MAX_PAGE_SIZE）
+    - fields=id,title（返す列。省略時は全列。指定できる列は fields.TASK_FIELDS）
 
+    is_archived=true の場合は保管テーブル（ArchivedTask）のタスクも併せて返す。
+    レスポンスは条件ごとにキャッシュし、タスクの変更で無効にする（tasks.cache）。
+    ETag / Last-Modified が一致すればシリアライズせずに 304 を返す（tasks.conditional）。
+    """
     # --- フィルタリング処理 ---
-    is_completed = request.GET.get("is_completed")
-    if is_completed is not None:
-        tasks = tasks.filter(is_completed=is_completed.lower() == "true")
+    sources = _task_sources(request.GET)
 
-    is_archived = request.GET.get("is_archived")
-    if is_archived is not None:
-        tasks = tasks.filter(is_archived=is_archived.lower() == "true")
+    # --- ページネーション・JSON 変換（指定された列のみ） ---
+    return _task_page_response(request, *sources)
 
-    user_id = request.GET.get("user_id")
-    if user_id is not None and user_id.isdigit():
-        tasks = tasks.filter(user_id=int(user_id))
 
-    # --- JSON 変換 ---
-    data = []
-    for task in tasks:
-        data.append({
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "is_completed": task.is_completed,
-            "is_archived": task.is_archived,
-            "completed_comment": task.completed_comment,
-            "created_at": task.created_at.isoformat(),
-            "updated_at": task.updated_at.isoformat(),
-            "parent_id": task.parent_id,
-            "user_id": task.user_id,
-        })
-
-    return JsonResponse({"tasks": data})
+def _tasks_by_completion(request, is_completed: str):
+    return Task.objects.filter(is_completed=(is_completed.lower() == "true"))
 
 
 @require_GET
+@conditional_task_view(task_list_validator(_tasks_by_completion))
 def task_list_by_completion(request, is_completed: str):
-    """URLパラメータで完了状態を指定してタスク一覧を返す"""
-    tasks = Task.objects.filter(is_completed=(is_completed.lower() == "true"))
-
-    data = [
-        {
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "is_completed": task.is_completed,
-            "is_archived": task.is_archived,
-            "completed_comment": task.completed_comment,
-            "created_at": task.created_at.isoformat(),
-            "updated_at": task.updated_at.isoformat(),
-            "parent_id": task.parent_id,
-            "user_id": task.user_id,
-        }
-        for task in tasks
-    ]
-    return JsonResponse({"tasks": data})
+    """URLパラメータで完了状態を指定してタスク一覧を返す（cursor / page_size / fields・条件付き GET 対応）"""
+    tasks = _tasks_by_completion(request, is_completed)
+    return _task_page_response(request, tasks)
+
+
+def _tasks_by_user(request, user_id: int):
+    return Task.objects.filter(user_id=user_id)
 
 
 @require_GET
+@conditional_task_view(task_list_validator(_tasks_by_user))
 def task_list_by_user(request, user_id: int):
-    """URLパラメータでユーザーを指定してタスク一覧を返す"""
-    tasks = Task.objects.filter(user_id=user_id)
-
-    data = [
-        {
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "is_completed": task.is_completed,
-            "is_archived": task.is_archived,
-            "completed_comment": task.completed_comment,
-            "created_at": task.created_at.isoformat(),
-            "updated_at": task.updated_at.isoformat(),
-            "parent_id": task.parent_id,
-            "user_id": task.user_id,
-        }
-        for task in tasks
-    ]
-    return JsonResponse({"tasks": data})
\ No newline at end of file
+    """URLパラメータでユーザーを指定してタスク一覧を返す（cursor / page_size / fields・条件付き GET 対応）"""
+    tasks = _tasks_by_user(request, user_id)
+    return _task_page_response(request, tasks)
+
+
+# ------------------------------------
+# 差分同期
+# ------------------------------------
+@require_GET
+def task_changes_api(request):
+    """
+    前回の同期以降に作成・更新・削除されたタスクだけを返すAPI
+    クエリパラメータ例:
+    - since=<前回レスポンスの cursor>（省略時は全件。以降の削除のみ記録対象）
+    - user_id=1
+    - page_size=50 / fields=id,title,updated_at
+
+    レスポンス:
+    {"tasks": [...], "deleted": [id, ...], "cursor": "...", "has_more": false}
+    has_more が true の間は、返された cursor で続けて取得する。
+    カーソルが削除記録の保持期間より古い場合は 410 を返す（全件を取り直す）。
+    """
+    try:
+        serializer = TaskRowSerializer(
+            parse_fields(request.GET.get("fields")), cursor_fields=("updated_at", "id")
+        )
+    except InvalidFields as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    tasks = Task.objects.all()
+    tombstones = TaskTombstone.objects.all()
+    user_id = request.GET.get("user_id")
+    if user_id is not None and user_id.isdigit():
+        tasks = tasks.filter(user_id=int(user_id))
+        tombstones = tombstones.filter(user_id=int(user_id))
+
+    try:
+        changes = get_changes(
+            serializer.rows(tasks),
+            tombstones,
+            since=request.GET.get("since") or None,
+            page_size=request.GET.get("page_size"),
+            key=serializer.position,
+        )
+    except InvalidCursor as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except CursorExpired as e:
+        return JsonResponse({"error": str(e)}, status=410)
+    except ValueError:
+        return JsonResponse({"error": "page_size は整数で指定してください。"}, status=400)
+
+    content = serializer.dumps({
+        "tasks": serializer.to_dicts(changes.rows),
+        "deleted": changes.deleted,
+        "cursor": changes.cursor,
+        "has_more": changes.has_more,
+    })
+    return HttpResponse(content, content_type="application/json")
+
+
+# ------------------------------------
+# ユーザー別タスク集計（DRF / ログイン必須）
+# ------------------------------------
+@api_view(["GET"])
+def task_stats_api(request):
+    """
+    ログイン中のユーザーのタスク件数（UserTaskStats。Task を集計しない）
+    例: GET /api/tasks/stats/
+        {"task_count": 12, "completed_count": 5, "archived_count": 2, "open_subtask_count": 3}
+    """
+    return Response(get_user_stats(request.user))
+
+
+# ------------------------------------
+# ストリーミングエクスポート
+# ------------------------------------
+@require_GET
+def task_export_api(request):
+    """
+    条件に合うタスクを全件ストリーミングで返すエクスポートAPI
+
+    task_list_api と同じ絞り込み条件（is_completed / is_archived / user_id。
+    is_archived=true なら保管テーブルも含む）に加え、
+    format=json（既定）/ ndjson で出力形式を、fields=id,title で出力する列を選べる。
+    行はチャンク単位で DB から読み出して逐次送信するため、
+    件数が増えてもメモリ使用量はほぼ一定。
+    """
+    output_format = request.GET.get("format", "json")
+    if output_format not in ("json", "ndjson"):
+        return JsonResponse({"error": "format は json または ndjson を指定してください。"}, status=400)
+    serializer = _row_serializer(request)
+    if isinstance(serializer, JsonResponse):
+        return serializer
+
+    # モデルインスタンスは作らず、values_list() のタプルをチャンク単位で読み出す。
+    # 保管テーブルも読む場合は、取得元ごとの新しい順の行を併合する
+    chunk_size = settings.TASKS_EXPORT_CHUNK_SIZE
+    rows = heapq.merge(
+        *(
+            serializer.rows(tasks).order_by("-created_at", "-id").iterator(chunk_size=chunk_size)
+            for tasks in _task_sources(request.GET)
+        ),
+        key=serializer.position,
+        reverse=True,
+    )
+
+    if output_format == "ndjson":
+        response = StreamingHttpResponse(
+            serializer.stream_ndjson(rows, chunk_size), content_type="application/x-ndjson; charset=utf-8"
+        )
+        filename = "tasks.ndjson"
+    else:
+        response = StreamingHttpResponse(
+            serializer.stream_json(rows, chunk_size), content_type="application/json; charset=utf-8"
+        )
+        filename = "tasks.json"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+# ------------------------------------
+# 一括操作（DRF / ログイン必須）
+# ------------------------------------
+def _bulk_items(data):
+    """{"tasks": [...]} または [...] のどちらでも受け付ける"""
+    if isinstance(data, dict):
+        return data.get("tasks", [])
+    return data
+
+
+def _validation_error(e: ValidationError) -> Response:
+    return Response({"error": e.messages}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(["POST"])
+def task_bulk_create_api(request):
+    """
+    タスクを一括作成する。
+    例: POST /api/tasks/bulk/create/  {"tasks": [{"title": "A"}, {"title": "B", "parent": 1}]}
+    """
+    serializer = TaskBulkCreateSerializer(
+        data=_bulk_items(request.data), many=True, max_length=settings.TASKS_BULK_MAX_ITEMS
+    )
+    serializer.is_valid(raise_exception=True)
+    try:
+        tasks = bulk_create_tasks(request.user, serializer.validated_data)
+    except ValidationError as e:
+        return _validation_error(e)
+    return Response({"tasks": TaskSerializer(tasks, many=True).data}, status=status.HTTP_201_CREATED)
+
+
+@api_view(["POST"])
+def task_bulk_update_api(request):
+    """
+    タスクを一括更新する（指定したフィールドのみ）。
+    例: POST /api/tasks/bulk/update/  {"tasks": [{"id": 1, "title": "新"}, {"id": 2, "is_completed": true}]}
+    """
+    serializer = TaskBulkUpdateSerializer(
+        data=_bulk_items(request.data), many=True, partial=True, max_length=settings.TASKS_BULK_MAX_ITEMS
+    )
+    serializer.is_valid(raise_exception=True)
+    try:
+        tasks = bulk_update_tasks(request.user, serializer.validated_data)
+    except ValidationError as e:
+        return _validation_error(e)
+    return Response({"tasks": TaskSerializer(tasks, many=True).data})
+
+
+@api_view(["POST"])
+def task_bulk_complete_api(request):
+    """
+    タスクを一括で完了にする。未完了の子タスクを持つタスクが含まれる場合は全体を拒否する。
+    例: POST /api/tasks/bulk/complete/  {"ids": [1, 2, 3]}
+    """
+    serializer = TaskIdsSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    try:
+        updated = bulk_complete_tasks(request.user, serializer.validated_data["ids"])
+    except ValidationError as e:
+        return _validation_error(e)
+    return Response({"updated": updated})
+
+
+@api_view(["POST"])
+def task_bulk_archive_api(request):
+    """
+    タスクを一括でアーカイブする。
+    例: POST /api/tasks/bulk/archive/  {"ids": [1, 2, 3]}
+    """
+    serializer = TaskIdsSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    try:
+        updated = bulk_archive_tasks(request.user, serializer.validated_data["ids"])
+    except ValidationError as e:
+        return _validation_error(e)
+    return Response({"updated": updated})
+
+
+# ------------------------------------
+# サブツリー操作（タスクと子孫をまとめて操作する）
+# ------------------------------------
+@api_view(["POST"])
+def task_subtree_complete_api(request, pk: int):
+    """
+    タスクと子孫をまとめて完了にする（未完了の子タスクがあっても完了にする）。
+    例: POST /api/tasks/1/subtree/complete/
+    """
+    task = get_object_or_404(Task, pk=pk, user=request.user)
+    return Response({"updated": complete_subtree(task)})
+
+
+@api_view(["POST"])
+def task_subtree_archive_api(request, pk: int):
+    """
+    タスクと子孫をまとめてアーカイブする。
+    例: POST /api/tasks/1/subtree/archive/
+    """
+    task = get_object_or_404(Task, pk=pk, user=request.user)
+    return Response({"updated": archive_subtree(task)})
+
+
+@api_view(["POST"])
+def task_subtree_delete_api(request, pk: int):
+    """
+    タスクと子孫をまとめて削除する。
+    例: POST /api/tasks/1/subtree/delete/
+    """
+    task = get_object_or_404(Task, pk=pk, user=request.user)
+    return Response({"deleted": delete_subtree(task)})
+
+
+# ------------------------------------
+# バックグラウンドジョブ（DRF / ログイン必須）
+# ------------------------------------
+@api_view(["GET", "POST"])
+def job_list_api(request):
+    """
+    GET: ログイン中のユーザーが登録したジョブ（新しい順に TASKS_PAGE_SIZE 件）
+    POST: ジョブを登録し、実行を待たずに 202 を返す（実行は run_workers コマンドのワーカー）。
+          進捗は Location ヘッダの URL（/api/tasks/jobs/<id>/）で確認する
+    例: POST /api/tasks/jobs/  {"kind": "delete_subtree", "params": {"task_id": 1}}
+    """
+    if request.method == "GET":
+        jobs = Job.objects.filter(user=request.user).order_by("-id")[: settings.TASKS_PAGE_SIZE]
+        return Response({"jobs": JobSerializer(jobs, many=True).data})
+
+    serializer = JobCreateSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    try:
+        job = enqueue(serializer.validated_data["kind"], serializer.validated_data["params"], request.user)
+    except ValidationError as e:
+        return _validation_error(e)
+    return Response(
+        JobSerializer(job).data,
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Location": reverse("tasks_api:job_detail", args=[job.pk])},
+    )
+
+
+@api_view(["GET"])
+def job_detail_api(request, pk: int):
+    """
+    ジョブの状態・進捗・結果を返す。
+    例: GET /api/tasks/jobs/1/
+        {"id": 1, "kind": "export_tasks", "status": "running", "progress": 2000, "total": 5000, ...}
+    """
+    job = get_object_or_404(Job, pk=pk, user=request.user)
+    return Response(JobSerializer(job).data)
+
+
+@api_view(["GET"])
+def job_download_api(request, pk: int):
+    """
+    書き出しジョブ（export_tasks）の出力ファイルを返す。完了前は 409。
+    例: GET /api/tasks/jobs/1/download/
+    """
+    job = get_object_or_404(Job, pk=pk, user=request.user, kind="export_tasks")
+    if job.status != Job.SUCCEEDED:
+        return Response({"error": ["ジョブが完了していません。"], "status": job.status}, status=status.HTTP_409_CONFLICT)
+    path = export_path(job)
+    if not path.exists():
+        raise Http404("出力ファイルが見つかりません。")
+    return FileResponse(path.open("rb"), as_attachment=True, filename=path.name)
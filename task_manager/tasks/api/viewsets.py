@@ -0,0 +1,126 @@
+# task_manager/tasks/api/viewsets.py
+
+"""
+ログイン中のユーザーのタスクを操作する DRF の ViewSet（/api/tasks/mine/）。
+
+- 一覧・詳細: values_list() の行を TaskReadSerializer で変換する（モデルインスタンスを作らない）
+- 作成・更新: TaskSerializer で検証し、保存はシグナル経由で階層・カウンタ・集計・キャッシュを更新する
+- 削除: 詳細ページと同じく子孫ごと削除する（delete_subtree）
+
+一覧のページ分割は既存の JSON API と同じキーセット（カーソル）方式で、
+レスポンスも {"tasks": [...], "next": ..., "prev": ...} の形にそろえる。
+sort=relevance（適合度順）はキーセットで分割できないため、先頭 page_size 件だけを返す（next / prev は null）。
+"""
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+from ..forms import TaskSearchForm
+from ..models import Task
+from ..pagination import InvalidCursor, first_page, paginate_by_cursor
+from ..services import delete_subtree, get_filtered_tasks
+from .serializers import TaskReadSerializer, TaskSerializer
+
+# 一覧・詳細（読み出しのみ）のアクション
+READ_ACTIONS = ("list", "retrieve")
+
+
+class TaskCursorPagination(BasePagination):
+    """
+    tasks.pagination.paginate_by_cursor によるページ分割。
+    クエリパラメータは cursor / page_size（上限は settings.TASKS_MAX_PAGE_SIZE）。
+    """
+
+    # 行から (created_at, id) を取り出す関数（一覧は TaskReadSerializer の行タプル）
+    key = staticmethod(TaskReadSerializer.position)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        try:
+            if getattr(view, "ranked", False):
+                self.page = first_page([queryset], request.query_params.get("page_size"))
+            else:
+                self.page = paginate_by_cursor(
+                    queryset,
+                    cursor=request.query_params.get("cursor") or None,
+                    page_size=request.query_params.get("page_size"),
+                    key=self.key,
+                )
+        except InvalidCursor as e:
+            raise ValidationError({"cursor": str(e)})
+        except ValueError:
+            raise ValidationError({"page_size": "page_size は整数で指定してください。"})
+        return self.page.items
+
+    def get_paginated_response(self, data):
+        return Response({"tasks": data, "next": self.page.next_cursor, "prev": self.page.prev_cursor})
+
+
+class TaskViewSet(viewsets.ModelViewSet):
+    """
+    ログイン中のユーザーのタスクの一覧・詳細・作成・更新・削除。
+
+    一覧のクエリパラメータ（タスク一覧ページと同じ TaskSearchForm で検証する）:
+    - q=キーワード（get_filtered_tasks と同じ全文検索 / 部分一致）
+    - is_completed=true/false
+    - is_archived=true/false
+    - sort=relevance（キーワードの適合度順。先頭ページのみ）
+    - cursor / page_size
+    """
+
+    pagination_class = TaskCursorPagination
+
+    # 一覧を適合度順で返すか（_search で決まる。TaskCursorPagination が参照する）
+    ranked = False
+
+    def get_queryset(self):
+        if self.action == "list":
+            tasks = self._search()
+        else:
+            tasks = Task.objects.all()
+        tasks = tasks.filter(user=self.request.user)
+        if self.action in READ_ACTIONS:
+            return tasks.values_list(*TaskReadSerializer.columns)
+        return tasks
+
+    def _search(self):
+        """クエリパラメータを TaskSearchForm で検証し、get_filtered_tasks で絞り込む"""
+        form = TaskSearchForm(self.request.query_params)
+        if not form.is_valid():
+            raise ValidationError(form.errors)
+        data = form.cleaned_data
+        self.ranked = form.is_ranked()
+        return get_filtered_tasks(data["q"] or None, data["is_completed"], data["is_archived"], ranked=self.ranked)
+
+    def get_serializer_class(self):
+        return TaskReadSerializer if self.action in READ_ACTIONS else TaskSerializer
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if isinstance(serializer, TaskSerializer):
+            # 親タスクに指定できるのは自分のタスクだけ
+            serializer.fields["parent"].queryset = Task.objects.filter(user=self.request.user)
+        return serializer
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    def perform_update(self, serializer):
+        task = serializer.instance
+        data = serializer.validated_data
+        if "parent" in data:
+            try:
+                Task(pk=task.pk, parent=data["parent"]).clean()
+            except DjangoValidationError as e:
+                raise ValidationError(e.message_dict)
+        # 完了への変更は complete_task と同じく、未完了の子タスクが残っていれば拒否する
+        if data.get("is_completed") and not task.is_completed and Task.objects.filter(
+            pk=task.pk, incomplete_subtask_count__gt=0
+        ).exists():
+            raise ValidationError({"is_completed": "子タスクが未完了です。親タスクを完了できません。"})
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        delete_subtree(instance)
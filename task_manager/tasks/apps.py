@@ -1,7 +1,30 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+
+def _install_fts(sender, using, **kwargs):
+    """
+    マイグレーション後に FTS5 トリガーを復元する。
+    SQLite のテーブル再作成で tasks_task のトリガーが消えることがあるため。
+    """
+    from django.db import connections
+    from .search import install_fts
+
+    install_fts(connections[using])
 
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
-    verbose_name = "タスク管理" 
+    verbose_name = "タスク管理"
+
+    def ready(self) -> None:
+        from . import signals  # noqa: F401  シグナルハンドラの登録
+
+        post_migrate.connect(_install_fts, sender=self)
+
+        # 本番向け設定では SQLite の PRAGMA を接続ごとに適用する（プロジェクト共通の設定。task_manager.db）
+        from task_manager.db import configure_sqlite
+
+        connection_created.connect(configure_sqlite, dispatch_uid="task_manager.db.configure_sqlite")
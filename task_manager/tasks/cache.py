@@ -0,0 +1,175 @@
+# task_manager/tasks/cache.py
+
+"""
+タスク一覧レスポンスのキャッシュ。
+
+キャッシュキーは「ビュー名・スコープ・世代番号・正規化したクエリパラメータ」から作る。
+スコープはレスポンスに含まれるタスクの範囲で、ユーザー単位（ユーザー id）か
+全ユーザー（ALL_USERS）のどちらか。
+
+タスクが変更されると、そのユーザーと ALL_USERS の世代番号を進める（bump_generation）。
+古い世代のエントリは参照されなくなり、タイムアウトで自然に消える。
+世代番号は Task の post_save / post_delete シグナルと、
+シグナルを経由しない tasks.services の一括更新から進める。
+
+django.core.cache を使うため、ローカルメモリキャッシュでもそれ以外のバックエンドでも動作する。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from functools import wraps
+from typing import Any, Callable, Iterable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+# キャッシュしたレスポンスと一緒に保存するヘッダ（条件付き GET の検証子）
+_STORED_HEADERS = ("ETag", "Last-Modified")
+
+# 全ユーザーのタスクを含むレスポンス用のスコープ
+ALL_USERS = "all"
+
+# invalidate_all() で進める、すべてのスコープに共通の世代
+_EPOCH = "epoch"
+
+_PREFIX = "tasks"
+
+
+def _cache() -> BaseCache:
+    return caches[settings.TASKS_CACHE_ALIAS]
+
+
+def _generation_key(scope: Any) -> str:
+    return f"{_PREFIX}:gen:{scope}"
+
+
+def _new_generation() -> int:
+    # エビクションで世代番号が消えても、過去の値と衝突しないよう時刻から始める
+    return time.time_ns()
+
+
+def _bump(keys: Iterable[str]) -> None:
+    cache = _cache()
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            # 未作成・エビクション済み
+            cache.set(key, _new_generation(), timeout=None)
+
+
+def _scope_keys(user_ids: Iterable[int | None]) -> list[str]:
+    keys = {_generation_key(ALL_USERS)}
+    keys.update(_generation_key(user_id) for user_id in user_ids if user_id is not None)
+    return sorted(keys)
+
+
+def bump_generation(*user_ids: int | None) -> None:
+    """
+    指定したユーザーと ALL_USERS の世代番号を進め、関連するキャッシュを無効にする。
+
+    トランザクション内で呼ばれた場合は、コミット後にもう一度進める。
+    コミット前に別リクエストが古いデータを新しい世代でキャッシュしてしまうのを防ぐため。
+    """
+    keys = _scope_keys(user_ids)
+    _bump(keys)
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def invalidate_all() -> None:
+    """影響範囲のユーザーが特定できない一括更新の後に、すべてのスコープを無効にする"""
+    _bump([_generation_key(_EPOCH)])
+    transaction.on_commit(lambda: _bump([_generation_key(_EPOCH)]))
+
+
+def _current_generations(scope: Any) -> tuple[int, int]:
+    """スコープと共通世代の番号を1回のキャッシュアクセスで取得する（未作成なら作る）"""
+    cache = _cache()
+    scope_key, epoch_key = _generation_key(scope), _generation_key(_EPOCH)
+    values = cache.get_many([scope_key, epoch_key])
+    for key in (scope_key, epoch_key):
+        if key not in values:
+            cache.add(key, _new_generation(), timeout=None)
+            values[key] = cache.get(key, 0)
+    return values[scope_key], values[epoch_key]
+
+
+def normalized_params(request: HttpRequest) -> str:
+    """並び順・重複に左右されないクエリパラメータ表現"""
+    items = sorted((key, tuple(sorted(values))) for key, values in request.GET.lists())
+    return hashlib.sha1(repr(items).encode()).hexdigest()
+
+
+def response_cache_key(view_name: str, scope: Any, request: HttpRequest) -> str:
+    """ビュー名・スコープ・世代番号・言語・クエリパラメータからキャッシュキーを作る"""
+    generation, epoch = _current_generations(scope)
+    language = getattr(request, "LANGUAGE_CODE", "")
+    return (
+        f"{_PREFIX}:resp:{view_name}:{scope}:{generation}.{epoch}:"
+        f"{language}:{normalized_params(request)}"
+    )
+
+
+def cache_task_list(
+    view_name: str, scope: Callable[..., Any]
+) -> Callable[[Callable[..., HttpResponse]], Callable[..., HttpResponse]]:
+    """
+    タスク一覧ビューのレスポンスをキャッシュするデコレータ。
+
+    Args:
+        view_name (str): キャッシュキーに含めるビュー名
+        scope (Callable): (request, *args, **kwargs) を受け取り、
+            レスポンスに含まれるタスクのスコープ（ユーザー id または ALL_USERS）を返す関数
+
+    ステータス 200 の通常レスポンスだけを保存する。
+    エラーやストリーミングレスポンスはそのまま返す。
+
+    tasks.conditional.conditional_task_view より外側に付けると、ETag / Last-Modified も
+    一緒に保存され、キャッシュヒット時は DB に問い合わせずに 304 を返せる。
+    """
+
+    def decorator(view: Callable[..., HttpResponse]) -> Callable[..., HttpResponse]:
+        @wraps(view)
+        def wrapped(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+            key = response_cache_key(view_name, scope(request, *args, **kwargs), request)
+            cached = _cache().get(key)
+            if cached is not None:
+                content, content_type, headers = cached
+                response = HttpResponse(content, content_type=content_type, headers=headers)
+                return get_conditional_response(
+                    request,
+                    etag=headers.get("ETag"),
+                    last_modified=parse_http_date_safe(headers.get("Last-Modified", "")),
+                    response=response,
+                )
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                headers = {name: response[name] for name in _STORED_HEADERS if response.has_header(name)}
+                _cache().set(
+                    key,
+                    (response.content, response["Content-Type"], headers),
+                    timeout=settings.TASKS_CACHE_TIMEOUT,
+                )
+            return response
+
+        return wrapped
+
+    return decorator
+
+
+def request_user_scope(request: HttpRequest, *args: Any, **kwargs: Any) -> Any:
+    """ログインユーザー自身のタスクだけを返すビュー用のスコープ"""
+    return request.user.pk if request.user.is_authenticated else "anonymous"
+
+
+def all_users_scope(request: HttpRequest, *args: Any, **kwargs: Any) -> Any:
+    """全ユーザーのタスクを返し得るビュー用のスコープ"""
+    return ALL_USERS
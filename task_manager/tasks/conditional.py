@@ -0,0 +1,161 @@
+# task_manager/tasks/conditional.py
+
+"""
+タスク一覧・詳細の条件付き GET（ETag / Last-Modified）。
+
+ビューを実行する前に、対象タスク集合の「最終更新日時の最大値と件数」を1クエリの集計で求め、
+If-None-Match / If-Modified-Since と一致すれば 304 を返す。
+シリアライズやテンプレートのレンダリングは行わない。
+
+ETag にはパス・クエリパラメータ・ユーザー・言語も含めるため、
+ページ送りや表示言語が違うレスポンスが同じ ETag になることはない。
+削除も件数の変化として ETag に反映されるが、Last-Modified（秒単位）には反映されない。
+正確な判定が必要なクライアントは If-None-Match を使うこと。
+
+フォーム（{% csrf_token %}）を含むページ（詳細ページ）は、ETag に CSRF シークレットも含め、
+Last-Modified は返さない。再ログインで CSRF シークレットが替わった後に 304 で古いトークンの
+ページが使われ続けると、次の POST が 403 になるため。
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+from functools import wraps
+from typing import Any, Callable, Sequence
+
+from django.db.models import Count, Max, QuerySet
+from django.http import HttpRequest, HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from .cache import normalized_params
+from .models import Task, TaskClosure
+
+
+@dataclass(frozen=True)
+class Validator:
+    """レスポンスの検証子（ETag は引用符付き、last_modified は UNIX 秒）"""
+
+    etag: str
+    last_modified: int | None
+
+
+def task_set_state(tasks: QuerySet[Task]) -> tuple[datetime | None, int]:
+    """タスク集合の updated_at の最大値と件数を1クエリで返す"""
+    state = tasks.order_by().aggregate(last_modified=Max("updated_at"), count=Count("pk"))
+    return state["last_modified"], state["count"]
+
+
+def make_validator(
+    request: HttpRequest, last_modified: datetime | None, count: int, has_forms: bool = False
+) -> Validator:
+    """
+    集計結果とリクエストの表示条件から検証子を作る。
+
+    has_forms=True の場合は CSRF シークレット（request.META["CSRF_COOKIE"]）を ETag に含め、CSRF シークレットを表せない Last-Modified は付けない。
+    """
+    parts = [
+        request.path,
+        normalized_params(request),
+        str(request.user.pk if request.user.is_authenticated else ""),
+        getattr(request, "LANGUAGE_CODE", ""),
+        last_modified.isoformat() if last_modified else "",
+        str(count),
+    ]
+    if has_forms:
+        # 初回（CSRF Cookie なし）はここでシークレットを作り、ページのトークンと ETag で同じものを使う
+        get_token(request)
+        parts.append(request.META["CSRF_COOKIE"])
+    digest = hashlib.sha1("|".join(parts).encode()).hexdigest()
+    return Validator(
+        etag=quote_etag(digest),
+        last_modified=int(last_modified.timestamp()) if last_modified and not has_forms else None,
+    )
+
+
+def apply_validator(response: HttpResponse, validator: Validator) -> HttpResponse:
+    """成功レスポンスに ETag / Last-Modified ヘッダを付ける（既にあれば上書きしない）"""
+    if 200 <= response.status_code < 300:
+        response.headers.setdefault("ETag", validator.etag)
+        if validator.last_modified is not None:
+            response.headers.setdefault("Last-Modified", http_date(validator.last_modified))
+    return response
+
+
+def conditional_task_view(
+    get_validator: Callable[..., Validator | None],
+) -> Callable[[Callable[..., HttpResponse]], Callable[..., HttpResponse]]:
+    """
+    GET / HEAD で検証子を先に計算し、一致すれば 304 を返すデコレータ。
+
+    Args:
+        get_validator (Callable): (request, *args, **kwargs) を受け取り Validator を返す関数。
+            None を返した場合（対象が存在しない等）は条件判定をせずビューを実行する。
+    """
+
+    def decorator(view: Callable[..., HttpResponse]) -> Callable[..., HttpResponse]:
+        @wraps(view)
+        def wrapped(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+
+            validator = get_validator(request, *args, **kwargs)
+            if validator is None:
+                return view(request, *args, **kwargs)
+
+            response = get_conditional_response(
+                request, etag=validator.etag, last_modified=validator.last_modified
+            )
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return apply_validator(response, validator)
+
+        return wrapped
+
+    return decorator
+
+
+def task_sources_state(sources: Sequence[QuerySet[Any]]) -> tuple[datetime | None, int]:
+    """複数の取得元（Task / ArchivedTask）を合わせた updated_at の最大値と件数（取得元ごとに1クエリ）"""
+    states = [task_set_state(tasks) for tasks in sources]
+    modified = [last_modified for last_modified, _ in states if last_modified is not None]
+    return max(modified, default=None), sum(count for _, count in states)
+
+
+def task_list_validator(
+    get_tasks: Callable[..., QuerySet[Task] | Sequence[QuerySet[Any]]],
+) -> Callable[..., Validator]:
+    """
+    一覧ビュー用の検証子関数を作る。
+
+    Args:
+        get_tasks (Callable): (request, *args, **kwargs) を受け取り、
+            ビューが表示するタスク集合（ページ分割前）を返す関数。
+            保管テーブルも読む一覧では、取得元ごとのクエリセットのリストを返す
+    """
+
+    def get_validator(request: HttpRequest, *args: Any, **kwargs: Any) -> Validator:
+        tasks = get_tasks(request, *args, **kwargs)
+        sources = [tasks] if isinstance(tasks, QuerySet) else tasks
+        last_modified, count = task_sources_state(sources)
+        return make_validator(request, last_modified, count)
+
+    return get_validator
+
+
+def task_tree_validator(request: HttpRequest, pk: int, *args: Any, **kwargs: Any) -> Validator | None:
+    """
+    詳細ビュー用の検証子。
+    タスク自身・子孫タスク・親タスク（親タスク名を表示するため）の更新を反映する。
+    詳細ページは完了・削除などのフォームを含むため、CSRF シークレットも反映する。
+    """
+    tasks = Task.objects.filter(
+        pk__in=TaskClosure.objects.filter(ancestor_id=pk).values("descendant_id")
+    ) | Task.objects.filter(pk__in=Task.objects.filter(pk=pk).values("parent_id"))
+    last_modified, count = task_set_state(tasks)
+    if count == 0:
+        return None  # 存在しないタスク → ビューで 404
+    return make_validator(request, last_modified, count, has_forms=True)
@@ -0,0 +1,192 @@
+# task_manager/tasks/events.py
+
+"""
+タスクの変更イベントのプロセス内配信（Server-Sent Events 用）。
+
+Task のシグナル・tasks.services の一括操作が、コミット後に publish_on_commit で
+TaskEvent を hub に送り、hub は所有ユーザーを購読している接続（tasks.api.async_views.task_events_stream）へ配る。
+クライアントは一覧を取り直さずに、受け取ったイベントで表示を差分更新する。
+
+イベントの種類:
+- created: 作成
+- updated: 更新（完了以外）
+- completed: 完了
+- deleted: 削除（保管テーブルへの移動を含む）
+- subtree: サブツリーの一括完了・アーカイブ・削除（ユーザーごとに1件。
+  data は {"id": ルートの id, "action": "completed" / "archived" / "deleted", "count": 件数}。
+  子孫の id は送らないため、クライアントは一覧を取り直す）
+
+data には id と、分かっている列だけを入れる（一括完了では {"id", "is_completed"} のみ等）。
+クライアントは既存の行に data を上書きで反映する。
+
+hub は同じプロセス内の購読者にしか届かない。複数プロセスで動かす場合は、
+EventHub と同じインターフェースで Redis の pub/sub 等に差し替える。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Iterable
+
+from django.conf import settings
+from django.db import transaction
+
+CREATED = "created"
+UPDATED = "updated"
+COMPLETED = "completed"
+DELETED = "deleted"
+SUBTREE = "subtree"
+
+# シグナルから送る列（簡素版 API の列 + 差分更新に必要な列）
+EVENT_FIELDS = ("id", "title", "created_at", "updated_at", "is_completed", "is_archived", "parent_id")
+
+
+@dataclass(frozen=True)
+class TaskEvent:
+    """
+    タスク1件の変更イベント。
+
+    Attributes:
+        type (str): created / updated / completed / deleted
+        user_id (int | None): タスクの所有ユーザー（配信先）
+        data (dict): id と変更後の値
+        id (int): hub が採番する連番（SSE の id。再接続時の Last-Event-ID に使う）
+    """
+
+    type: str
+    user_id: int | None
+    data: dict[str, Any]
+    id: int = 0
+
+
+def task_data(task: Any, fields: Iterable[str] = EVENT_FIELDS) -> dict[str, Any]:
+    """
+    Task インスタンスからイベントの data を作る（日時は ISO 8601 文字列）。
+    読み込まれていない（defer された）列は、追加のクエリを避けるため含めない。
+    """
+    deferred = task.get_deferred_fields()
+    data = {}
+    for name in fields:
+        if name in deferred:
+            continue
+        value = getattr(task, name)
+        data[name] = value.isoformat() if isinstance(value, datetime) else value
+    return data
+
+
+@dataclass(eq=False)
+class Subscription:
+    """
+    1つの接続の購読。イベントは購読したイベントループの asyncio.Queue に入る。
+
+    キューがあふれた（クライアントの受信が追いつかない）場合は overflowed を立て、
+    以降のイベントは捨てる。ストリームはクライアントに一覧の取り直しを求めて終了する。
+    """
+
+    user_id: int
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue[TaskEvent] = field(default_factory=asyncio.Queue)
+    overflowed: bool = False
+
+    def deliver(self, event: TaskEvent) -> None:
+        """イベントループのスレッドで呼ばれる"""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self) -> TaskEvent:
+        return await self.queue.get()
+
+
+class EventHub:
+    """
+    ユーザー単位の購読とイベント配信。
+
+    publish はどのスレッドからでも呼べる（WSGI のワーカースレッド・sync_to_async のスレッド等）。
+    購読者への受け渡しは call_soon_threadsafe で購読者のイベントループに任せる。
+    直近のイベントは replay_size 件まで保持し、再接続したクライアントに取りこぼし分を返す。
+    """
+
+    def __init__(self, replay_size: int | None = None, queue_size: int | None = None) -> None:
+        self._lock = threading.Lock()
+        self._subscriptions: dict[int, set[Subscription]] = {}
+        self._ids = itertools.count(1)
+        self._last_id = 0
+        self._recent: deque[TaskEvent] = deque(maxlen=replay_size or settings.TASKS_EVENTS_REPLAY_SIZE)
+        self._queue_size = queue_size or settings.TASKS_EVENTS_QUEUE_SIZE
+
+    def subscribe(self, user_id: int) -> Subscription:
+        """実行中のイベントループから呼ぶ"""
+        subscription = Subscription(
+            user_id=user_id,
+            loop=asyncio.get_running_loop(),
+            queue=asyncio.Queue(maxsize=self._queue_size),
+        )
+        with self._lock:
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.user_id, None)
+
+    def publish(self, event: TaskEvent) -> TaskEvent:
+        """イベントに連番を振って保持し、所有ユーザーの購読者に配る"""
+        with self._lock:
+            event = TaskEvent(type=event.type, user_id=event.user_id, data=event.data, id=next(self._ids))
+            self._last_id = event.id
+            self._recent.append(event)
+            targets = list(self._subscriptions.get(event.user_id, ())) if event.user_id is not None else []
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # イベントループが終了済み（切断後に購読解除されなかった接続）
+                self.unsubscribe(subscription)
+        return event
+
+    def replay(self, user_id: int, after: int) -> list[TaskEvent] | None:
+        """
+        after より後のユーザーのイベントを返す。
+        保持している範囲より古い、またはこの hub が発行していない（プロセスの再起動前の）id の
+        場合は、取りこぼしを補えないため None。
+        """
+        with self._lock:
+            recent = list(self._recent)
+            last_id = self._last_id
+        if after > last_id or (recent and after < recent[0].id - 1):
+            return None
+        return [event for event in recent if event.id > after and event.user_id == user_id]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+
+hub = EventHub()
+
+
+def publish_on_commit(event_type: str, rows: Iterable[tuple[int | None, dict[str, Any]]]) -> None:
+    """
+    (user_id, data) の組ごとのイベントを、現在のトランザクションのコミット後にまとめて配る
+    （トランザクション外なら即時）。ロールバックされた変更は配信されない。
+    所有者のいないタスクは購読できないため配信しない。
+    """
+    events = [
+        TaskEvent(type=event_type, user_id=user_id, data=data)
+        for user_id, data in rows
+        if user_id is not None
+    ]
+    if events:
+        transaction.on_commit(lambda: [hub.publish(event) for event in events])
@@ -3,6 +3,7 @@
 from django import forms
 from .models import Task
 from django.core.exceptions import ValidationError
+from .search import can_use_fts
 #from .services import complete_task
 
 class TaskForm(forms.ModelForm):
@@ -49,9 +50,9 @@ def clean(self):
     is_completed = cleaned_data.get("is_completed")
     task_instance = self.instance # Taskモデルを取得
 
-    # 親タスクを完了しようとした場合、子タスクチェック
+    # 親タスクを完了しようとした場合、子タスクチェック（非正規化カラムを参照）
     if is_completed and task_instance.pk:
-        if task_instance.subtasks.filter(is_completed=False).exists():
+        if task_instance.incomplete_subtask_count > 0:
             raise ValidationError("子タスクが未完了のため、親タスクを完了できません。")
 
     return cleaned_data
@@ -90,4 +91,25 @@ class TaskSearchForm(forms.Form):
         required=False,
         label="アーカイブ済み",
         empty_value=None,  # 同様に None
-    )
\ No newline at end of file
+    )
+
+    # 並び順。relevance はキーワードの全文検索の適合度順（tasks.search.filter_by_fts の bm25）
+    RELEVANCE = "relevance"
+    SORT_CHOICES = (
+        ("", "新しい順"),
+        (RELEVANCE, "適合度順"),
+    )
+
+    sort = forms.ChoiceField(
+        choices=SORT_CHOICES,
+        required=False,
+        label="並び順",
+    )
+
+    def is_ranked(self) -> bool:
+        """
+        適合度順で表示するか。
+        キーワードが全文検索の索引で検索できる場合だけ（部分一致の検索には適合度がない）。
+        """
+        data = self.cleaned_data
+        return data.get("sort") == self.RELEVANCE and bool(data.get("q")) and can_use_fts(data["q"])
\ No newline at end of file
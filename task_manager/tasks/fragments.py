@@ -0,0 +1,89 @@
+# task_manager/tasks/fragments.py
+
+"""
+一覧の行（テンプレートの断片）のキャッシュ。
+
+キャッシュキーは「断片のテンプレート名・モデル・pk・updated_at・言語」と、必要なら追加のキー（深さ等）から作る。
+タスクが変わると updated_at が進むため、古い断片は参照されなくなり、タイムアウトで自然に消える。
+子タスクの件数（非正規化カウンタ）の更新でも updated_at は進む（tasks.services.adjust_subtask_counters）。
+
+ページ単位で get_many を1回だけ呼び、キャッシュにない行だけをレンダリングして set_many で保存する。
+レスポンス全体のキャッシュ（tasks.cache）が無効になった後も、変わっていない行は再レンダリングしない。
+
+断片のテンプレートはタスク（と extra_context）だけで描画できるものに限る。
+リクエストやログインユーザーによって内容が変わる部分は断片の外に置くこと。
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.db import models
+from django.template.loader import get_template
+from django.utils import translation
+from django.utils.safestring import SafeString, mark_safe
+
+_PREFIX = "tasks:frag"
+
+
+def _cache() -> BaseCache:
+    return caches[settings.TASKS_CACHE_ALIAS]
+
+
+def fragment_key(template_name: str, obj: models.Model, *extra: Any) -> str:
+    """断片テンプレート・モデル・pk・updated_at・言語（と追加のキー）からキャッシュキーを作る"""
+    parts = [
+        _PREFIX,
+        template_name,
+        obj._meta.label_lower,
+        str(obj.pk),
+        obj.updated_at.isoformat(),
+        translation.get_language() or "",
+        *(str(value) for value in extra),
+    ]
+    return ":".join(parts)
+
+
+def render_fragments(
+    template_name: str,
+    items: Iterable[Any],
+    name: str = "task",
+    get_object: Callable[[Any], models.Model] = lambda item: item,
+    extra_key: Callable[[Any], tuple[Any, ...]] = lambda item: (),
+) -> list[SafeString]:
+    """
+    items の各要素を断片テンプレートでレンダリングし、HTML のリストを items と同じ順で返す。
+
+    Args:
+        template_name (str): 断片のテンプレート名
+        items (Iterable): レンダリングする要素（タスク、またはタスクを含むノード等）
+        name (str): テンプレート内で要素を参照する変数名
+        get_object (Callable): 要素からキーに使うモデルインスタンスを取り出す関数
+        extra_key (Callable): 要素ごとの追加のキー（断片の内容がタスク以外の値にも依存する場合）
+
+    キャッシュの読み取りは get_many 1回、書き込みは set_many 1回（すべてヒットした場合は書き込みなし）。
+    """
+    items = list(items)
+    keys = [fragment_key(template_name, get_object(item), *extra_key(item)) for item in items]
+    cache = _cache()
+    cached = cache.get_many(keys)
+
+    missing: dict[str, str] = {}
+    template = None
+    rendered = []
+    for item, key in zip(items, keys):
+        html = cached.get(key)
+        if html is None:
+            html = missing.get(key)
+        if html is None:
+            if template is None:
+                template = get_template(template_name)
+            html = missing[key] = template.render({name: item})
+        rendered.append(mark_safe(html))
+
+    if missing:
+        cache.set_many(missing, timeout=settings.TASKS_FRAGMENT_CACHE_TIMEOUT)
+    return rendered
@@ -0,0 +1,332 @@
+# task_manager/tasks/jobs.py
+
+"""
+DB のテーブル（Job）をキューにした、プロセス内のバックグラウンドジョブ。
+
+外部のメッセージブローカーは使わない。enqueue() で Job を queued として登録し、
+run_workers コマンドのワーカー（スレッド）が claim_next() で1件ずつ取り出して実行する。
+取り出しは「queued のままなら running にする」条件付きの UPDATE で行うため、
+run_workers を複数のプロセスで動かしても、同じジョブが二重に実行されることはない。
+
+ジョブの種類は register() で登録する。処理は (job, report) を受け取り、
+report(progress, total) で進捗を書き込み、JSON にできる結果を返す。
+例外を送出した場合は failed としてトレースバックを残す。
+
+ワーカーが異常終了して running のまま残ったジョブは、updated_at（進捗の書き込みで進む）が
+settings.TASKS_JOBS_STALE_AFTER 秒以上古ければ、次に起動したワーカーが queued に戻す。
+進捗を書き込めない長い処理（サブツリー操作の1文など）の実行中も、run_job のハートビートの
+スレッドが settings.TASKS_JOBS_HEARTBEAT_INTERVAL 秒ごとに updated_at を進めるため、戻されない。
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import traceback
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+from django.conf import settings
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, close_old_connections, connection
+from django.utils import timezone
+from task_manager.db import serialized_writes
+
+from . import transfer
+from .models import ArchivedTask, Job, Task
+from .services import (
+    archivable_roots,
+    archive_subtree,
+    archive_task_trees,
+    bulk_archive_tasks,
+    complete_subtree,
+    delete_subtree,
+)
+
+logger = logging.getLogger(__name__)
+
+# report(progress, total=None): 進捗を Job に書き込む関数
+ReportFunc = Callable[..., None]
+
+
+@dataclass(frozen=True)
+class JobType:
+    """
+    ジョブの種類。
+
+    Attributes:
+        handler (Callable): (job, report) を受け取って処理し、結果（JSON にできる値）を返す関数
+        validate (Callable | None): 登録時に (user, params) を検証し、正規化した params を返す関数。
+            不正な場合は ValidationError を送出する
+        staff_only (bool): スタッフユーザーだけが登録できる
+    """
+
+    handler: Callable[[Job, ReportFunc], Any]
+    validate: Callable[[AbstractBaseUser | None, dict[str, Any]], dict[str, Any]] | None = None
+    staff_only: bool = False
+
+
+JOB_TYPES: dict[str, JobType] = {}
+
+
+def register(
+    kind: str,
+    validate: Callable[[AbstractBaseUser | None, dict[str, Any]], dict[str, Any]] | None = None,
+    staff_only: bool = False,
+) -> Callable[[Callable[[Job, ReportFunc], Any]], Callable[[Job, ReportFunc], Any]]:
+    """ジョブの処理を kind という名前で登録するデコレータ"""
+
+    def decorator(handler: Callable[[Job, ReportFunc], Any]) -> Callable[[Job, ReportFunc], Any]:
+        JOB_TYPES[kind] = JobType(handler, validate, staff_only)
+        return handler
+
+    return decorator
+
+
+# ------------------------------------
+# 登録・取り出し・実行
+# ------------------------------------
+def enqueue(kind: str, params: dict[str, Any] | None = None, user: AbstractBaseUser | None = None) -> Job:
+    """
+    ジョブを queued として登録する（実行はワーカーが行う）。
+
+    Raises:
+        ValidationError: 未登録の種類・権限のない種類・不正な params
+    """
+    job_type = JOB_TYPES.get(kind)
+    if job_type is None:
+        raise ValidationError(f"ジョブの種類が不正です: {kind}（{', '.join(sorted(JOB_TYPES))}）")
+    if job_type.staff_only and not (user is not None and user.is_staff):
+        raise ValidationError(f"このジョブはスタッフユーザーだけが登録できます: {kind}")
+    params = dict(params or {})
+    if job_type.validate is not None:
+        params = job_type.validate(user, params)
+    return Job.objects.create(kind=kind, params=params, user=user)
+
+
+def claim_next(worker: str) -> Job | None:
+    """
+    待機中のジョブを登録順に1件取り出して running にする（なければ None）。
+
+    他のワーカーが先に取り出した場合は、次のジョブを試す。
+    """
+    while True:
+        pk = Job.objects.filter(status=Job.QUEUED).order_by("id").values_list("pk", flat=True).first()
+        if pk is None:
+            return None
+        now = timezone.now()
+        with serialized_writes():
+            claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+                status=Job.RUNNING, worker=worker, started_at=now, updated_at=now
+            )
+        if claimed:
+            return Job.objects.select_related("user").get(pk=pk)
+
+
+def _touch(job: Job) -> None:
+    """実行中のジョブの updated_at を進める（他のワーカーに戻された・取られた場合は何もしない）"""
+    Job.objects.filter(pk=job.pk, status=Job.RUNNING, worker=job.worker).update(updated_at=timezone.now())
+
+
+def _heartbeat(job: Job, stop: threading.Event) -> None:
+    """stop がセットされるまで、settings.TASKS_JOBS_HEARTBEAT_INTERVAL 秒ごとに _touch する（スレッドで実行）"""
+    try:
+        while not stop.wait(settings.TASKS_JOBS_HEARTBEAT_INTERVAL):
+            try:
+                _touch(job)
+            except DatabaseError:
+                # 書き込みロックを取れなかった等。次の間隔で再試行する
+                logger.warning("ジョブ %s のハートビートを書き込めませんでした", job, exc_info=True)
+    finally:
+        connection.close()
+
+
+def run_job(job: Job) -> Job:
+    """
+    取り出したジョブを実行し、結果（succeeded / failed）を書き込む。
+    処理の例外はここで捕捉し、呼び出し元（ワーカー）には送出しない。
+
+    実行中は別スレッドで updated_at を定期的に進め（ハートビート）、
+    report() の間隔が TASKS_JOBS_STALE_AFTER を超える処理でも requeue_stale_jobs に戻されないようにする。
+    """
+
+    def report(progress: int, total: int | None = None) -> None:
+        job.progress = progress
+        fields: dict[str, Any] = {"progress": progress, "updated_at": timezone.now()}
+        if total is not None:
+            job.total = fields["total"] = total
+        Job.objects.filter(pk=job.pk).update(**fields)
+
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(job, stop), name=f"{job.worker}-heartbeat", daemon=True)
+    heartbeat.start()
+    try:
+        job_type = JOB_TYPES.get(job.kind)
+        if job_type is None:
+            raise ValueError(f"未登録のジョブの種類です: {job.kind}")
+        job.result = job_type.handler(job, report)
+        job.status = Job.SUCCEEDED
+    except Exception:
+        logger.exception("ジョブ %s が失敗しました", job)
+        job.status = Job.FAILED
+        job.error = traceback.format_exc()
+    finally:
+        stop.set()
+        heartbeat.join()
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "result", "error", "progress", "total", "finished_at", "updated_at"])
+    return job
+
+
+def requeue_stale_jobs(older_than: timedelta | None = None) -> int:
+    """
+    ワーカーの異常終了で running のまま残ったジョブを queued に戻す。
+
+    Args:
+        older_than (timedelta | None): この時間以上進捗がないジョブを戻す
+            （既定は settings.TASKS_JOBS_STALE_AFTER 秒）
+
+    Returns:
+        int: 戻したジョブの件数
+    """
+    if older_than is None:
+        older_than = timedelta(seconds=settings.TASKS_JOBS_STALE_AFTER)
+    return Job.objects.filter(status=Job.RUNNING, updated_at__lt=timezone.now() - older_than).update(
+        status=Job.QUEUED, worker="", started_at=None, updated_at=timezone.now()
+    )
+
+
+def work(worker: str, stop: threading.Event, poll_interval: float, once: bool = False) -> int:
+    """
+    ワーカー1つ分のループ。stop がセットされるまでジョブを取り出して実行する。
+
+    Args:
+        worker (str): ワーカーの名前（Job.worker に記録する）
+        stop (threading.Event): 終了の合図。実行中のジョブは最後まで実行してから終了する
+        poll_interval (float): キューが空のときに待つ秒数
+        once (bool): True の場合はキューが空になったら終了する
+
+    Returns:
+        int: 実行したジョブの件数
+    """
+    done = 0
+    while not stop.is_set():
+        close_old_connections()
+        job = claim_next(worker)
+        if job is None:
+            if once:
+                break
+            stop.wait(poll_interval)
+            continue
+        run_job(job)
+        done += 1
+    return done
+
+
+# ------------------------------------
+# ジョブの種類
+# ------------------------------------
+def _validate_task_id(user: AbstractBaseUser | None, params: dict[str, Any]) -> dict[str, Any]:
+    """{"task_id": n}。ユーザーが所有するタスクであること"""
+    try:
+        task_id = int(params["task_id"])
+    except (KeyError, TypeError, ValueError):
+        raise ValidationError("task_id にタスクの id を指定してください。")
+    if user is None or not Task.objects.filter(pk=task_id, user=user).exists():
+        raise ValidationError(f"存在しない、または操作できないタスクです: {task_id}")
+    return {"task_id": task_id}
+
+
+def _subtree_job(operation: Callable[[Task], int], result_key: str) -> Callable[[Job, ReportFunc], Any]:
+    def handler(job: Job, report: ReportFunc) -> dict[str, int]:
+        count = operation(Task.objects.get(pk=job.params["task_id"], user=job.user))
+        report(count, count)
+        return {result_key: count}
+
+    return handler
+
+
+register("complete_subtree", _validate_task_id)(_subtree_job(complete_subtree, "updated"))
+register("archive_subtree", _validate_task_id)(_subtree_job(archive_subtree, "updated"))
+register("delete_subtree", _validate_task_id)(_subtree_job(delete_subtree, "deleted"))
+
+
+def _validate_ids(user: AbstractBaseUser | None, params: dict[str, Any]) -> dict[str, Any]:
+    """{"ids": [n, ...]}（所有者の確認は実行時にサービス層で行う）"""
+    ids = params.get("ids")
+    if not isinstance(ids, list) or not ids or not all(isinstance(pk, int) for pk in ids):
+        raise ValidationError("ids にタスクの id のリストを指定してください。")
+    return {"ids": ids}
+
+
+@register("bulk_archive", _validate_ids)
+def bulk_archive_job(job: Job, report: ReportFunc) -> dict[str, int]:
+    """一括アーカイブ API と同じ処理を、件数の上限（TASKS_BULK_MAX_ITEMS）ごとに分けて行う"""
+    ids = job.params["ids"]
+    size = settings.TASKS_BULK_MAX_ITEMS
+    updated = 0
+    for start in range(0, len(ids), size):
+        updated += bulk_archive_tasks(job.user, ids[start:start + size])
+        report(min(start + size, len(ids)), len(ids))
+    return {"updated": updated}
+
+
+def _validate_export(user: AbstractBaseUser | None, params: dict[str, Any]) -> dict[str, Any]:
+    """{"format": "csv" | "jsonl", "include_archived": bool}"""
+    output_format = params.get("format", "jsonl")
+    if output_format not in transfer.FORMATS:
+        raise ValidationError(f"format は {' / '.join(transfer.FORMATS)} のいずれかを指定してください。")
+    if user is None:
+        raise ValidationError("書き出すタスクの所有者が必要です。")
+    return {"format": output_format, "include_archived": bool(params.get("include_archived", False))}
+
+
+def export_path(job: Job) -> Path:
+    """書き出しジョブの出力ファイル"""
+    return Path(settings.TASKS_JOBS_EXPORT_DIR) / f"tasks-{job.pk}.{job.params['format']}"
+
+
+@register("export_tasks", _validate_export)
+def export_tasks_job(job: Job, report: ReportFunc) -> dict[str, Any]:
+    """ユーザーのタスクをファイルに書き出す（/api/tasks/jobs/<id>/download/ で取得する）"""
+    path = export_path(job)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    total = Task.objects.filter(user=job.user).count()
+    if job.params["include_archived"]:
+        total += ArchivedTask.objects.filter(user=job.user).count()
+    report(0, total)
+    with path.open("w", encoding="utf-8", newline="") as stream:
+        rows = transfer.export_tasks(
+            stream,
+            job.params["format"],
+            settings.TASKS_EXPORT_CHUNK_SIZE,
+            include_archived=job.params["include_archived"],
+            user_id=job.user_id,
+            on_chunk=report,
+        )
+    report(rows)
+    return {"rows": rows, "filename": path.name}
+
+
+def _validate_archive_trees(user: AbstractBaseUser | None, params: dict[str, Any]) -> dict[str, Any]:
+    """{"days": n}（省略時は settings.TASKS_ARCHIVE_AFTER_DAYS）"""
+    try:
+        days = int(params.get("days", settings.TASKS_ARCHIVE_AFTER_DAYS))
+    except (TypeError, ValueError):
+        raise ValidationError("days には日数を指定してください。")
+    return {"days": days}
+
+
+@register("archive_task_trees", _validate_archive_trees, staff_only=True)
+def archive_task_trees_job(job: Job, report: ReportFunc) -> dict[str, int]:
+    """archive_tasks コマンドと同じく、全ユーザーのアーカイブ済みツリーを保管テーブルに移す"""
+    older_than = timedelta(days=job.params["days"])
+    trees = moved = 0
+    while roots := list(archivable_roots(older_than)[: settings.TASKS_ARCHIVE_BATCH_SIZE]):
+        moved += archive_task_trees(roots)
+        trees += len(roots)
+        report(moved)
+    return {"moved": moved, "trees": trees}
@@ -0,0 +1,46 @@
+# task_manager/tasks/management/commands/archive_tasks.py
+
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from tasks.services import archivable_roots, archive_task_trees
+
+
+class Command(BaseCommand):
+    """
+    アーカイブ済みのツリーを Task から保管テーブル（ArchivedTask）に移す。
+    ツリー（トップレベルタスク）を --batch-size 件ずつ、1トランザクションで移す。
+    cron 等で定期的に実行する。
+
+    使用例:
+        python manage.py archive_tasks
+        python manage.py archive_tasks --days 30 --batch-size 100
+    """
+
+    help = "アーカイブ済みのタスクをツリーごと保管テーブルに移します。"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.TASKS_ARCHIVE_AFTER_DAYS,
+            help="この日数以上更新されていないツリーを移す（既定: settings.TASKS_ARCHIVE_AFTER_DAYS）",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.TASKS_ARCHIVE_BATCH_SIZE,
+            help="1トランザクションで移すツリーの数（既定: settings.TASKS_ARCHIVE_BATCH_SIZE）",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        older_than = timedelta(days=options["days"])
+        trees = moved = 0
+        # 移したツリーは Task から消えるため、毎回先頭から取り直す
+        while roots := list(archivable_roots(older_than)[: options["batch_size"]]):
+            moved += archive_task_trees(roots)
+            trees += len(roots)
+        self.stdout.write(self.style.SUCCESS(f"保管テーブルに移したタスク: {moved} 件（{trees} ツリー）"))
@@ -0,0 +1,63 @@
+# task_manager/tasks/management/commands/export_tasks.py
+
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from tasks.transfer import FORMATS, export_tasks, format_from_path
+
+
+class Command(BaseCommand):
+    """
+    タスクを CSV / JSONL に書き出す（import_tasks で取り込める形式）。
+    サーバーサイドカーソルで --chunk-size 件ずつ読み出すため、件数が増えてもメモリ使用量はほぼ一定。
+
+    使用例:
+        python manage.py export_tasks tasks.csv
+        python manage.py export_tasks - --format jsonl > tasks.jsonl
+        python manage.py export_tasks all.jsonl --include-archived
+    """
+
+    help = "タスクを CSV / JSONL ファイルに書き出します。"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("path", help="書き出し先のファイル（- なら標準出力）")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="出力形式（既定: ファイルの拡張子から判断。標準出力の場合は jsonl）",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.TASKS_EXPORT_CHUNK_SIZE,
+            help="1回に DB から読み出す件数（既定: settings.TASKS_EXPORT_CHUNK_SIZE）",
+        )
+        parser.add_argument(
+            "--include-archived",
+            action="store_true",
+            help="保管テーブル（ArchivedTask）のタスクも書き出す",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        path = options["path"]
+        output_format = options["format"] or format_from_path(path)
+        if output_format is None:
+            raise CommandError(f"拡張子から形式を判断できません。--format を指定してください: {path}")
+        start = time.perf_counter()
+
+        if path == "-":
+            count = export_tasks(self.stdout, output_format, options["chunk_size"], options["include_archived"])
+            report = self.stderr  # 標準出力はデータのため、結果は標準エラーに出す
+        else:
+            with open(path, "w", encoding="utf-8", newline="") as stream:
+                count = export_tasks(stream, output_format, options["chunk_size"], options["include_archived"])
+            report = self.stdout
+
+        elapsed = time.perf_counter() - start
+        report.write(self.style.SUCCESS(
+            f"書き出したタスク: {count} 件（{elapsed:.2f} 秒, {count / elapsed if elapsed else 0:,.0f} 件/s）"
+        ))
+
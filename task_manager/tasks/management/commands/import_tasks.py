@@ -0,0 +1,85 @@
+# task_manager/tasks/management/commands/import_tasks.py
+
+import sys
+import time
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from tasks.transfer import FORMATS, ImportResult, TaskImportError, format_from_path, import_tasks, read_rows
+
+
+class Command(BaseCommand):
+    """
+    export_tasks で書き出した CSV / JSONL（または同じ列を持つファイル）からタスクを取り込む。
+    ファイルは1行ずつ読み、--batch-size 件ずつ bulk_create して1トランザクションで確定する。
+    parent はファイル内の id で指定し、親が後ろの行にある場合（前方参照）も取り込める。
+
+    使用例:
+        python manage.py import_tasks tasks.csv
+        python manage.py import_tasks tasks.jsonl --batch-size 5000 --user admin@example.com
+        cat tasks.jsonl | python manage.py import_tasks - --format jsonl
+    """
+
+    help = "CSV / JSONL ファイルからタスクを一括で取り込みます。"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("path", help="取り込むファイル（- なら標準入力）")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="入力形式（既定: ファイルの拡張子から判断。標準入力の場合は jsonl）",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.TASKS_IMPORT_BATCH_SIZE,
+            help="1回の bulk_create（1トランザクション）で登録する件数（既定: settings.TASKS_IMPORT_BATCH_SIZE）",
+        )
+        parser.add_argument(
+            "--user",
+            help="すべてのタスクをこのユーザー（メールアドレス）の所有にする。省略時はファイルの user 列",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        path = options["path"]
+        input_format = options["format"] or format_from_path(path)
+        if input_format is None:
+            raise CommandError(f"拡張子から形式を判断できません。--format を指定してください: {path}")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size は 1 以上を指定してください。")
+        user = None
+        if options["user"]:
+            model = get_user_model()
+            user = model.objects.filter(**{model.USERNAME_FIELD: options["user"]}).first()
+            if user is None:
+                raise CommandError(f"ユーザーが見つかりません: {options['user']}")
+
+        start = time.perf_counter()
+        progress = ImportResult()
+
+        def on_batch(result: ImportResult) -> None:
+            progress.created, progress.batches = result.created, result.batches
+            if options["verbosity"] >= 2:
+                self.stdout.write(f"  {result.created} 件（{result.batches} バッチ）")
+
+        stream = sys.stdin if path == "-" else open(path, encoding="utf-8-sig", newline="")
+        try:
+            result = import_tasks(read_rows(stream, input_format), options["batch_size"], user, on_batch)
+        except TaskImportError as e:
+            raise CommandError(f"{e}（取り込み済み: {progress.created} 件）") from e
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"取り込んだタスク: {result.created} 件（{elapsed:.2f} 秒, "
+            f"{result.created / elapsed if elapsed else 0:,.0f} 件/s, {result.batches} バッチ）"
+        ))
+        for parent, children in result.unresolved.items():
+            self.stderr.write(self.style.WARNING(
+                f"親 {parent} がファイル内に見つからないため、最上位のタスクとして登録しました: {children}"
+            ))
@@ -0,0 +1,34 @@
+# task_manager/tasks/management/commands/prune_task_tombstones.py
+
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from tasks.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    """
+    差分同期用の削除記録（TaskTombstone）のうち、保持期間を過ぎたものを削除する。
+    cron 等で定期的に実行する。
+
+    使用例:
+        python manage.py prune_task_tombstones
+        python manage.py prune_task_tombstones --days 7
+    """
+
+    help = "保持期間を過ぎた削除済みタスクの記録を削除します。"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.TASKS_TOMBSTONE_RETENTION_DAYS,
+            help="保持する日数（既定: settings.TASKS_TOMBSTONE_RETENTION_DAYS）",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        deleted = prune_tombstones(timedelta(days=options["days"]))
+        self.stdout.write(self.style.SUCCESS(f"削除した記録: {deleted} 件"))
@@ -0,0 +1,24 @@
+# task_manager/tasks/management/commands/rebuild_subtask_counters.py
+
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tasks.services import refresh_subtask_counters
+
+
+class Command(BaseCommand):
+    """
+    Task.subtask_count / incomplete_subtask_count を実データから作り直す。
+
+    使用例:
+        python manage.py rebuild_subtask_counters
+    """
+
+    help = "子タスク数カウンタ（subtask_count / incomplete_subtask_count）を再集計します。"
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        with transaction.atomic():
+            fixed = refresh_subtask_counters()
+        self.stdout.write(self.style.SUCCESS(f"カウンタを修正したタスク: {fixed} 件"))
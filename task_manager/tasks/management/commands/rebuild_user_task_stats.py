@@ -0,0 +1,37 @@
+# task_manager/tasks/management/commands/rebuild_user_task_stats.py
+
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from tasks.stats import format_drift, refresh_user_stats
+
+
+class Command(BaseCommand):
+    """
+    ユーザー別タスク集計（UserTaskStats）を Task と保管テーブルから集計し直し、ずれを報告する。
+    ずれていたユーザーの行だけを書き直す。--verbosity 2 でユーザーごとのずれを表示する。
+
+    使用例:
+        python manage.py rebuild_user_task_stats
+        python manage.py rebuild_user_task_stats --user 3 --user 5 -v 2
+    """
+
+    help = "ユーザー別タスク集計（UserTaskStats）を再集計し、ずれていたユーザーを報告します。"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="対象のユーザー id（複数指定可。省略時は全ユーザー）",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        drifts = refresh_user_stats(options["user_ids"])
+        if options["verbosity"] >= 2:
+            for drift in drifts:
+                self.stdout.write(format_drift(drift))
+        style = self.style.WARNING if drifts else self.style.SUCCESS
+        self.stdout.write(style(f"集計を修正したユーザー: {len(drifts)} 件"))
@@ -0,0 +1,79 @@
+# task_manager/tasks/management/commands/run_workers.py
+
+import os
+import signal
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connections
+
+from tasks.jobs import requeue_stale_jobs, work
+
+
+class Command(BaseCommand):
+    """
+    バックグラウンドジョブ（tasks.jobs）を実行するワーカーを起動する。
+    --workers 個のスレッドが、Job テーブルから待機中のジョブを登録順に取り出して実行する。
+    外部のメッセージブローカーは不要。複数のプロセス・ホストで同時に起動してもよい
+    （ジョブの取り出しは条件付き UPDATE のため、同じジョブを二重に実行しない）。
+
+    SIGINT / SIGTERM を受け取ると、実行中のジョブを最後まで実行してから終了する。
+
+    使用例:
+        python manage.py run_workers
+        python manage.py run_workers --workers 4
+        python manage.py run_workers --once    # 待機中のジョブをすべて実行したら終了（cron 向け）
+    """
+
+    help = "バックグラウンドジョブのワーカーを起動します。"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.TASKS_JOBS_WORKERS,
+            help="ワーカー（スレッド）数（既定: settings.TASKS_JOBS_WORKERS）",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.TASKS_JOBS_POLL_INTERVAL,
+            help="キューが空のときに待つ秒数（既定: settings.TASKS_JOBS_POLL_INTERVAL）",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="待機中のジョブがなくなったら終了する",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["workers"] < 1:
+            raise CommandError("--workers は 1 以上を指定してください。")
+
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stderr.write(self.style.WARNING(f"進捗のない実行中のジョブを待機中に戻しました: {requeued} 件"))
+
+        stop = threading.Event()
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: stop.set())
+
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+        def run(index: int) -> int:
+            try:
+                return work(f"{prefix}:{index}", stop, options["poll_interval"], once=options["once"])
+            finally:
+                # スレッドごとの DB 接続を閉じる
+                connections.close_all()
+
+        if options["verbosity"] >= 1:
+            self.stdout.write(f"ワーカーを起動しました: {options['workers']} スレッド（{prefix}）")
+        with ThreadPoolExecutor(max_workers=options["workers"], thread_name_prefix="task-job") as pool:
+            done = sum(pool.map(run, range(options["workers"])))
+        self.stdout.write(self.style.SUCCESS(f"実行したジョブ: {done} 件"))
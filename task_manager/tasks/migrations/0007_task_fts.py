@@ -0,0 +1,79 @@
+# タスク全文検索用の FTS5 仮想テーブルと同期トリガーを作成する
+#
+# DDL はこのマイグレーションに固定で記述する（tasks.search を後から変更しても、
+# 過去のマイグレーションの結果が変わらないようにするため）。
+# テーブル再作成で失われたトリガーの復元は tasks.search.install_fts（post_migrate）が行う。
+
+from django.db import OperationalError, migrations
+
+CREATE_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_task_fts USING fts5(
+        title, description, completed_comment,
+        content='tasks_task', content_rowid='id', tokenize='trigram'
+    )
+"""
+
+CREATE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_task_fts_ai AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(rowid, title, description, completed_comment)
+        VALUES (new.id, new.title, new.description, new.completed_comment);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_task_fts_ad AFTER DELETE ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description, completed_comment)
+        VALUES ('delete', old.id, old.title, old.description, old.completed_comment);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_task_fts_au
+    AFTER UPDATE OF title, description, completed_comment ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description, completed_comment)
+        VALUES ('delete', old.id, old.title, old.description, old.completed_comment);
+        INSERT INTO tasks_task_fts(rowid, title, description, completed_comment)
+        VALUES (new.id, new.title, new.description, new.completed_comment);
+    END
+    """,
+]
+
+DROP = [
+    "DROP TRIGGER IF EXISTS tasks_task_fts_ai",
+    "DROP TRIGGER IF EXISTS tasks_task_fts_ad",
+    "DROP TRIGGER IF EXISTS tasks_task_fts_au",
+    "DROP TABLE IF EXISTS tasks_task_fts",
+]
+
+
+def create_fts(apps, schema_editor):
+    # FTS5（trigram）は SQLite のみ。使えない環境では作成せず、検索は部分一致にフォールバックする
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute(CREATE_TABLE)
+        except OperationalError:
+            # FTS5 未組み込み、または trigram 非対応（SQLite < 3.34）
+            return
+        for sql in CREATE_TRIGGERS:
+            cursor.execute(sql)
+        cursor.execute("INSERT INTO tasks_task_fts(tasks_task_fts) VALUES ('rebuild')")
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in DROP:
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# 既存タスクの親子関係からクロージャテーブルを構築する
+BACKFILL_SQL = """
+INSERT INTO tasks_taskclosure (ancestor_id, descendant_id, depth)
+WITH RECURSIVE chain(descendant_id, ancestor_id, depth) AS (
+    SELECT id, id, 0 FROM tasks_task
+    UNION ALL
+    SELECT chain.descendant_id, t.parent_id, chain.depth + 1
+    FROM chain JOIN tasks_task t ON t.id = chain.ancestor_id
+    WHERE t.parent_id IS NOT NULL
+)
+SELECT ancestor_id, descendant_id, depth FROM chain
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_task_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField(verbose_name='階層差')),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='tasks.task', verbose_name='祖先タスク')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='tasks.task', verbose_name='子孫タスク')),
+            ],
+            options={
+                'verbose_name': 'タスク階層',
+                'verbose_name_plural': 'タスク階層一覧',
+                'indexes': [models.Index(fields=['descendant', 'depth'], name='task_closure_desc_idx')],
+                'constraints': [models.UniqueConstraint(fields=('ancestor', 'descendant'), name='task_closure_unique')],
+            },
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:43
+
+from django.db import migrations, models
+
+
+# 既存データのカウンタを集計して初期化する
+FILL_COUNTERS_SQL = """
+UPDATE tasks_task SET
+    subtask_count = (
+        SELECT COUNT(*) FROM tasks_task AS child WHERE child.parent_id = tasks_task.id
+    ),
+    incomplete_subtask_count = (
+        SELECT COUNT(*) FROM tasks_task AS child
+        WHERE child.parent_id = tasks_task.id AND child.is_completed = FALSE
+    )
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_taskclosure'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='incomplete_subtask_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='未完了の子タスク数'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='subtask_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='子タスク数'),
+        ),
+        migrations.RunSQL(FILL_COUNTERS_SQL, migrations.RunSQL.noop),
+    ]
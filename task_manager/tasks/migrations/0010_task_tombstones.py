@@ -0,0 +1,44 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_task_subtask_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField(verbose_name='タスクID')),
+                ('user_id', models.BigIntegerField(blank=True, null=True, verbose_name='ユーザーID')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='削除日時')),
+            ],
+            options={
+                'verbose_name': '削除済みタスク',
+                'verbose_name_plural': '削除済みタスク一覧',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['updated_at', 'id'], name='task_updated_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='task_user_updated_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasktombstone',
+            index=models.Index(fields=['user_id', 'id'], name='task_tombstone_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasktombstone',
+            index=models.Index(fields=['deleted_at'], name='task_tombstone_deleted_idx'),
+        ),
+    ]
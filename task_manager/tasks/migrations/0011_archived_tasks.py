@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_task_tombstones'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='タスクID')),
+                ('title', models.CharField(max_length=200, verbose_name='タスク名')),
+                ('description', models.TextField(blank=True, verbose_name='タスク詳細')),
+                ('is_completed', models.BooleanField(default=False, verbose_name='タスクの完了状態')),
+                ('created_at', models.DateTimeField(verbose_name='タスク作成日時')),
+                ('updated_at', models.DateTimeField(verbose_name='最終更新日時')),
+                ('completed_comment', models.CharField(blank=True, max_length=200, verbose_name='完了時に記録するコメント（任意）')),
+                ('is_archived', models.BooleanField(default=True, verbose_name='タスクをアーカイブする')),
+                ('subtask_count', models.PositiveIntegerField(default=0, verbose_name='子タスク数')),
+                ('incomplete_subtask_count', models.PositiveIntegerField(default=0, verbose_name='未完了の子タスク数')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='保管日時')),
+                ('parent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='subtasks', to='tasks.archivedtask', verbose_name='親タスク')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_tasks', to=settings.AUTH_USER_MODEL, verbose_name='ユーザー')),
+            ],
+            options={
+                'verbose_name': '保管済みタスク',
+                'verbose_name_plural': '保管済みタスク一覧',
+                'indexes': [models.Index(fields=['-created_at', '-id'], name='archived_created_id_idx'), models.Index(fields=['user', '-created_at', '-id'], name='archived_user_created_id_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# 既存データ（Task と保管テーブルの合計）から集計して初期化する
+FILL_STATS_SQL = """
+INSERT INTO tasks_usertaskstats (user_id, task_count, completed_count, archived_count, open_subtask_count)
+SELECT
+    user_id,
+    COUNT(*),
+    SUM(CASE WHEN is_completed THEN 1 ELSE 0 END),
+    SUM(CASE WHEN is_archived THEN 1 ELSE 0 END),
+    SUM(CASE WHEN NOT is_completed AND parent_id IS NOT NULL THEN 1 ELSE 0 END)
+FROM (
+    SELECT user_id, is_completed, is_archived, parent_id FROM tasks_task WHERE user_id IS NOT NULL
+    UNION ALL
+    SELECT user_id, is_completed, is_archived, parent_id FROM tasks_archivedtask WHERE user_id IS NOT NULL
+) AS tasks
+GROUP BY user_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_archived_tasks'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTaskStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='task_stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='ユーザー')),
+                ('task_count', models.IntegerField(default=0, verbose_name='タスク数')),
+                ('completed_count', models.IntegerField(default=0, verbose_name='完了したタスク数')),
+                ('archived_count', models.IntegerField(default=0, verbose_name='アーカイブ済みのタスク数')),
+                ('open_subtask_count', models.IntegerField(default=0, verbose_name='未完了の子タスク数')),
+            ],
+            options={
+                'verbose_name': 'ユーザー別タスク集計',
+                'verbose_name_plural': 'ユーザー別タスク集計一覧',
+            },
+        ),
+        migrations.RunSQL(FILL_STATS_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0012_user_task_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50, verbose_name='種類')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='引数')),
+                ('status', models.CharField(choices=[('queued', '待機中'), ('running', '実行中'), ('succeeded', '完了'), ('failed', '失敗')], default='queued', max_length=10, verbose_name='状態')),
+                ('progress', models.PositiveIntegerField(default=0, verbose_name='処理済み件数')),
+                ('total', models.PositiveIntegerField(blank=True, null=True, verbose_name='全体の件数')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='結果')),
+                ('error', models.TextField(blank=True, default='', verbose_name='エラー')),
+                ('worker', models.CharField(blank=True, default='', max_length=100, verbose_name='ワーカー')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='登録日時')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='開始日時')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='終了日時')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='最終更新日時')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='task_jobs', to=settings.AUTH_USER_MODEL, verbose_name='ユーザー')),
+            ],
+            options={
+                'verbose_name': 'ジョブ',
+                'verbose_name_plural': 'ジョブ一覧',
+                'indexes': [models.Index(fields=['status', 'id'], name='task_job_status_idx'), models.Index(fields=['user', '-id'], name='task_job_user_idx')],
+            },
+        ),
+    ]
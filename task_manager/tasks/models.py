@@ -1,7 +1,10 @@
 # tasks/models.py
 
+from typing import Any
+
 from django.conf import settings
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
 
 class Task(models.Model):
     """
@@ -13,6 +16,7 @@ class Task(models.Model):
     - created_at: タスク作成日時（自動で設定）
     - completed_comment: 完了時のコメント（任意）
     - is_archived: タスクのアーカイブ状態（True: アーカイブ済み、False: 通常タスク）
+    - subtask_count / incomplete_subtask_count: 直下の子タスク数・未完了の子タスク数
     """
 
     # タスクのタイトル（必須）
@@ -39,6 +43,12 @@ class Task(models.Model):
     # 親タスク
     parent = models.ForeignKey("self", verbose_name="親タスク", on_delete=models.CASCADE, related_name="subtasks", null=True, blank=True)
 
+    # 子タスク数（非正規化カラム。tasks.signals / tasks.services が F() 式で増減する）
+    subtask_count = models.PositiveIntegerField(verbose_name="子タスク数", default=0, editable=False)
+
+    # 未完了の子タスク数（同上）
+    incomplete_subtask_count = models.PositiveIntegerField(verbose_name="未完了の子タスク数", default=0, editable=False)
+
     # ユーザーとの紐づけ
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,  # カスタムユーザーを参照
@@ -50,6 +60,13 @@ class Task(models.Model):
     )
 
 
+    # 保存時に変更前の値と比較する必要があるフィールド（attname）
+    TRACKED_FIELDS = ("parent_id", "is_completed", "is_archived", "user_id")
+
+    # F() 式の UPDATE でのみ書き換えるカウンタ（通常の save() では書き込まない）
+    COUNTER_FIELDS = ("subtask_count", "incomplete_subtask_count")
+
+
     def __str__(self) -> str:
         """
         管理画面やシェルでタスクオブジェクトを表示した際の文字列
@@ -58,6 +75,327 @@ class Task(models.Model):
         return self.title
 
 
+    @classmethod
+    def from_db(cls, db: str | None, field_names: Any, values: Any) -> "Task":
+        """
+        DB から読み込んだ時点の TRACKED_FIELDS の値を記録しておく。
+        post_save シグナルで親の付け替え等を検出するために使う。
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            name: value
+            for name, value in zip(field_names, values)
+            if name in cls.TRACKED_FIELDS and value is not models.DEFERRED
+        }
+        return instance
+
+
+    def loaded_value(self, attname: str) -> Any:
+        """
+        最後に DB と同期した時点の値を返す。
+        記録がない（新規作成・未読込）場合は現在の値を返す。
+        """
+        return getattr(self, "_loaded_values", {}).get(attname, getattr(self, attname))
+
+
+    def changed_tracked_fields(self, update_fields: Any = None) -> set[str]:
+        """
+        TRACKED_FIELDS のうち、最後に DB と同期した時点から値が変わったもの（attname）を返す。
+        update_fields が指定された場合は、保存対象のフィールドだけを比較する。
+        """
+        changed = set()
+        for attname in self.TRACKED_FIELDS:
+            name = self._meta.get_field(attname).name
+            if update_fields is not None and name not in update_fields and attname not in update_fields:
+                continue
+            if self.loaded_value(attname) != getattr(self, attname):
+                changed.add(attname)
+        return changed
+
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """
+        post_save シグナルで行う階層インデックス等の更新と同じトランザクションで保存する。
+
+        既存行の更新では COUNTER_FIELDS を書き込まない。メモリ上の古いカウンタ値で
+        子タスク側の F() 式による更新を上書きしないため。
+        """
+        if kwargs.get("update_fields") is None and not self._state.adding:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.COUNTER_FIELDS and f.attname not in deferred
+            ]
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+        # 保存した値を「DB と同期済みの値」として記録し直す
+        update_fields = kwargs.get("update_fields")
+        loaded = getattr(self, "_loaded_values", {})
+        for attname in self.TRACKED_FIELDS:
+            name = self._meta.get_field(attname).name
+            if update_fields is None or name in update_fields or attname in update_fields:
+                loaded[attname] = getattr(self, attname)
+        self._loaded_values = loaded
+
+
+    def clean(self) -> None:
+        """
+        自分自身や子孫タスクを親に指定できないようにする。
+        """
+        super().clean()
+        if self.parent_id is None or self.pk is None:
+            return
+        if self.parent_id == self.pk or TaskClosure.objects.filter(
+            ancestor_id=self.pk, descendant_id=self.parent_id
+        ).exists():
+            raise ValidationError({"parent": "自分自身または子孫タスクを親タスクにはできません。"})
+
+
     class Meta:
         verbose_name = "タスク"
-        verbose_name_plural = "タスク一覧"
\ No newline at end of file
+        verbose_name_plural = "タスク一覧"
+        indexes = [
+            # キーセットページネーション (created_at, id) 用
+            models.Index(fields=["-created_at", "-id"], name="task_created_id_idx"),
+            # ユーザー別一覧のキーセットページネーション用
+            models.Index(fields=["user", "-created_at", "-id"], name="task_user_created_id_idx"),
+            # 差分同期（/api/tasks/changes/）の (updated_at, id) キーセット用
+            models.Index(fields=["updated_at", "id"], name="task_updated_id_idx"),
+            models.Index(fields=["user", "updated_at", "id"], name="task_user_updated_id_idx"),
+        ]
+
+
+class TaskClosure(models.Model):
+    """
+    タスク階層のクロージャテーブル。
+
+    祖先・子孫の全組み合わせを (ancestor, descendant, depth) として保持し、
+    サブツリーや祖先一覧を階層の深さに関係なく1回のクエリで取得できるようにする。
+    自分自身との組（depth=0）も含む。
+
+    行の追加・付け替えは tasks.signals 経由で tasks.services が行い、
+    Task の削除時は外部キーの CASCADE で削除される。
+
+    フィールド:
+    - ancestor: 祖先タスク
+    - descendant: 子孫タスク
+    - depth: ancestor から descendant までの階層差（親子なら 1）
+    """
+
+    ancestor = models.ForeignKey(
+        Task, verbose_name="祖先タスク", on_delete=models.CASCADE, related_name="descendant_links"
+    )
+    descendant = models.ForeignKey(
+        Task, verbose_name="子孫タスク", on_delete=models.CASCADE, related_name="ancestor_links"
+    )
+    depth = models.PositiveIntegerField(verbose_name="階層差")
+
+
+    def __str__(self) -> str:
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
+
+
+    class Meta:
+        verbose_name = "タスク階層"
+        verbose_name_plural = "タスク階層一覧"
+        constraints = [
+            models.UniqueConstraint(fields=["ancestor", "descendant"], name="task_closure_unique"),
+        ]
+        indexes = [
+            # 祖先一覧（descendant 側からの検索）用
+            models.Index(fields=["descendant", "depth"], name="task_closure_desc_idx"),
+        ]
+
+
+class ArchivedTask(models.Model):
+    """
+    アーカイブ済みタスクの保管テーブル（コールドストア）。
+
+    サブツリー全体がアーカイブ済みのトップレベルタスクを、archive_tasks コマンドが
+    Task からツリーごと移す。Task テーブルとそのインデックスを進行中のタスクの量に保つため。
+    id は移動前の Task の id をそのまま使う。
+
+    一覧で is_archived=True を指定した場合だけ、Task と合わせて読み出される（read-through）。
+    全文検索の索引は持たず、キーワード検索は部分一致で行う。
+
+    フィールドは Task と同じ名前・列名で持つ（移動を INSERT ... SELECT 1文で行うため）。
+    - archived_at: 保管テーブルに移した日時
+    """
+
+    id = models.BigIntegerField(verbose_name="タスクID", primary_key=True)
+    title = models.CharField(verbose_name="タスク名", max_length=200)
+    description = models.TextField(verbose_name="タスク詳細", blank=True)
+    is_completed = models.BooleanField(verbose_name="タスクの完了状態", default=False)
+    created_at = models.DateTimeField(verbose_name="タスク作成日時")
+    updated_at = models.DateTimeField(verbose_name="最終更新日時")
+    completed_comment = models.CharField(verbose_name="完了時に記録するコメント（任意）", max_length=200, blank=True)
+    is_archived = models.BooleanField(verbose_name="タスクをアーカイブする", default=True)
+    parent = models.ForeignKey(
+        "self", verbose_name="親タスク", on_delete=models.CASCADE, related_name="subtasks", null=True, blank=True
+    )
+    subtask_count = models.PositiveIntegerField(verbose_name="子タスク数", default=0)
+    incomplete_subtask_count = models.PositiveIntegerField(verbose_name="未完了の子タスク数", default=0)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        verbose_name="ユーザー",
+        on_delete=models.CASCADE,
+        related_name="archived_tasks",
+        null=True,
+        blank=True,
+    )
+    archived_at = models.DateTimeField(verbose_name="保管日時", auto_now_add=True)
+
+
+    def __str__(self) -> str:
+        return self.title
+
+
+    class Meta:
+        verbose_name = "保管済みタスク"
+        verbose_name_plural = "保管済みタスク一覧"
+        indexes = [
+            # 一覧のキーセットページネーション用（Task と同じキー）
+            models.Index(fields=["-created_at", "-id"], name="archived_created_id_idx"),
+            models.Index(fields=["user", "-created_at", "-id"], name="archived_user_created_id_idx"),
+        ]
+
+
+class TaskTombstone(models.Model):
+    """
+    削除されたタスクの記録（差分同期 API で削除をクライアントに伝えるためのログ）。
+
+    Task の post_delete シグナル（カスケードで削除された子タスクを含む）で1行ずつ追加される。
+    Task への外部キーは持たず、削除後も id だけを残す。
+    差分同期のカーソルは自動採番の id の単調増加を使う。
+    古い行は prune_task_tombstones コマンドで削除する。
+
+    フィールド:
+    - task_id: 削除されたタスクの id
+    - user_id: 削除されたタスクの所有ユーザーの id（ユーザー別の差分取得用）
+    - deleted_at: 削除日時
+    """
+
+    task_id = models.BigIntegerField(verbose_name="タスクID")
+    user_id = models.BigIntegerField(verbose_name="ユーザーID", null=True, blank=True)
+    deleted_at = models.DateTimeField(verbose_name="削除日時", auto_now_add=True)
+
+
+    def __str__(self) -> str:
+        return f"{self.task_id} ({self.deleted_at:%Y-%m-%d %H:%M})"
+
+
+    class Meta:
+        verbose_name = "削除済みタスク"
+        verbose_name_plural = "削除済みタスク一覧"
+        indexes = [
+            models.Index(fields=["user_id", "id"], name="task_tombstone_user_idx"),
+            models.Index(fields=["deleted_at"], name="task_tombstone_deleted_idx"),
+        ]
+
+
+class UserTaskStats(models.Model):
+    """
+    ユーザーごとのタスク件数の集計（ロールアップ）。
+
+    ホーム画面や /api/tasks/stats/ が Task を集計せずに件数を表示するための非正規化テーブル。
+    Task と保管テーブル（ArchivedTask）の合計を保持する（保管テーブルへの移動では変わらない）。
+    tasks.signals と tasks.services の一括操作が、変化した分だけ増減する（tasks.stats）。
+    ずれた場合は rebuild_user_task_stats コマンドで集計し直す。
+
+    件数がずれても書き込みを失敗させないよう、符号付きの整数で持つ。
+
+    フィールド:
+    - task_count: タスク数
+    - completed_count: 完了したタスク数
+    - archived_count: アーカイブ済みのタスク数
+    - open_subtask_count: 未完了の子タスク（親を持つタスク）数
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        verbose_name="ユーザー",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="task_stats",
+    )
+    task_count = models.IntegerField(verbose_name="タスク数", default=0)
+    completed_count = models.IntegerField(verbose_name="完了したタスク数", default=0)
+    archived_count = models.IntegerField(verbose_name="アーカイブ済みのタスク数", default=0)
+    open_subtask_count = models.IntegerField(verbose_name="未完了の子タスク数", default=0)
+
+
+    def __str__(self) -> str:
+        return f"{self.user_id}: {self.task_count}"
+
+
+    class Meta:
+        verbose_name = "ユーザー別タスク集計"
+        verbose_name_plural = "ユーザー別タスク集計一覧"
+
+
+class Job(models.Model):
+    """
+    バックグラウンドで実行する長い処理（ジョブ）。DB のテーブルをそのままキューとして使う。
+
+    API（/api/tasks/jobs/）や tasks.jobs.enqueue() で queued として登録し、
+    run_workers コマンドのワーカーが取り出して running → succeeded / failed に進める。
+    処理中は progress / total に進捗を書き込み、updated_at を生存確認（ハートビート）に使う。
+
+    フィールド:
+    - kind: ジョブの種類（tasks.jobs.register() で登録した名前）
+    - params: ジョブの引数（JSON）
+    - status: queued / running / succeeded / failed
+    - user: 登録したユーザー（処理対象のタスクの所有者）
+    - progress / total: 処理済みの件数と全体の件数（全体が分からないジョブは total なし）
+    - result: 結果（JSON）
+    - error: 失敗した場合のトレースバック
+    - worker: 実行中・実行したワーカーの名前
+    - created_at / started_at / finished_at / updated_at: 登録・開始・終了・最終更新日時
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "待機中"),
+        (RUNNING, "実行中"),
+        (SUCCEEDED, "完了"),
+        (FAILED, "失敗"),
+    ]
+
+    kind = models.CharField(verbose_name="種類", max_length=50)
+    params = models.JSONField(verbose_name="引数", default=dict, blank=True)
+    status = models.CharField(verbose_name="状態", max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        verbose_name="ユーザー",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="task_jobs",
+    )
+    progress = models.PositiveIntegerField(verbose_name="処理済み件数", default=0)
+    total = models.PositiveIntegerField(verbose_name="全体の件数", null=True, blank=True)
+    result = models.JSONField(verbose_name="結果", null=True, blank=True)
+    error = models.TextField(verbose_name="エラー", blank=True, default="")
+    worker = models.CharField(verbose_name="ワーカー", max_length=100, blank=True, default="")
+    created_at = models.DateTimeField(verbose_name="登録日時", auto_now_add=True)
+    started_at = models.DateTimeField(verbose_name="開始日時", null=True, blank=True)
+    finished_at = models.DateTimeField(verbose_name="終了日時", null=True, blank=True)
+    updated_at = models.DateTimeField(verbose_name="最終更新日時", auto_now=True)
+
+
+    def __str__(self) -> str:
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+    class Meta:
+        verbose_name = "ジョブ"
+        verbose_name_plural = "ジョブ一覧"
+        indexes = [
+            # ワーカーが待機中のジョブを登録順に取り出す
+            models.Index(fields=["status", "id"], name="task_job_status_idx"),
+            models.Index(fields=["user", "-id"], name="task_job_user_idx"),
+        ]
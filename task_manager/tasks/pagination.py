@@ -0,0 +1,325 @@
+# task_manager/tasks/pagination.py
+
+from __future__ import annotations
+
+import base64
+import binascii
+import heapq
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Iterator, Sequence
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Model, Q
+from django.db.models.query import QuerySet
+from django.utils.functional import cached_property
+
+
+# カーソルの進行方向
+NEXT = "next"
+PREV = "prev"
+
+
+class InvalidCursor(ValueError):
+    """デコードできないカーソル文字列が渡された場合の例外"""
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """
+    キーセットページネーションの位置情報。
+
+    Attributes:
+        direction (str): "next"（古い方へ進む）または "prev"（新しい方へ戻る）
+        created_at (datetime): 基準となる行の作成日時
+        pk (int): 基準となる行の主キー（created_at が同値の場合のタイブレーク）
+    """
+
+    direction: str
+    created_at: datetime
+    pk: int
+
+
+@dataclass
+class CursorPage:
+    """
+    1ページ分の結果。
+
+    Attributes:
+        items (list): ページ内の行（モデルインスタンスまたは dict）
+        next_cursor (str | None): 次ページ取得用の不透明なカーソル。最終ページなら None
+        prev_cursor (str | None): 前ページ取得用の不透明なカーソル。先頭ページなら None
+        page_size (int): 適用されたページサイズ
+    """
+
+    items: list[Any]
+    next_cursor: str | None
+    prev_cursor: str | None
+    page_size: int
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    """Cursor を URL セーフな不透明文字列に変換する"""
+    payload = json.dumps(
+        {"d": cursor.direction, "t": cursor.created_at.isoformat(), "i": cursor.pk},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(value: str) -> Cursor:
+    """
+    encode_cursor で生成した文字列を Cursor に戻す。
+
+    Raises:
+        InvalidCursor: 文字列が壊れている・改ざんされている場合
+    """
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = payload["d"]
+        created_at = datetime.fromisoformat(payload["t"])
+        pk = int(payload["i"])
+    except (binascii.Error, ValueError, TypeError, KeyError, UnicodeDecodeError) as e:
+        raise InvalidCursor("カーソルの形式が不正です。") from e
+
+    if direction not in (NEXT, PREV):
+        raise InvalidCursor("カーソルの形式が不正です。")
+    return Cursor(direction=direction, created_at=created_at, pk=pk)
+
+
+def get_page_size(value: str | int | None) -> int:
+    """
+    リクエストで指定されたページサイズを検証し、上限内に丸めて返す。
+
+    - 未指定（None / 空文字）の場合は settings.TASKS_PAGE_SIZE
+    - 1 未満は 1、settings.TASKS_MAX_PAGE_SIZE 超は上限値に丸める
+
+    Raises:
+        ValueError: 数値として解釈できない場合
+    """
+    if value is None or value == "":
+        return int(settings.TASKS_PAGE_SIZE)
+    size = int(value)
+    return max(1, min(size, int(settings.TASKS_MAX_PAGE_SIZE)))
+
+
+def _position(item: Any) -> tuple[datetime, int]:
+    """行（モデルインスタンス or dict）から (created_at, pk) を取り出す"""
+    if isinstance(item, dict):
+        return item["created_at"], item["id"]
+    return item.created_at, item.pk
+
+
+# 行から (created_at, pk) を取り出す関数
+PositionFunc = Callable[[Any], tuple[datetime, int]]
+
+
+def _make_cursor(direction: str, item: Any, position: PositionFunc = _position) -> str:
+    created_at, pk = position(item)
+    return encode_cursor(Cursor(direction=direction, created_at=created_at, pk=pk))
+
+
+def _window(queryset: QuerySet[Any], position: Cursor | None, size: int) -> QuerySet[Any]:
+    """カーソル位置から size + 1 件を取得するクエリセットを組み立てる（まだ評価しない）"""
+    if position is None or position.direction == NEXT:
+        queryset = queryset.order_by("-created_at", "-id")
+        if position is not None:
+            queryset = queryset.filter(
+                Q(created_at__lt=position.created_at)
+                | Q(created_at=position.created_at, id__lt=position.pk)
+            )
+    else:
+        # 前ページは昇順で取得してから反転する
+        queryset = queryset.order_by("created_at", "id").filter(
+            Q(created_at__gt=position.created_at)
+            | Q(created_at=position.created_at, id__gt=position.pk)
+        )
+    # 1件多く取得して前後ページの有無を判定する
+    return queryset[: size + 1]
+
+
+def _build_page(rows: list[Any], position: Cursor | None, size: int, key: PositionFunc) -> CursorPage:
+    """_window で取得した行からページとカーソルを組み立てる"""
+    has_more = len(rows) > size
+    if position is None or position.direction == NEXT:
+        items = rows[:size]
+        next_cursor = _make_cursor(NEXT, items[-1], key) if has_more else None
+        prev_cursor = _make_cursor(PREV, items[0], key) if position is not None and items else None
+    else:
+        items = rows[:size][::-1]
+        prev_cursor = _make_cursor(PREV, items[0], key) if has_more else None
+        next_cursor = _make_cursor(NEXT, items[-1], key) if items else None
+
+    return CursorPage(
+        items=items,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+        page_size=size,
+    )
+
+
+def paginate_by_cursor(
+    queryset: QuerySet[Any],
+    cursor: str | None = None,
+    page_size: int | str | None = None,
+    key: PositionFunc = _position,
+) -> CursorPage:
+    """
+    (created_at, id) をキーにしたキーセットページネーションを行う。
+
+    OFFSET を使わず「前ページ最後の行より古い行」を WHERE 句で絞り込むため、
+    何ページ目であっても (created_at, id) のインデックスを辿るだけで済む。
+    並び順は常に created_at 降順・id 降順（get_filtered_tasks と同じ）。
+
+    Args:
+        queryset (QuerySet): 絞り込み済みのクエリセット（並び順は上書きされる）
+        cursor (str | None): 前回レスポンスの next / prev カーソル。None なら先頭ページ
+        page_size (int | None): 1ページの件数。None なら settings.TASKS_PAGE_SIZE
+        key (Callable): 行から (created_at, pk) を取り出す関数。
+            既定はモデルインスタンスと values() の dict に対応。values_list() の場合は指定する
+
+    Returns:
+        CursorPage: ページ内の行と前後ページのカーソル
+
+    Raises:
+        InvalidCursor: カーソルが不正な場合
+    """
+    size = get_page_size(page_size)
+    position = decode_cursor(cursor) if cursor else None
+    rows = list(_window(queryset, position, size))
+    return _build_page(rows, position, size, key)
+
+
+async def apaginate_by_cursor(
+    queryset: QuerySet[Any],
+    cursor: str | None = None,
+    page_size: int | str | None = None,
+    key: PositionFunc = _position,
+) -> CursorPage:
+    """paginate_by_cursor の非同期版（async ORM で行を取得する）"""
+    size = get_page_size(page_size)
+    position = decode_cursor(cursor) if cursor else None
+    rows = [row async for row in _window(queryset, position, size)]
+    return _build_page(rows, position, size, key)
+
+
+def _merge_windows(windows: list[list[Any]], position: Cursor | None, size: int, key: PositionFunc) -> list[Any]:
+    """取得元ごとの _window の結果を、並び順を保って size + 1 件に併合する"""
+    descending = position is None or position.direction == NEXT
+    merged = heapq.merge(*windows, key=key, reverse=descending)
+    return list(islice(merged, size + 1))
+
+
+def first_page(querysets: Sequence[QuerySet[Any]], page_size: int | str | None = None) -> CursorPage:
+    """
+    キーセットで分割できない並び順（全文検索の適合度順など）の一覧の、先頭 page_size 件を返す。
+
+    取得元を順に連結し、足りない件数だけを次の取得元から読む。
+    next_cursor / prev_cursor は常に None（2ページ目以降はない）。
+
+    Raises:
+        ValueError: page_size が数値として解釈できない場合
+    """
+    size = get_page_size(page_size)
+    items: list[Any] = []
+    for queryset in querysets:
+        if len(items) >= size:
+            break
+        items.extend(queryset[: size - len(items)])
+    return CursorPage(items=items, next_cursor=None, prev_cursor=None, page_size=size)
+
+
+def paginate_merged(
+    querysets: Sequence[QuerySet[Any]],
+    cursor: str | None = None,
+    page_size: int | str | None = None,
+    key: PositionFunc = _position,
+) -> CursorPage:
+    """
+    複数のクエリセット（Task と ArchivedTask 等）を1つの一覧としてページ分割する。
+
+    各クエリセットからカーソル位置以降の size + 1 件をそれぞれ取得し、
+    (created_at, id) の順に併合する。クエリ数は取得元の数と同じで、
+    各取得元ではそれぞれの (created_at, id) インデックスを辿るだけで済む。
+    引数と戻り値は paginate_by_cursor と同じ（取得元が1つなら結果も同じ）。
+    """
+    size = get_page_size(page_size)
+    position = decode_cursor(cursor) if cursor else None
+    windows = [list(_window(queryset, position, size)) for queryset in querysets]
+    return _build_page(_merge_windows(windows, position, size, key), position, size, key)
+
+
+async def apaginate_merged(
+    querysets: Sequence[QuerySet[Any]],
+    cursor: str | None = None,
+    page_size: int | str | None = None,
+    key: PositionFunc = _position,
+) -> CursorPage:
+    """paginate_merged の非同期版"""
+    size = get_page_size(page_size)
+    position = decode_cursor(cursor) if cursor else None
+    windows = [[row async for row in _window(queryset, position, size)] for queryset in querysets]
+    return _build_page(_merge_windows(windows, position, size, key), position, size, key)
+
+
+# ------------------------------------
+# 件数の推定（管理画面の一覧）
+# ------------------------------------
+def estimated_row_count(model: type[Model], using: str = "default") -> int | None:
+    """
+    テーブル全体の行数の推定値を、COUNT(*) で全件を走査せずに返す。
+
+    - SQLite: ANALYZE（PRAGMA optimize）済みなら sqlite_stat1 の行数、なければ主キーの最大値
+      （削除された行の分だけ多めになる）
+    - PostgreSQL: pg_class.reltuples（一度も ANALYZE されていなければ None）
+    - それ以外: None
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone():
+                # stat の先頭の数値がテーブルの行数
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+                row = cursor.fetchone()
+                if row:
+                    return int(row[0].split()[0])
+            return model._default_manager.using(using).aggregate(n=Max("pk"))["n"] or 0
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+            row = cursor.fetchone()
+            return row[0] if row and row[0] >= 0 else None
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    全件の COUNT(*) を避ける Paginator（管理画面の一覧用）。
+
+    - 絞り込みのないクエリセット: estimated_row_count によるテーブルの推定行数
+    - 絞り込みあり（または推定できない場合）: settings.TASKS_ADMIN_COUNT_LIMIT 件で打ち切った COUNT。
+      上限を超える場合は上限値を件数とする（それより後ろのページは検索条件で絞り込む）
+    """
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+        if not queryset.query.has_filters():
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None:
+                return estimate
+        return queryset.order_by()[: settings.TASKS_ADMIN_COUNT_LIMIT].count()
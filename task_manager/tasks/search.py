@@ -0,0 +1,162 @@
+# task_manager/tasks/search.py
+
+"""
+SQLite FTS5 を用いたタスクの全文検索。
+
+tasks_task を外部コンテンツとする FTS5 仮想テーブル tasks_task_fts を作成し、
+INSERT / UPDATE / DELETE トリガーで Task と同期させる。
+トークナイザには日本語（分かち書きなし）でも部分一致できる trigram を使う。
+
+FTS5（trigram）が使えない環境や SQLite 以外のデータベースでは
+何も作成せず、get_filtered_tasks は従来の icontains 検索にフォールバックする。
+"""
+
+from __future__ import annotations
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models.expressions import RawSQL
+from django.db.models.query import QuerySet
+
+from .models import Task
+
+# FTS5 仮想テーブル名
+FTS_TABLE = "tasks_task_fts"
+
+# trigram トークナイザは3文字未満のクエリにマッチしない
+MIN_QUERY_LENGTH = 3
+
+# 索引対象のカラム
+FTS_COLUMNS = ("title", "description", "completed_comment")
+
+_TRIGGERS = {
+    f"{FTS_TABLE}_ai": """
+        CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON tasks_task BEGIN
+            INSERT INTO {table}(rowid, title, description, completed_comment)
+            VALUES (new.id, new.title, new.description, new.completed_comment);
+        END
+    """,
+    f"{FTS_TABLE}_ad": """
+        CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON tasks_task BEGIN
+            INSERT INTO {table}({table}, rowid, title, description, completed_comment)
+            VALUES ('delete', old.id, old.title, old.description, old.completed_comment);
+        END
+    """,
+    f"{FTS_TABLE}_au": """
+        CREATE TRIGGER IF NOT EXISTS {table}_au
+        AFTER UPDATE OF title, description, completed_comment ON tasks_task BEGIN
+            INSERT INTO {table}({table}, rowid, title, description, completed_comment)
+            VALUES ('delete', old.id, old.title, old.description, old.completed_comment);
+            INSERT INTO {table}(rowid, title, description, completed_comment)
+            VALUES (new.id, new.title, new.description, new.completed_comment);
+        END
+    """,
+}
+
+# 接続エイリアスごとの FTS 利用可否キャッシュ
+_available: dict[str, bool] = {}
+
+
+def install_fts(connection: BaseDatabaseWrapper) -> bool:
+    """
+    FTS5 仮想テーブルと同期トリガーを作成する（何度呼んでも安全）。
+
+    SQLite はテーブル再作成（ALTER 相当のマイグレーション）でトリガーを
+    破棄するため、post_migrate からも呼び出してトリガーを復元する。
+    トリガーを作り直した場合は索引を再構築して取りこぼしを防ぐ。
+
+    Returns:
+        bool: FTS を利用できる状態になった場合 True
+    """
+    _available.pop(connection.alias, None)
+    if connection.vendor != "sqlite":
+        return False
+    if "tasks_task" not in connection.introspection.table_names():
+        return False
+
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"{', '.join(FTS_COLUMNS)}, "
+                "content='tasks_task', content_rowid='id', tokenize='trigram')"
+            )
+        except OperationalError:
+            # FTS5 未組み込み、または trigram 非対応（SQLite < 3.34）
+            return False
+
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'tasks_task'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in _TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(_TRIGGERS[name].format(table=FTS_TABLE))
+        if missing:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def uninstall_fts(connection: BaseDatabaseWrapper) -> None:
+    """install_fts で作成したトリガーと仮想テーブルを削除する"""
+    _available.pop(connection.alias, None)
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for name in _TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def fts_available(using: str = DEFAULT_DB_ALIAS) -> bool:
+    """指定した接続で FTS 索引が使えるかどうか（結果は接続ごとにキャッシュ）"""
+    if using not in _available:
+        connection = connections[using]
+        _available[using] = (
+            connection.vendor == "sqlite"
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _available[using]
+
+
+def build_match_expression(q: str) -> str:
+    """
+    検索キーワードを FTS5 のフレーズクエリに変換する。
+
+    キーワード全体を1つのフレーズとして扱うため、従来の icontains と同じく
+    「文字列をそのまま含む」行にマッチする。FTS5 の演算子は無効化される。
+    """
+    return '"' + q.replace('"', '""') + '"'
+
+
+def can_use_fts(q: str, using: str = DEFAULT_DB_ALIAS) -> bool:
+    """キーワード q の検索に FTS 索引を使えるかどうか"""
+    return len(q) >= MIN_QUERY_LENGTH and fts_available(using)
+
+
+def filter_by_fts(tasks: QuerySet[Task], q: str, ranked: bool = False) -> QuerySet[Task]:
+    """
+    FTS 索引で title / description / completed_comment を検索して絞り込む。
+
+    Args:
+        tasks (QuerySet[Task]): 絞り込み対象
+        q (str): 検索キーワード（can_use_fts(q) が True であること）
+        ranked (bool): True の場合 search_rank（bm25、小さいほど適合）を付与し、
+                       適合度順に並べ替える
+
+    Returns:
+        QuerySet[Task]: 絞り込み済みのクエリセット
+    """
+    match = build_match_expression(q)
+    tasks = tasks.filter(
+        id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+    )
+    if ranked:
+        tasks = tasks.annotate(
+            search_rank=RawSQL(
+                f"SELECT bm25({FTS_TABLE}) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND rowid = tasks_task.id",
+                [match],
+            )
+        ).order_by("search_rank", "-created_at", "-id")
+    return tasks
@@ -1,26 +1,45 @@
 # task_manager/tasks/services.py
 
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Iterable, Iterator
+
+from django.conf import settings
+from django.contrib.auth.base_user import AbstractBaseUser
 from django.core.exceptions import ValidationError
-from django.db.models import Q
+from django.db import connection, transaction
+from django.db.models import Count, Exists, F, Max, OuterRef, Q, Subquery
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.db.models.query import QuerySet
-from .models import Task
+from . import events, stats
+from .cache import bump_generation, invalidate_all
+from .models import ArchivedTask, Task, TaskClosure, TaskTombstone
+from .search import can_use_fts, filter_by_fts
 
 
 def get_filtered_tasks(
     q: str | None = None,
     is_completed: bool | None = None,
     is_archived: bool | None = None,
+    ranked: bool = False,
 ) -> QuerySet[Task]:
     """
     条件に合致した Task のクエリセットを返す。
 
     タスクは以下の条件で絞り込みや検索が可能です：
     - フィルター: is_completed, is_archived
-    - 検索: title, completed_comment
-    - ソート: created_at 降順
+    - 検索: title, description, completed_comment（FTS5 索引。使えない場合は部分一致）
+    - ソート: created_at 降順（同時刻は id 降順）
+
+    並び順はキーセットページネーション（tasks.pagination.paginate_by_cursor）の
+    キー (created_at, id) と一致させているため、結果をそのままページ分割できる。
 
     Args:
-        q (str | None): 検索キーワード。title または completed_comment を部分一致検索。
+        q (str | None): 検索キーワード。3文字以上かつ FTS5 索引が使える場合は
+                        title / description / completed_comment を全文検索する。
+                        それ以外は title / description / completed_comment を部分一致検索。
                         None または空文字の場合は検索条件に含めない。
         is_completed (bool | None): 完了状態でのフィルタ。
                         True または False の場合のみ条件に適用。
@@ -28,17 +47,22 @@ def get_filtered_tasks(
         is_archived (bool | None): アーカイブ状態でのフィルタ。
                         True または False の場合のみ条件に適用。
                         None の場合は無視する。
+        ranked (bool): True かつ全文検索が行われた場合、適合度（bm25）順に並べる。
+                        適合度順の結果はキーセットページネーションには使えない。
 
     Returns:
         QuerySet[Task]: 検索条件に合致した Task のクエリセット。
     """
-    # すべてのタスクを対象に開始（作成日時降順）
-    tasks = Task.objects.all().order_by("-created_at")
+    # すべてのタスクを対象に開始（作成日時降順・id 降順）
+    tasks = Task.objects.all().order_by("-created_at", "-id")
 
-    # キーワード検索（タイトル・完了コメントの部分一致）
-    if q:
+    # キーワード検索（FTS5 索引、使えなければ索引と同じ列の部分一致）
+    if q and can_use_fts(q):
+        tasks = filter_by_fts(tasks, q, ranked=ranked)
+    elif q:
         tasks = tasks.filter(
             Q(title__icontains=q) |
+            Q(description__icontains=q) |
             Q(completed_comment__icontains=q)
         )
 
@@ -53,11 +77,56 @@ def get_filtered_tasks(
     return tasks
 
 
+def get_archived_tasks(
+    q: str | None = None,
+    is_completed: bool | None = None,
+) -> QuerySet[ArchivedTask]:
+    """
+    保管テーブル（ArchivedTask）から条件に合うタスクを返す。
+
+    並び順は get_filtered_tasks と同じ created_at 降順・id 降順。
+    保管テーブルは全文検索の索引を持たないため、キーワードは常に
+    タイトル・詳細・完了コメントの部分一致で検索する。
+    """
+    tasks = ArchivedTask.objects.all().order_by("-created_at", "-id")
+    if q:
+        tasks = tasks.filter(
+            Q(title__icontains=q) | Q(description__icontains=q) | Q(completed_comment__icontains=q)
+        )
+    if is_completed is not None:
+        tasks = tasks.filter(is_completed=is_completed)
+    return tasks
+
+
+def get_task_sources(
+    q: str | None = None,
+    is_completed: bool | None = None,
+    is_archived: bool | None = None,
+    ranked: bool = False,
+) -> list[QuerySet]:
+    """
+    一覧に表示するタスクの取得元（Task / ArchivedTask）ごとのクエリセットを返す。
+
+    is_archived=True の場合だけ、まだ Task に残っているアーカイブ済みタスクに加えて
+    保管テーブルのタスクも読み出す（read-through）。それ以外は Task のみ。
+    結果は tasks.pagination.paginate_merged でまとめてページ分割できる。
+    ranked=True の場合、Task は適合度順（get_filtered_tasks と同じ）になり、
+    キーセットでは分割できないため tasks.pagination.first_page で先頭だけを表示する。
+    """
+    sources: list[QuerySet] = [get_filtered_tasks(q, is_completed, is_archived, ranked=ranked)]
+    if is_archived:
+        sources.append(get_archived_tasks(q, is_completed))
+    return sources
+
+
 def complete_task(task: Task) -> Task:
     """
     子タスクがすべて完了していないと親タスクを完了できない。
+
+    判定は非正規化カラム incomplete_subtask_count で行う。メモリ上の task は
+    古い可能性があるため、主キー検索で DB 上の最新値を確認する。
     """
-    if task.subtasks.filter(is_completed=False).exists():
+    if Task.objects.filter(pk=task.pk, incomplete_subtask_count__gt=0).exists():
         raise ValidationError("子タスクが未完了です。親タスクを完了できません。")
 
     task.is_completed = True
@@ -71,4 +140,807 @@ def reopen_task(task: Task) -> Task:
     """
     task.is_completed = False
     task.save(update_fields=["is_completed"])
-    return task
\ No newline at end of file
+    return task
+
+
+# ------------------------------------
+# 子タスク数カウンタ
+# ------------------------------------
+def adjust_subtask_counters(parent_id: int | None, total: int = 0, incomplete: int = 0) -> None:
+    """
+    親タスクの subtask_count / incomplete_subtask_count を F() 式で増減する。
+
+    同時に updated_at も進め、一覧の進捗表示やキャッシュが親の変化として扱えるようにする。
+    通常は tasks.signals から、子の作成・削除・完了・再開・付け替え時に呼ばれる。
+    """
+    if parent_id is None or (total == 0 and incomplete == 0):
+        return
+    Task.objects.filter(pk=parent_id).update(
+        subtask_count=F("subtask_count") + total,
+        incomplete_subtask_count=F("incomplete_subtask_count") + incomplete,
+        updated_at=timezone.now(),
+    )
+
+
+def refresh_subtask_counters(task_ids: Iterable[int] | None = None) -> int:
+    """
+    子タスクを実際に集計してカウンタを作り直す（集合演算の UPDATE 1文）。
+
+    値がずれている行だけを更新する。bulk 操作などシグナルを経由しない書き込みの後や、
+    rebuild_subtask_counters コマンドから使う。
+
+    Args:
+        task_ids (Iterable[int] | None): 対象の親タスク id。None の場合は全件。
+
+    Returns:
+        int: カウンタを修正した行数
+    """
+    children = Task.objects.filter(parent=OuterRef("pk")).order_by().values("parent")
+    total = Coalesce(Subquery(children.annotate(n=Count("pk")).values("n")), 0)
+    incomplete = Coalesce(
+        Subquery(children.filter(is_completed=False).annotate(n=Count("pk")).values("n")), 0
+    )
+
+    tasks = Task.objects.all() if task_ids is None else Task.objects.filter(pk__in=list(task_ids))
+    drifted = (
+        tasks.annotate(actual_total=total, actual_incomplete=incomplete)
+        .filter(~Q(subtask_count=F("actual_total")) | ~Q(incomplete_subtask_count=F("actual_incomplete")))
+        .values("pk")
+    )
+    fixed = Task.objects.filter(pk__in=Subquery(drifted)).update(
+        subtask_count=total,
+        incomplete_subtask_count=incomplete,
+        updated_at=timezone.now(),
+    )
+    if fixed:
+        invalidate_all()
+    return fixed
+
+
+# ------------------------------------
+# 階層（クロージャテーブル）
+# ------------------------------------
+def attach_to_hierarchy(task: Task) -> None:
+    """
+    新規作成したタスクをクロージャテーブルに登録する。
+
+    自分自身との組（depth=0）と、親タスクの全祖先との組を1文で追加する。
+    通常は post_save シグナルから呼ばれる。
+    """
+    closure = TaskClosure._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {closure} (ancestor_id, descendant_id, depth)
+            SELECT ancestor_id, %s, depth + 1 FROM {closure} WHERE descendant_id = %s
+            UNION ALL
+            SELECT %s, %s, 0
+            """,
+            [task.pk, task.parent_id, task.pk, task.pk],
+        )
+
+
+def move_in_hierarchy(task: Task) -> None:
+    """
+    親を付け替えたタスクのサブツリーをクロージャテーブル上で移動する。
+
+    1. サブツリー内の各ノードと「旧親側の祖先」との組を削除
+    2. 新しい親の祖先 × サブツリーの組を追加
+
+    Raises:
+        ValidationError: 自分自身または子孫を親に指定した場合
+    """
+    if task.parent_id is not None and TaskClosure.objects.filter(
+        ancestor_id=task.pk, descendant_id=task.parent_id
+    ).exists():
+        raise ValidationError("自分自身または子孫タスクを親タスクにはできません。")
+
+    closure = TaskClosure._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            DELETE FROM {closure}
+            WHERE descendant_id IN (SELECT descendant_id FROM {closure} WHERE ancestor_id = %s)
+              AND ancestor_id NOT IN (SELECT descendant_id FROM {closure} WHERE ancestor_id = %s)
+            """,
+            [task.pk, task.pk],
+        )
+        if task.parent_id is not None:
+            cursor.execute(
+                f"""
+                INSERT INTO {closure} (ancestor_id, descendant_id, depth)
+                SELECT anc.ancestor_id, sub.descendant_id, anc.depth + sub.depth + 1
+                FROM {closure} AS anc, {closure} AS sub
+                WHERE anc.descendant_id = %s AND sub.ancestor_id = %s
+                """,
+                [task.parent_id, task.pk],
+            )
+
+
+def rebuild_task_closure(task_ids: Iterable[int] | None = None) -> None:
+    """
+    Task.parent をもとにクロージャテーブルの行を作り直す。
+
+    bulk_create などシグナルを経由しない書き込みの後に使う。
+
+    Args:
+        task_ids (Iterable[int] | None): 作り直すタスクの id。
+            None の場合は全件を作り直す。指定する場合は、その子孫もすべて含めること
+            （新規に一括登録したツリー全体など）。
+    """
+    closure = TaskClosure._meta.db_table
+    table = Task._meta.db_table
+    chain = f"""
+        WITH RECURSIVE chain(descendant_id, ancestor_id, depth) AS (
+            SELECT id, id, 0 FROM {table} WHERE {{where}}
+            UNION ALL
+            SELECT chain.descendant_id, t.parent_id, chain.depth + 1
+            FROM chain JOIN {table} t ON t.id = chain.ancestor_id
+            WHERE t.parent_id IS NOT NULL
+        )
+        SELECT ancestor_id, descendant_id, depth FROM chain
+    """
+    with connection.cursor() as cursor:
+        if task_ids is None:
+            cursor.execute(f"DELETE FROM {closure}")
+            cursor.execute(
+                f"INSERT INTO {closure} (ancestor_id, descendant_id, depth) " + chain.format(where="1 = 1")
+            )
+            return
+
+        ids = list(task_ids)
+        # SQLite のバインド変数上限を超えないよう分割する
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            placeholders = ", ".join(["%s"] * len(batch))
+            cursor.execute(f"DELETE FROM {closure} WHERE descendant_id IN ({placeholders})", batch)
+            cursor.execute(
+                f"INSERT INTO {closure} (ancestor_id, descendant_id, depth) "
+                + chain.format(where=f"id IN ({placeholders})"),
+                batch,
+            )
+
+
+def get_descendants(task: Task, include_self: bool = False) -> QuerySet[Task]:
+    """
+    タスクの子孫をすべて返す（階層の深さに関係なく1クエリ）。
+
+    Args:
+        task (Task): 起点のタスク
+        include_self (bool): True の場合は task 自身も含める
+    """
+    min_depth = 0 if include_self else 1
+    return Task.objects.filter(
+        ancestor_links__ancestor=task, ancestor_links__depth__gte=min_depth
+    )
+
+
+def get_ancestors(task: Task, include_self: bool = False) -> QuerySet[Task]:
+    """
+    タスクの祖先をルートから順に返す（1クエリ）。
+
+    Args:
+        task (Task): 起点のタスク
+        include_self (bool): True の場合は task 自身も末尾に含める
+    """
+    min_depth = 0 if include_self else 1
+    return Task.objects.filter(
+        descendant_links__descendant=task, descendant_links__depth__gte=min_depth
+    ).order_by("-descendant_links__depth")
+
+
+@dataclass
+class TaskTreeNode:
+    """
+    get_tree が返すツリーのノード。
+
+    Attributes:
+        task (Task): タスク
+        depth (int): ルートからの深さ（ルートは 0）
+        children (list[TaskTreeNode]): 子ノード（作成日時降順）
+    """
+
+    task: Task
+    depth: int
+    children: list["TaskTreeNode"] = field(default_factory=list)
+
+    def walk(self) -> Iterator["TaskTreeNode"]:
+        """自分自身から始めて、深さ優先（行きがけ順）でノードを返す"""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+def get_tree(root: Task) -> TaskTreeNode:
+    """
+    root をルートとするサブツリーを1クエリで取得し、ツリー構造に組み立てる。
+
+    兄弟ノードは作成日時降順（同時刻は id 降順）に並ぶ。
+    """
+    links = (
+        TaskClosure.objects.filter(ancestor=root)
+        .select_related("descendant")
+        .order_by("depth", "-descendant__created_at", "-descendant__id")
+    )
+    root_node = TaskTreeNode(task=root, depth=0)
+    nodes = {root.pk: root_node}
+    for link in links:
+        if link.depth == 0:
+            continue
+        node = TaskTreeNode(task=link.descendant, depth=link.depth)
+        nodes[link.descendant_id] = node
+        # depth 昇順に処理するため、親ノードは必ず登録済み
+        nodes[link.descendant.parent_id].children.append(node)
+    return root_node
+
+
+# ------------------------------------
+# サブツリー操作（WITH RECURSIVE）
+# ------------------------------------
+# Task.parent を再帰 CTE で辿り、子孫を Python に読み込まずに更新・削除する。
+# クロージャテーブルではなく parent を正とするため、階層インデックスの状態に依存しない。
+# シグナルは発火しないため、カウンタ・キャッシュ・変更フィード等は各関数の中で更新する。
+# 集計の増減はユーザーごとの集約クエリ（GROUP BY user_id）で求め、
+# 変更イベントもタスクごとではなくユーザーごとに1件（subtree）だけ送る。
+
+def _subtree_cte(table: str) -> str:
+    """root（%s）とその子孫の id を subtree(id) として返す WITH 句"""
+    return f"""
+        WITH RECURSIVE subtree(id) AS (
+            SELECT id FROM {table} WHERE id = %s
+            UNION ALL
+            SELECT child.id FROM {table} AS child JOIN subtree ON child.parent_id = subtree.id
+        )
+    """
+
+
+def subtree_ids(root_id: int) -> RawSQL:
+    """root_id とその子孫の id を返すサブクエリ（filter(pk__in=...) に渡す）"""
+    return RawSQL(_subtree_cte(Task._meta.db_table) + "SELECT id FROM subtree", [root_id])
+
+
+def _totals_by_user(tasks: QuerySet, root_id: int) -> list[dict]:
+    """
+    tasks をユーザーごとに集約する（行数はユーザー数。タスクは読み込まない）。
+
+    各行: user_id / total（件数）/ completed / archived / open_subtasks（親を持つ未完了のタスク数）/
+    root（root_id を含むか）/ root_open（root_id が未完了か）/ root_parent（root_id の親の id）
+    """
+    return list(
+        tasks.order_by().values("user_id").annotate(
+            total=Count("pk"),
+            completed=Count("pk", filter=Q(is_completed=True)),
+            archived=Count("pk", filter=Q(is_archived=True)),
+            open_subtasks=Count("pk", filter=Q(is_completed=False, parent__isnull=False)),
+            root=Count("pk", filter=Q(pk=root_id)),
+            root_open=Count("pk", filter=Q(pk=root_id, is_completed=False)),
+            root_parent=Max("parent_id", filter=Q(pk=root_id)),
+        )
+    )
+
+
+def _publish_subtree(root_id: int, action: str, totals: list[dict]) -> None:
+    """サブツリー操作の変更イベントを、影響を受けたユーザーごとに1件送る"""
+    bump_generation(*(row["user_id"] for row in totals))
+    events.publish_on_commit(events.SUBTREE, [
+        (row["user_id"], {"id": root_id, "action": action, "count": row["total"]}) for row in totals
+    ])
+
+
+def complete_subtree(task: Task) -> int:
+    """
+    タスクと子孫をすべて完了にする（UPDATE 1文）。
+
+    complete_task と違い、未完了の子タスクがあっても拒否せず、まとめて完了にする。
+    サブツリー内の incomplete_subtask_count は同じ UPDATE で 0 にし、
+    ルートが未完了だった場合は親のカウンタを1減らす。
+
+    Returns:
+        int: 完了にしたタスクの件数
+    """
+    with transaction.atomic():
+        subtree = Task.objects.filter(pk__in=subtree_ids(task.pk))
+        totals = _totals_by_user(subtree.filter(is_completed=False), task.pk)
+        if not totals:
+            return 0
+        subtree.filter(Q(is_completed=False) | Q(incomplete_subtask_count__gt=0)).update(
+            is_completed=True, incomplete_subtask_count=0, updated_at=timezone.now()
+        )
+        if any(row["root"] for row in totals):
+            adjust_subtask_counters(task.parent_id, incomplete=-1)
+        task.is_completed = True
+        task.incomplete_subtask_count = 0
+
+        # 完了数が1増え、親を持つタスクなら未完了の子タスク数が1減る（アーカイブ状態は変わらない）
+        delta = stats.StatsDelta()
+        for row in totals:
+            delta.add(row["user_id"], (0, row["total"], 0, -row["open_subtasks"]))
+        delta.apply()
+        _publish_subtree(task.pk, "completed", totals)
+    return sum(row["total"] for row in totals)
+
+
+def archive_subtree(task: Task) -> int:
+    """
+    タスクと子孫をすべてアーカイブする（UPDATE 1文）。
+
+    Returns:
+        int: アーカイブしたタスクの件数
+    """
+    with transaction.atomic():
+        targets = Task.objects.filter(pk__in=subtree_ids(task.pk), is_archived=False)
+        totals = _totals_by_user(targets, task.pk)
+        if not totals:
+            return 0
+        targets.update(is_archived=True, updated_at=timezone.now())
+        task.is_archived = True
+
+        delta = stats.StatsDelta()
+        for row in totals:
+            delta.add(row["user_id"], (0, 0, row["total"], 0))
+        delta.apply()
+        _publish_subtree(task.pk, "archived", totals)
+    return sum(row["total"] for row in totals)
+
+
+def delete_subtree(task: Task) -> int:
+    """
+    タスクと子孫をすべて削除する（DELETE 1文）。
+
+    Django の CASCADE（子孫を1件ずつモデルインスタンスとして読み込んでから削除する）を使わず、
+    再帰 CTE の DELETE で削除する。削除の前に、差分同期の TaskTombstone を INSERT ... SELECT で記録し、
+    クロージャテーブルの行を削除する。全文検索の索引はトリガーで削除される。
+    親のカウンタは、ルートの分だけ減らす。
+
+    書き込み先が3テーブルあるため、子孫の id は再帰 CTE で一時テーブルに1度だけ求め、
+    集約・記録・削除の各文はその一時テーブルを参照する。
+
+    Returns:
+        int: 削除したタスクの件数
+    """
+    table = Task._meta.db_table
+    closure = TaskClosure._meta.db_table
+    tombstone = TaskTombstone._meta.db_table
+    targets = "SELECT id FROM subtree_targets"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE TEMP TABLE subtree_targets AS " + _subtree_cte(table) + "SELECT id FROM subtree",
+            [task.pk],
+        )
+        try:
+            totals = _totals_by_user(Task.objects.filter(pk__in=RawSQL(targets, [])), task.pk)
+            if not totals:
+                return 0
+            cursor.execute(
+                f"INSERT INTO {tombstone} (task_id, user_id, deleted_at) "
+                f"SELECT id, user_id, %s FROM {table} WHERE id IN ({targets})",
+                [timezone.now()],
+            )
+            cursor.execute(f"DELETE FROM {closure} WHERE descendant_id IN ({targets})")
+            # 親子の外部キーはトランザクション終了時に検査されるため、サブツリーごと1文で削除できる
+            cursor.execute(f"DELETE FROM {table} WHERE id IN ({targets})")
+        finally:
+            cursor.execute("DROP TABLE subtree_targets")
+
+        root = next(row for row in totals if row["root"])
+        adjust_subtask_counters(root["root_parent"], total=-1, incomplete=-1 if root["root_open"] else 0)
+
+        delta = stats.StatsDelta()
+        for row in totals:
+            delta.add(
+                row["user_id"],
+                (row["total"], row["completed"], row["archived"], row["open_subtasks"]),
+                -1,
+            )
+        delta.apply(create=False)
+        _publish_subtree(task.pk, "deleted", totals)
+    return sum(row["total"] for row in totals)
+
+
+# ------------------------------------
+# 一括操作
+# ------------------------------------
+# bulk_create / bulk_update / update() はシグナルを発火しないため、
+# クロージャテーブル・子タスク数カウンタ・一覧キャッシュ・変更フィードは各関数の中で更新する。
+
+BULK_UPDATABLE_FIELDS = ("title", "description", "is_completed", "is_archived", "parent")
+
+
+def _check_batch_size(count: int) -> None:
+    if count > settings.TASKS_BULK_MAX_ITEMS:
+        raise ValidationError(f"一度に操作できるタスクは {settings.TASKS_BULK_MAX_ITEMS} 件までです。")
+
+
+def _owned_ids(user: AbstractBaseUser, ids: Iterable[int]) -> set[int]:
+    """ids のうち user が所有するタスクの id を返す。所有していない id があれば ValidationError"""
+    wanted = set(ids)
+    owned = set(Task.objects.filter(user=user, pk__in=wanted).values_list("pk", flat=True))
+    missing = wanted - owned
+    if missing:
+        raise ValidationError(f"存在しない、または操作できないタスクが含まれています: {sorted(missing)}")
+    return owned
+
+
+def _blocked_by_subtasks(completing: set[int], exclude: Iterable[int] = ()) -> list[int]:
+    """
+    完了にしようとしているタスクのうち、DB 上で未完了の子タスクを持つものの id を返す（クエリ1回）。
+
+    同じ操作で一緒に完了する子タスク（completing）と、呼び出し側が更新後の状態で
+    別途判定する子タスク（exclude）は対象外とする。
+    """
+    if not completing:
+        return []
+    return sorted(set(
+        Task.objects.filter(parent_id__in=completing, is_completed=False)
+        .exclude(pk__in=completing | set(exclude))
+        .values_list("parent_id", flat=True)
+    ))
+
+
+def _has_cycle(parents: dict[int, int | None], starts: Iterable[int]) -> bool:
+    """{id: parent_id} を starts の各タスクから根に向かってたどり、同じタスクに戻るかを返す"""
+    for start in starts:
+        seen = {start}
+        node = parents.get(start)
+        while node is not None:
+            if node in seen:
+                return True
+            seen.add(node)
+            node = parents.get(node)
+    return False
+
+
+def bulk_create_tasks(user: AbstractBaseUser, items: list[dict]) -> list[Task]:
+    """
+    タスクをまとめて作成する（bulk_create 1回）。
+
+    Args:
+        user: 作成するタスクの所有者
+        items (list[dict]): TaskSerializer で検証済みの値。parent は親タスクの id
+
+    Raises:
+        ValidationError: 件数上限超過・他人のタスクを親に指定した場合
+    """
+    _check_batch_size(len(items))
+    parent_ids = {item["parent"] for item in items if item.get("parent") is not None}
+
+    with transaction.atomic():
+        _owned_ids(user, parent_ids)
+        tasks = Task.objects.bulk_create([
+            Task(
+                user=user,
+                title=item["title"],
+                description=item.get("description", ""),
+                is_completed=item.get("is_completed", False),
+                is_archived=item.get("is_archived", False),
+                parent_id=item.get("parent"),
+            )
+            for item in items
+        ])
+        rebuild_task_closure(task.pk for task in tasks)
+        refresh_subtask_counters(parent_ids)
+        delta = stats.StatsDelta()
+        for task in tasks:
+            delta.add(user.pk, stats.task_stats_row(task))
+        delta.apply()
+        bump_generation(user.pk)
+        events.publish_on_commit(events.CREATED, [(user.pk, events.task_data(task)) for task in tasks])
+    return tasks
+
+
+def bulk_update_tasks(user: AbstractBaseUser, items: list[dict]) -> list[Task]:
+    """
+    タスクをまとめて更新する（bulk_update 1回）。
+
+    各 item は "id" と BULK_UPDATABLE_FIELDS のうち更新するフィールドを持つ。
+    完了にする場合は complete_task と同じく、更新後に未完了の子タスクが残るなら拒否する。
+
+    Raises:
+        ValidationError: 件数上限超過・他人のタスク・未完了の子タスク・循環する親指定
+    """
+    _check_batch_size(len(items))
+    changes = {item["id"]: item for item in items}
+
+    with transaction.atomic():
+        tasks = list(Task.objects.filter(user=user, pk__in=changes).select_for_update())
+        missing = set(changes) - {task.pk for task in tasks}
+        if missing:
+            raise ValidationError(f"存在しない、または操作できないタスクが含まれています: {sorted(missing)}")
+
+        new_parent_ids = {item["parent"] for item in items if item.get("parent") is not None}
+        _owned_ids(user, new_parent_ids)
+        old_parent_ids = {task.parent_id for task in tasks}
+        delta = stats.StatsDelta()
+        for task in tasks:
+            delta.add(user.pk, stats.task_stats_row(task), -1)
+
+        # 変更をメモリ上で適用してから、更新後の状態で検証する
+        fields: set[str] = set()
+        moved: list[int] = []
+        now = timezone.now()
+        for task in tasks:
+            for name, value in changes[task.pk].items():
+                if name not in BULK_UPDATABLE_FIELDS:
+                    continue
+                if name == "parent":
+                    if value != task.parent_id:
+                        moved.append(task.pk)
+                    task.parent_id = value
+                else:
+                    setattr(task, name, value)
+                fields.add(name)
+            task.updated_at = now
+
+        if moved:
+            # 更新後の親子関係が循環しないか。移動先とその祖先の親（クエリ1回）に
+            # バッチ内の付け替えを重ねてたどる（A→B と B→A の入れ替えなど、バッチ内の循環も検出する）
+            parents = dict(
+                Task.objects.filter(
+                    pk__in=TaskClosure.objects.filter(descendant_id__in=new_parent_ids).values("ancestor_id")
+                ).values_list("pk", "parent_id")
+            )
+            parents.update((task.pk, task.parent_id) for task in tasks)
+            if _has_cycle(parents, moved):
+                raise ValidationError("自分自身または子孫タスクを親タスクにはできません。")
+
+        completing = {pk for pk, item in changes.items() if item.get("is_completed")}
+        blocked = set(_blocked_by_subtasks(completing, exclude=changes.keys()))
+        blocked |= {task.parent_id for task in tasks if not task.is_completed and task.parent_id in completing}
+        if blocked:
+            raise ValidationError(f"子タスクが未完了のため完了できません: {sorted(blocked)}")
+
+        if fields:
+            Task.objects.bulk_update(tasks, [*fields, "updated_at"])
+            for task in tasks:
+                delta.add(user.pk, stats.task_stats_row(task))
+            delta.apply()
+        if moved:
+            subtree_ids = TaskClosure.objects.filter(ancestor_id__in=moved).values_list("descendant_id", flat=True)
+            rebuild_task_closure(set(subtree_ids))
+        refresh_subtask_counters((old_parent_ids | new_parent_ids) - {None})
+        bump_generation(user.pk)
+        for event_type, completed in ((events.COMPLETED, True), (events.UPDATED, False)):
+            events.publish_on_commit(event_type, [
+                (user.pk, events.task_data(task))
+                for task in tasks
+                if bool(changes[task.pk].get("is_completed")) is completed
+            ])
+    return tasks
+
+
+def bulk_complete_tasks(user: AbstractBaseUser, ids: Iterable[int]) -> int:
+    """
+    タスクをまとめて完了にする（update() 1回）。
+
+    未完了の子タスク判定はまとめて1クエリで行い、1件でも該当すれば全体を拒否する。
+
+    Returns:
+        int: 更新した件数
+    """
+    ids = list(ids)
+    _check_batch_size(len(ids))
+    with transaction.atomic():
+        owned = _owned_ids(user, ids)
+        blocked = _blocked_by_subtasks(owned)
+        if blocked:
+            raise ValidationError(f"子タスクが未完了のため完了できません: {blocked}")
+
+        targets = Task.objects.filter(pk__in=owned, is_completed=False)
+        rows = list(targets.values_list("pk", "parent_id"))
+        now = timezone.now()
+        updated = targets.update(is_completed=True, updated_at=now)
+        refresh_subtask_counters({parent_id for _, parent_id in rows if parent_id is not None})
+        delta = stats.StatsDelta()
+        delta.add(user.pk, (0, updated, 0, -sum(1 for _, parent_id in rows if parent_id is not None)))
+        delta.apply()
+        bump_generation(user.pk)
+        events.publish_on_commit(events.COMPLETED, [
+            (user.pk, {"id": pk, "is_completed": True, "updated_at": now.isoformat()}) for pk, _ in rows
+        ])
+    return updated
+
+
+def bulk_archive_tasks(user: AbstractBaseUser, ids: Iterable[int]) -> int:
+    """
+    タスクをまとめてアーカイブする（update() 1回）。
+
+    Returns:
+        int: 更新した件数
+    """
+    ids = list(ids)
+    _check_batch_size(len(ids))
+    with transaction.atomic():
+        owned = _owned_ids(user, ids)
+        now = timezone.now()
+        updated = Task.objects.filter(pk__in=owned, is_archived=False).update(
+            is_archived=True, updated_at=now
+        )
+        delta = stats.StatsDelta()
+        delta.add(user.pk, (0, 0, updated, 0))
+        delta.apply()
+        bump_generation(user.pk)
+        # 既にアーカイブ済みだったタスクの分も送る（更新対象を調べるクエリを増やさないため）
+        events.publish_on_commit(events.UPDATED, [
+            (user.pk, {"id": pk, "is_archived": True, "updated_at": now.isoformat()}) for pk in sorted(owned)
+        ])
+    return updated
+
+
+# ------------------------------------
+# クエリセット単位の一括操作（管理画面のアクション）
+# ------------------------------------
+def complete_tasks(tasks: QuerySet[Task]) -> tuple[int, list[int]]:
+    """
+    選択したタスクのうち、完了にできるものをまとめて完了にする（UPDATE 1文）。
+
+    bulk_complete_tasks と違い、所有者をまたいで操作でき、子タスクの判定で全体を拒否せずに
+    完了にできないタスクだけを除く。未完了の子タスクは、一緒に選択されていて完了にできるなら妨げにならない。
+    完了にできないタスクの親（祖先）も完了にできないものとして除く。
+
+    Returns:
+        tuple[int, list[int]]: 完了にした件数と、子タスクが未完了のため除いたタスクの id
+    """
+    with transaction.atomic():
+        rows = list(tasks.filter(is_completed=False).values_list("pk", "user_id", "parent_id"))
+        completing = {pk for pk, _, _ in rows}
+        parent_of = {pk: parent_id for pk, _, parent_id in rows}
+
+        # 選択外の未完了の子を持つタスク（クエリ1回）と、そこから祖先方向へ伝わる分（メモリ上）
+        blocked = set(_blocked_by_subtasks(completing))
+        frontier = blocked
+        while frontier:
+            frontier = {parent_of[pk] for pk in frontier if parent_of[pk] in completing} - blocked
+            blocked |= frontier
+
+        rows = [row for row in rows if row[0] not in blocked]
+        if not rows:
+            return 0, sorted(blocked)
+        now = timezone.now()
+        updated = Task.objects.filter(pk__in=completing - blocked).update(is_completed=True, updated_at=now)
+        refresh_subtask_counters({parent_id for _, _, parent_id in rows if parent_id is not None})
+
+        delta = stats.StatsDelta()
+        for _, user_id, parent_id in rows:
+            delta.add(user_id, (0, 1, 0, -1 if parent_id is not None else 0))
+        delta.apply()
+        bump_generation(*{user_id for _, user_id, _ in rows})
+        events.publish_on_commit(events.COMPLETED, [
+            (user_id, {"id": pk, "is_completed": True, "updated_at": now.isoformat()}) for pk, user_id, _ in rows
+        ])
+    return updated, sorted(blocked)
+
+
+def reopen_tasks(tasks: QuerySet[Task]) -> int:
+    """
+    選択したタスクのうち、完了済みのものをまとめて未完了に戻す（UPDATE 1文）。
+
+    reopen_task と同じく、親タスクの完了状態は変えない。
+
+    Returns:
+        int: 未完了に戻した件数
+    """
+    with transaction.atomic():
+        rows = list(tasks.filter(is_completed=True).values_list("pk", "user_id", "parent_id"))
+        if not rows:
+            return 0
+        now = timezone.now()
+        updated = Task.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(is_completed=False, updated_at=now)
+        refresh_subtask_counters({parent_id for _, _, parent_id in rows if parent_id is not None})
+
+        delta = stats.StatsDelta()
+        for _, user_id, parent_id in rows:
+            delta.add(user_id, (0, -1, 0, 1 if parent_id is not None else 0))
+        delta.apply()
+        bump_generation(*{user_id for _, user_id, _ in rows})
+        events.publish_on_commit(events.UPDATED, [
+            (user_id, {"id": pk, "is_completed": False, "updated_at": now.isoformat()}) for pk, user_id, _ in rows
+        ])
+    return updated
+
+
+def archive_tasks(tasks: QuerySet[Task]) -> int:
+    """
+    選択したタスクのうち、未アーカイブのものをまとめてアーカイブする（UPDATE 1文）。
+
+    Returns:
+        int: アーカイブした件数
+    """
+    with transaction.atomic():
+        rows = list(tasks.filter(is_archived=False).values_list("pk", "user_id"))
+        if not rows:
+            return 0
+        now = timezone.now()
+        updated = Task.objects.filter(pk__in=[pk for pk, _ in rows]).update(is_archived=True, updated_at=now)
+
+        delta = stats.StatsDelta()
+        for _, user_id in rows:
+            delta.add(user_id, (0, 0, 1, 0))
+        delta.apply()
+        bump_generation(*{user_id for _, user_id in rows})
+        events.publish_on_commit(events.UPDATED, [
+            (user_id, {"id": pk, "is_archived": True, "updated_at": now.isoformat()}) for pk, user_id in rows
+        ])
+    return updated
+
+
+# ------------------------------------
+# 保管テーブル（ArchivedTask）への移動
+# ------------------------------------
+# 移動する列（ArchivedTask と Task で同じ列名）
+ARCHIVED_COLUMNS = tuple(
+    f.column for f in ArchivedTask._meta.concrete_fields if f.name != "archived_at"
+)
+
+
+def archivable_roots(older_than: timedelta | None = None) -> QuerySet[Task]:
+    """
+    保管テーブルに移せるツリーのルート（トップレベルタスク）の id を返す。
+
+    ルートを含むサブツリー全体がアーカイブ済みで、older_than（既定は
+    settings.TASKS_ARCHIVE_AFTER_DAYS 日）以上更新されていないものが対象。
+    未アーカイブ・最近更新された子孫が1件でもあればツリーごと対象外にする。
+    """
+    if older_than is None:
+        older_than = timedelta(days=settings.TASKS_ARCHIVE_AFTER_DAYS)
+    cutoff = timezone.now() - older_than
+    active_descendants = TaskClosure.objects.filter(ancestor=OuterRef("pk")).filter(
+        Q(descendant__is_archived=False) | Q(descendant__updated_at__gte=cutoff)
+    )
+    return (
+        Task.objects.filter(parent__isnull=True, is_archived=True, updated_at__lt=cutoff)
+        .exclude(Exists(active_descendants))
+        .order_by("id")
+        .values_list("pk", flat=True)
+    )
+
+
+def archive_task_trees(root_ids: Iterable[int]) -> int:
+    """
+    ルートの id で指定したツリーを、子孫ごと Task から ArchivedTask に移す。
+
+    1. 行を INSERT ... SELECT でそのまま保管テーブルにコピーする
+    2. 差分同期のクライアントに Task からの削除として伝えるため、TaskTombstone を記録する
+    3. クロージャテーブルの行と Task の行を削除する（全文検索の索引はトリガーで削除される）
+
+    シグナルを経由しないため、一覧キャッシュの無効化と変更フィード（deleted）は関数の中で行う。
+    呼び出し側は archivable_roots で選んだルートを渡すこと（ツリーの一部だけは移さない）。
+
+    Returns:
+        int: 移したタスクの件数（子孫を含む）
+    """
+    root_ids = list(root_ids)
+    table = Task._meta.db_table
+    archive = ArchivedTask._meta.db_table
+    closure = TaskClosure._meta.db_table
+    tombstone = TaskTombstone._meta.db_table
+    columns = ", ".join(ARCHIVED_COLUMNS)
+
+    with transaction.atomic():
+        owners = list(
+            TaskClosure.objects.filter(ancestor_id__in=root_ids)
+            .values_list("descendant_id", "descendant__user_id")
+        )
+        ids = [pk for pk, _ in owners]
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            # SQLite のバインド変数上限を超えないよう分割する
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                placeholders = ", ".join(["%s"] * len(batch))
+                cursor.execute(
+                    f"INSERT INTO {archive} ({columns}, archived_at) "
+                    f"SELECT {columns}, %s FROM {table} WHERE id IN ({placeholders})",
+                    [now, *batch],
+                )
+                cursor.execute(
+                    f"INSERT INTO {tombstone} (task_id, user_id, deleted_at) "
+                    f"SELECT id, user_id, %s FROM {table} WHERE id IN ({placeholders})",
+                    [now, *batch],
+                )
+                cursor.execute(f"DELETE FROM {closure} WHERE descendant_id IN ({placeholders})", batch)
+                # 親子の外部キーはトランザクション終了時に検査されるため、削除の順序は問わない
+                cursor.execute(f"DELETE FROM {table} WHERE id IN ({placeholders})", batch)
+        bump_generation(*{user_id for _, user_id in owners})
+        events.publish_on_commit(events.DELETED, [(user_id, {"id": pk}) for pk, user_id in owners])
+    return len(ids)
@@ -0,0 +1,149 @@
+# task_manager/tasks/signals.py
+
+from typing import Any
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Task, TaskTombstone
+from . import cache, events, services, stats
+
+
+@receiver(pre_save, sender=Task)
+def load_tracked_values(sender: type[Task], instance: Task, raw: bool, **kwargs: Any) -> None:
+    """
+    DB から読み込まれていない既存タスク（pk を指定して生成したインスタンス等）を
+    更新する場合に、変更前の TRACKED_FIELDS の値を読み込んでおく。
+    """
+    if raw or instance.pk is None or hasattr(instance, "_loaded_values"):
+        return
+    instance._loaded_values = (
+        Task.objects.filter(pk=instance.pk).values(*Task.TRACKED_FIELDS).first() or {}
+    )
+
+
+@receiver(post_save, sender=Task)
+def update_hierarchy(
+    sender: type[Task], instance: Task, created: bool, raw: bool, update_fields: Any, **kwargs: Any
+) -> None:
+    """
+    タスクの作成・親の付け替えをクロージャテーブルに反映する。
+    Task.save がトランザクション内で呼ぶため、失敗時は保存ごと取り消される。
+    """
+    if raw:
+        return
+    if created:
+        services.attach_to_hierarchy(instance)
+    elif "parent_id" in instance.changed_tracked_fields(update_fields):
+        services.move_in_hierarchy(instance)
+
+
+def _sync_cached_parent(instance: Task, parent_id: int | None, total: int, incomplete: int) -> None:
+    """子インスタンスが保持している親インスタンスのカウンタもメモリ上で合わせる"""
+    if parent_id is None or not Task.parent.is_cached(instance):
+        return
+    parent = instance.parent
+    if parent is not None and parent.pk == parent_id:
+        parent.subtask_count += total
+        parent.incomplete_subtask_count += incomplete
+
+
+@receiver(post_save, sender=Task)
+def update_subtask_counters(
+    sender: type[Task], instance: Task, created: bool, raw: bool, update_fields: Any, **kwargs: Any
+) -> None:
+    """
+    子タスクの作成・完了・再開・付け替えを親の subtask_count / incomplete_subtask_count に反映する。
+    """
+    if raw:
+        return
+
+    is_open = 0 if instance.is_completed else 1
+    if created:
+        services.adjust_subtask_counters(instance.parent_id, total=1, incomplete=is_open)
+        _sync_cached_parent(instance, instance.parent_id, 1, is_open)
+        return
+
+    changed = instance.changed_tracked_fields(update_fields)
+    was_open = 0 if instance.loaded_value("is_completed") else 1
+    if "parent_id" in changed:
+        services.adjust_subtask_counters(instance.loaded_value("parent_id"), total=-1, incomplete=-was_open)
+        services.adjust_subtask_counters(instance.parent_id, total=1, incomplete=is_open)
+        _sync_cached_parent(instance, instance.parent_id, 1, is_open)
+    elif "is_completed" in changed:
+        services.adjust_subtask_counters(instance.parent_id, incomplete=is_open - was_open)
+        _sync_cached_parent(instance, instance.parent_id, 0, is_open - was_open)
+
+
+@receiver(post_delete, sender=Task)
+def release_subtask_counters(sender: type[Task], instance: Task, **kwargs: Any) -> None:
+    """
+    子タスクの削除を親のカウンタに反映する。
+    親ごと削除された（カスケード）場合は対象行がないため何もしない。
+    """
+    was_open = 0 if instance.loaded_value("is_completed") else 1
+    services.adjust_subtask_counters(instance.loaded_value("parent_id"), total=-1, incomplete=-was_open)
+
+
+@receiver(post_save, sender=Task)
+def update_user_stats(
+    sender: type[Task], instance: Task, created: bool, raw: bool, update_fields: Any, **kwargs: Any
+) -> None:
+    """作成・完了・アーカイブ・付け替え・所有者の変更を、ユーザー別タスク集計に反映する"""
+    if raw:
+        return
+    delta = stats.StatsDelta()
+    if not created:
+        if not instance.changed_tracked_fields(update_fields):
+            return
+        delta.add(instance.loaded_value("user_id"), stats.loaded_stats_row(instance), -1)
+    delta.add(instance.user_id, stats.task_stats_row(instance))
+    delta.apply()
+
+
+@receiver(post_delete, sender=Task)
+def release_user_stats(sender: type[Task], instance: Task, **kwargs: Any) -> None:
+    """削除を、ユーザー別タスク集計に反映する（カスケード削除の子タスクを含む）"""
+    delta = stats.StatsDelta()
+    delta.add(instance.loaded_value("user_id"), stats.loaded_stats_row(instance), -1)
+    delta.apply(create=False)
+
+
+@receiver(post_delete, sender=Task)
+def record_tombstone(sender: type[Task], instance: Task, **kwargs: Any) -> None:
+    """
+    削除を差分同期用の TaskTombstone に記録する。
+    親の削除でカスケード削除された子タスクも、1件ずつこのシグナルが送られる。
+    """
+    TaskTombstone.objects.create(task_id=instance.pk, user_id=instance.user_id)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_list_cache(sender: type[Task], instance: Task, raw: bool = False, **kwargs: Any) -> None:
+    """タスクの保存・削除で、所有ユーザーのタスク一覧キャッシュを無効にする"""
+    if raw:
+        return
+    cache.bump_generation(instance.user_id)
+
+
+@receiver(post_save, sender=Task)
+def publish_saved_event(
+    sender: type[Task], instance: Task, created: bool, raw: bool, update_fields: Any, **kwargs: Any
+) -> None:
+    """作成・更新・完了を、コミット後に所有ユーザーの変更フィード（tasks.events）へ送る"""
+    if raw:
+        return
+    if created:
+        event_type = events.CREATED
+    elif instance.is_completed and "is_completed" in instance.changed_tracked_fields(update_fields):
+        event_type = events.COMPLETED
+    else:
+        event_type = events.UPDATED
+    events.publish_on_commit(event_type, [(instance.user_id, events.task_data(instance))])
+
+
+@receiver(post_delete, sender=Task)
+def publish_deleted_event(sender: type[Task], instance: Task, **kwargs: Any) -> None:
+    """削除を、コミット後に所有ユーザーの変更フィードへ送る（カスケード削除の子タスクを含む）"""
+    events.publish_on_commit(events.DELETED, [(instance.user_id, {"id": instance.pk})])
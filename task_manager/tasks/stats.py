@@ -0,0 +1,194 @@
+# task_manager/tasks/stats.py
+
+"""
+ユーザー別タスク集計（UserTaskStats）の増分更新と再集計。
+
+タスク1件が集計に与える値は (タスク数, 完了数, アーカイブ数, 未完了の子タスク数) の組（stats_row）。
+作成は +stats_row(新しい値)、削除は -stats_row(元の値)、更新はその差を StatsDelta に積み、
+apply() でユーザーごとに1文ずつ（executemany）反映する。
+
+- 増加を含む反映は upsert（INSERT ... ON CONFLICT DO UPDATE）で、集計行がなければ作る
+- 削除の反映は既存行の UPDATE だけにする
+  （ユーザーの削除でカスケード削除されたタスクのために、削除済みの集計行を作り直さないため）
+
+保管テーブル（ArchivedTask）のタスクも集計に含むため、archive_task_trees による移動では変わらない。
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.db import connection, transaction
+from django.db.models import Count, Q
+
+from .models import ArchivedTask, Task, UserTaskStats
+
+# 集計の列（stats_row の並び）
+STAT_FIELDS = ("task_count", "completed_count", "archived_count", "open_subtask_count")
+
+StatsRow = tuple[int, int, int, int]
+
+ZERO: StatsRow = (0, 0, 0, 0)
+
+
+def stats_row(is_completed: bool, is_archived: bool, parent_id: int | None) -> StatsRow:
+    """タスク1件が集計に与える値"""
+    return (
+        1,
+        1 if is_completed else 0,
+        1 if is_archived else 0,
+        1 if not is_completed and parent_id is not None else 0,
+    )
+
+
+def task_stats_row(task: Task) -> StatsRow:
+    """タスクの現在の値での stats_row"""
+    return stats_row(task.is_completed, task.is_archived, task.parent_id)
+
+
+def loaded_stats_row(task: Task) -> StatsRow:
+    """タスクの DB と同期した時点の値（Task.loaded_value）での stats_row"""
+    return stats_row(
+        task.loaded_value("is_completed"), task.loaded_value("is_archived"), task.loaded_value("parent_id")
+    )
+
+
+class StatsDelta:
+    """ユーザーごとの集計の増減を積み上げ、まとめて反映する"""
+
+    def __init__(self) -> None:
+        self._rows: defaultdict[int, list[int]] = defaultdict(lambda: [0, 0, 0, 0])
+
+    def add(self, user_id: int | None, row: StatsRow, sign: int = 1) -> None:
+        if user_id is None:
+            return
+        totals = self._rows[user_id]
+        for i, value in enumerate(row):
+            totals[i] += sign * value
+
+    def apply(self, create: bool = True) -> None:
+        """
+        積み上げた増減を UserTaskStats に反映する。
+
+        Args:
+            create (bool): 集計行がないユーザーの行を作るか（削除の反映では False）
+        """
+        rows = [(user_id, *row) for user_id, row in self._rows.items() if any(row)]
+        if not rows:
+            return
+        table = UserTaskStats._meta.db_table
+        columns = ", ".join(STAT_FIELDS)
+        with connection.cursor() as cursor:
+            if create:
+                updates = ", ".join(f"{name} = {table}.{name} + excluded.{name}" for name in STAT_FIELDS)
+                placeholders = ", ".join(["%s"] * (len(STAT_FIELDS) + 1))
+                cursor.executemany(
+                    f"INSERT INTO {table} (user_id, {columns}) VALUES ({placeholders}) "
+                    f"ON CONFLICT (user_id) DO UPDATE SET {updates}",
+                    rows,
+                )
+            else:
+                increments = ", ".join(f"{name} = {table}.{name} + %s" for name in STAT_FIELDS)
+                cursor.executemany(
+                    f"UPDATE {table} SET {increments} WHERE user_id = %s",
+                    [(*row, user_id) for user_id, *row in rows],
+                )
+        self._rows.clear()
+
+
+def get_user_stats(user: AbstractBaseUser) -> dict[str, int]:
+    """ユーザーの集計（集計行がなければすべて 0）"""
+    row = UserTaskStats.objects.filter(user_id=user.pk).values_list(*STAT_FIELDS).first() or ZERO
+    return dict(zip(STAT_FIELDS, row))
+
+
+# ------------------------------------
+# 再集計
+# ------------------------------------
+@dataclass(frozen=True)
+class StatsDrift:
+    """
+    集計値と実際の件数のずれ。
+
+    Attributes:
+        user_id (int): ユーザー id
+        stored (tuple): UserTaskStats に保存されていた値（行がなければ None）
+        actual (tuple): Task と保管テーブルを集計した値
+    """
+
+    user_id: int
+    stored: StatsRow | None
+    actual: StatsRow
+
+
+def _actual_stats(user_ids: list[int] | None) -> dict[int, StatsRow]:
+    """Task と保管テーブルをユーザーごとに集計する（テーブルごとに GROUP BY 1回）"""
+    actual: defaultdict[int, list[int]] = defaultdict(lambda: [0, 0, 0, 0])
+    for model in (Task, ArchivedTask):
+        tasks = model.objects.filter(user__isnull=False)
+        if user_ids is not None:
+            tasks = tasks.filter(user_id__in=user_ids)
+        rows = (
+            tasks.order_by()
+            .values("user_id")
+            .annotate(
+                total=Count("pk"),
+                completed=Count("pk", filter=Q(is_completed=True)),
+                archived=Count("pk", filter=Q(is_archived=True)),
+                open_subtasks=Count("pk", filter=Q(is_completed=False, parent__isnull=False)),
+            )
+            .values_list("user_id", "total", "completed", "archived", "open_subtasks")
+        )
+        for user_id, *counts in rows:
+            totals = actual[user_id]
+            for i, value in enumerate(counts):
+                totals[i] += value
+    return {user_id: tuple(row) for user_id, row in actual.items()}
+
+
+def refresh_user_stats(user_ids: Iterable[int] | None = None) -> list[StatsDrift]:
+    """
+    実際の件数を集計し、ずれていたユーザーの UserTaskStats を書き直す。
+
+    Args:
+        user_ids (Iterable[int] | None): 対象のユーザー id。None の場合は全ユーザー
+
+    Returns:
+        list[StatsDrift]: ずれていたユーザーと、その保存値・実際の値
+    """
+    ids = None if user_ids is None else list(user_ids)
+    with transaction.atomic():
+        stored_rows = UserTaskStats.objects.all()
+        if ids is not None:
+            stored_rows = stored_rows.filter(user_id__in=ids)
+        stored = {user_id: tuple(row) for user_id, *row in stored_rows.values_list("user_id", *STAT_FIELDS)}
+        actual = _actual_stats(ids)
+
+        drifts = [
+            StatsDrift(user_id, stored.get(user_id), actual.get(user_id, ZERO))
+            for user_id in sorted(stored.keys() | actual.keys())
+            if stored.get(user_id) != actual.get(user_id, ZERO)
+        ]
+        UserTaskStats.objects.bulk_create(
+            [UserTaskStats(user_id=d.user_id, **dict(zip(STAT_FIELDS, d.actual))) for d in drifts],
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=list(STAT_FIELDS),
+        )
+    return drifts
+
+
+def format_drift(drift: StatsDrift) -> str:
+    """再集計コマンドの出力用（変わった列だけを「保存値 → 実際の値」で示す）"""
+    stored: Any = drift.stored or ZERO
+    changes = [
+        f"{name} {before} → {after}"
+        for name, before, after in zip(STAT_FIELDS, stored, drift.actual)
+        if before != after
+    ]
+    if drift.stored is None:
+        changes.insert(0, "集計行なし")
+    return f"ユーザー {drift.user_id}: " + ", ".join(changes)
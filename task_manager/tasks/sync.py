@@ -0,0 +1,177 @@
+# task_manager/tasks/sync.py
+
+"""
+差分同期（/api/tasks/changes/）。
+
+クライアントは前回レスポンスの cursor を since に渡し、それ以降に
+- 作成・更新されたタスク（updated_at, id の昇順）
+- 削除されたタスクの id（TaskTombstone の id 昇順）
+だけを受け取る。
+
+カーソルには「最後に返したタスクの (updated_at, id)」「最後に返した削除記録の id」と
+発行日時を入れる。発行から settings.TASKS_TOMBSTONE_RETENTION_DAYS を過ぎたカーソルは、
+削除記録が既に消えている可能性があるため CursorExpired とし、全件の取り直しを求める。
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from django.conf import settings
+from django.db.models import Max, Q, QuerySet
+from django.utils import timezone
+
+from .models import TaskTombstone
+from .pagination import InvalidCursor, PositionFunc, get_page_size
+
+
+class CursorExpired(Exception):
+    """削除記録の保持期間を過ぎたカーソルが渡された場合の例外（全件の取り直しが必要）"""
+
+
+@dataclass(frozen=True)
+class ChangesCursor:
+    """
+    差分同期の位置情報。
+
+    Attributes:
+        updated_at (datetime | None): 最後に返したタスクの updated_at（まだ1件も返していなければ None）
+        pk (int): 最後に返したタスクの id（updated_at が同値の場合のタイブレーク）
+        tombstone_id (int): 最後に返した TaskTombstone の id
+        issued_at (datetime): カーソルの発行日時
+    """
+
+    updated_at: datetime | None
+    pk: int
+    tombstone_id: int
+    issued_at: datetime
+
+
+@dataclass
+class ChangeSet:
+    """
+    1回分の差分。
+
+    Attributes:
+        rows (list): 作成・更新されたタスクの行（updated_at, id の昇順）
+        deleted (list[int]): 削除されたタスクの id
+        cursor (str): 次回の since に渡すカーソル
+        has_more (bool): まだ返していない差分が残っているか（True なら続けて取得する）
+    """
+
+    rows: list[Any]
+    deleted: list[int]
+    cursor: str
+    has_more: bool
+
+
+def encode_changes_cursor(cursor: ChangesCursor) -> str:
+    """ChangesCursor を URL セーフな不透明文字列に変換する"""
+    payload = json.dumps(
+        {
+            "t": cursor.updated_at.isoformat() if cursor.updated_at else None,
+            "i": cursor.pk,
+            "d": cursor.tombstone_id,
+            "at": cursor.issued_at.isoformat(),
+        },
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_changes_cursor(value: str) -> ChangesCursor:
+    """
+    encode_changes_cursor で生成した文字列を ChangesCursor に戻す。
+
+    Raises:
+        InvalidCursor: 文字列が壊れている・改ざんされている場合
+    """
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return ChangesCursor(
+            updated_at=datetime.fromisoformat(payload["t"]) if payload["t"] else None,
+            pk=int(payload["i"]),
+            tombstone_id=int(payload["d"]),
+            issued_at=datetime.fromisoformat(payload["at"]),
+        )
+    except (binascii.Error, ValueError, TypeError, KeyError, UnicodeDecodeError) as e:
+        raise InvalidCursor("カーソルの形式が不正です。") from e
+
+
+def get_changes(
+    queryset: QuerySet[Any],
+    tombstones: QuerySet[TaskTombstone],
+    since: str | None,
+    page_size: int | str | None,
+    key: PositionFunc,
+) -> ChangeSet:
+    """
+    since 以降に作成・更新されたタスクと、削除されたタスクの id を返す。
+
+    Args:
+        queryset (QuerySet): 絞り込み済みのタスク（values_list 等。並び順は上書きされる）
+        tombstones (QuerySet): 同じ条件で絞り込んだ TaskTombstone
+        since (str | None): 前回の cursor。None なら初回同期（全件 + 以降の削除）
+        page_size (int | str | None): 1回に返すタスク・削除の最大件数
+        key (Callable): 行から (updated_at, id) を取り出す関数
+
+    Raises:
+        InvalidCursor: カーソルが不正な場合
+        CursorExpired: カーソルが削除記録の保持期間より古い場合
+    """
+    size = get_page_size(page_size)
+    now = timezone.now()
+
+    if since:
+        position = decode_changes_cursor(since)
+        retention = timedelta(days=settings.TASKS_TOMBSTONE_RETENTION_DAYS)
+        if position.issued_at < now - retention:
+            raise CursorExpired("カーソルの有効期限が切れています。全件を取得し直してください。")
+    else:
+        # 初回は全件を返すため、過去の削除は不要。現時点の最新の削除記録を起点にする。
+        # （タスクより先に読むことで、読み取りの間に削除されたタスクも次回に届く）
+        latest = TaskTombstone.objects.aggregate(latest=Max("id"))["latest"] or 0
+        position = ChangesCursor(updated_at=None, pk=0, tombstone_id=latest, issued_at=now)
+
+    deleted_rows = list(
+        tombstones.filter(id__gt=position.tombstone_id).order_by("id").values_list("id", "task_id")[: size + 1]
+    )
+
+    queryset = queryset.order_by("updated_at", "id")
+    if position.updated_at is not None:
+        queryset = queryset.filter(
+            Q(updated_at__gt=position.updated_at)
+            | Q(updated_at=position.updated_at, id__gt=position.pk)
+        )
+    rows = list(queryset[: size + 1])
+
+    has_more = len(rows) > size or len(deleted_rows) > size
+    rows, deleted_rows = rows[:size], deleted_rows[:size]
+
+    updated_at, pk = key(rows[-1]) if rows else (position.updated_at, position.pk)
+    cursor = ChangesCursor(
+        updated_at=updated_at,
+        pk=pk,
+        tombstone_id=deleted_rows[-1][0] if deleted_rows else position.tombstone_id,
+        issued_at=now,
+    )
+    return ChangeSet(
+        rows=rows,
+        deleted=[task_id for _, task_id in deleted_rows],
+        cursor=encode_changes_cursor(cursor),
+        has_more=has_more,
+    )
+
+
+def prune_tombstones(older_than: timedelta | None = None) -> int:
+    """保持期間（既定は settings.TASKS_TOMBSTONE_RETENTION_DAYS）より古い削除記録を削除する"""
+    if older_than is None:
+        older_than = timedelta(days=settings.TASKS_TOMBSTONE_RETENTION_DAYS)
+    deleted, _ = TaskTombstone.objects.filter(deleted_at__lt=timezone.now() - older_than).delete()
+    return deleted
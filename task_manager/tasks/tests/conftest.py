@@ -0,0 +1,15 @@
+# task_manager/tasks/tests/conftest.py
+
+import pytest
+
+
+@pytest.fixture
+def user(django_user_model):
+    """タスクの所有者"""
+    return django_user_model.objects.create_user(email="user@example.com", password="pw")
+
+
+@pytest.fixture
+def other(django_user_model):
+    """user とは別のユーザー（他人のタスクの操作を確かめる）"""
+    return django_user_model.objects.create_user(email="other@example.com", password="pw")
@@ -0,0 +1,110 @@
+# task_manager/tasks/tests/test_admin.py
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from tasks.models import Task
+from tasks.pagination import EstimatedCountPaginator, estimated_row_count
+from tasks.stats import refresh_user_stats
+
+CHANGELIST = "admin:tasks_task_changelist"
+
+
+@pytest.fixture
+def admin_client(client, django_user_model):
+    admin = django_user_model.objects.create_superuser(email="admin@example.com", password="pw")
+    client.force_login(admin)
+    return client
+
+
+def run_action(admin_client, action, tasks):
+    return admin_client.post(
+        reverse(CHANGELIST),
+        {"action": action, "_selected_action": [task.pk for task in tasks]},
+        follow=True,
+    )
+
+
+@pytest.mark.django_db
+class TestEstimatedCountPaginator:
+    """管理画面の件数推定のテスト"""
+
+    def test_unfiltered_uses_estimate_without_count(self, user):
+        """絞り込みがなければ COUNT(*) を実行しない"""
+        # Arrange
+        Task.objects.bulk_create([Task(title=f"タスク{i}", user=user) for i in range(5)])
+        paginator = EstimatedCountPaginator(Task.objects.order_by("-created_at"), 2)
+
+        # Act
+        with CaptureQueriesContext(connection) as ctx:
+            count = paginator.count
+
+        # Assert
+        assert count == 5
+        assert not any("COUNT(" in query["sql"] for query in ctx.captured_queries)
+
+    def test_uses_sqlite_stat1_after_analyze(self, user):
+        Task.objects.bulk_create([Task(title=f"タスク{i}", user=user) for i in range(3)])
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        assert estimated_row_count(Task) == 3
+
+    def test_filtered_count_is_capped(self, user, settings):
+        """絞り込み時は上限件数で打ち切って数える"""
+        settings.TASKS_ADMIN_COUNT_LIMIT = 3
+        Task.objects.bulk_create([Task(title=f"タスク{i}", user=user) for i in range(5)])
+
+        paginator = EstimatedCountPaginator(Task.objects.filter(is_completed=False).order_by("-created_at"), 2)
+
+        assert paginator.count == 3
+
+
+@pytest.mark.django_db
+class TestTaskAdmin:
+    """tasks.admin.TaskAdmin の一覧・検索・一括アクションのテスト"""
+
+    def test_changelist_does_not_count_full_table(self, admin_client, user):
+        """絞り込み・検索しても全件の COUNT(*) を実行しない"""
+        Task.objects.create(title="請求書の確認", user=user)
+        Task.objects.create(title="デプロイ", user=user, is_completed=True)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = admin_client.get(reverse(CHANGELIST), {"q": "請求書", "is_completed__exact": "0"})
+
+        assert [task.title for task in response.context["cl"].result_list] == ["請求書の確認"]
+        counts = [query["sql"] for query in ctx.captured_queries if "COUNT(" in query["sql"]]
+        assert counts and all("LIMIT" in sql for sql in counts)
+
+    def test_complete_action_skips_tasks_with_open_subtasks(self, admin_client, user):
+        """一緒に選択した子は妨げにならず、選択外の未完了の子を持つタスクと、その祖先は除く"""
+        # Arrange
+        done_parent = Task.objects.create(title="親（子も選択）", user=user)
+        done_child = Task.objects.create(title="子", parent=done_parent, user=user)
+        top = Task.objects.create(title="最上位", user=user)
+        blocked = Task.objects.create(title="親（子は選択外）", parent=top, user=user)
+        Task.objects.create(title="選択外の子", parent=blocked, user=user)
+
+        # Act
+        response = run_action(admin_client, "complete_selected", [done_parent, done_child, top, blocked])
+
+        # Assert
+        assert set(Task.objects.filter(is_completed=True)) == {done_parent, done_child}
+        assert "2 件のタスクを完了にしました" in response.content.decode()
+        done_parent.refresh_from_db()
+        assert done_parent.incomplete_subtask_count == 0
+        assert refresh_user_stats() == []
+
+    def test_reopen_and_archive_actions(self, admin_client, user):
+        """未完了に戻す・アーカイブで、親のカウンタと集計も更新する"""
+        parent = Task.objects.create(title="親", user=user)
+        child = Task.objects.create(title="子", parent=parent, user=user, is_completed=True)
+
+        run_action(admin_client, "reopen_selected", [child])
+        run_action(admin_client, "archive_selected", [parent, child])
+
+        parent.refresh_from_db()
+        assert parent.incomplete_subtask_count == 1
+        assert Task.objects.filter(is_archived=True).count() == 2
+        assert refresh_user_stats() == []
@@ -0,0 +1,189 @@
+# task_manager/tasks/tests/test_api_views.py
+
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from tasks.models import Task
+
+
+@pytest.mark.django_db
+class TestTaskListApi:
+    """/api/tasks/ 系 JSON API のテスト"""
+
+    def test_list_is_paginated_with_cursor(self, client):
+        # Arrange: 3件のタスクを作成
+        tasks = [Task.objects.create(title=f"Task {i}") for i in range(3)]
+        url = reverse("tasks_api:task_list")
+
+        # Act: page_size=2 で先頭ページ → next カーソルで次ページ
+        first = client.get(url, {"page_size": 2}).json()
+        second = client.get(url, {"page_size": 2, "cursor": first["next"]}).json()
+
+        # Assert: 新しい順に分割され、最終ページの next は None
+        assert [t["id"] for t in first["tasks"]] == [tasks[2].pk, tasks[1].pk]
+        assert [t["id"] for t in second["tasks"]] == [tasks[0].pk]
+        assert second["next"] is None
+        assert second["prev"] is not None
+
+    def test_invalid_cursor_returns_400(self, client):
+        # Act
+        response = client.get(reverse("tasks_api:task_list"), {"cursor": "broken"})
+
+        # Assert
+        assert response.status_code == 400
+
+    def test_list_by_completion_is_paginated(self, client):
+        # Arrange
+        Task.objects.create(title="Done 1", is_completed=True)
+        Task.objects.create(title="Done 2", is_completed=True)
+        Task.objects.create(title="Todo", is_completed=False)
+
+        # Act
+        url = reverse("tasks_api:task_list_by_completion", args=["true"])
+        data = client.get(url, {"page_size": 1}).json()
+
+        # Assert
+        assert [t["title"] for t in data["tasks"]] == ["Done 2"]
+        assert data["next"] is not None
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+    """?fields= による列指定のテスト"""
+
+    def test_only_requested_columns_are_selected(self, client):
+        # Arrange
+        Task.objects.create(title="Task", description="とても長い説明")
+
+        # Act
+        with CaptureQueriesContext(connection) as ctx:
+            data = client.get(reverse("tasks_api:task_list"), {"fields": "id,title"}).json()
+
+        # Assert: 返すのは指定列のみで、description は SELECT されない
+        assert list(data["tasks"][0]) == ["id", "title"]
+        assert not any("description" in q["sql"] for q in ctx.captured_queries)
+
+    def test_pagination_works_without_cursor_columns(self, client):
+        # Arrange: id / created_at を要求しなくてもカーソルは作れる
+        Task.objects.create(title="A")
+        Task.objects.create(title="B")
+        url = reverse("tasks_api:task_list")
+
+        # Act
+        first = client.get(url, {"fields": "title", "page_size": 1}).json()
+        second = client.get(url, {"fields": "title", "page_size": 1, "cursor": first["next"]}).json()
+
+        # Assert
+        assert first["tasks"] == [{"title": "B"}]
+        assert second["tasks"] == [{"title": "A"}]
+
+    @pytest.mark.parametrize("name, args", [
+        ("tasks_api:task_list", []),
+        ("tasks_api:task_list_simple", []),
+        ("tasks_api:task_list_by_user", [1]),
+        ("tasks_api:task_export", []),
+        ("tasks_api:task_list_async", []),
+    ])
+    def test_unknown_field_returns_400(self, client, name, args):
+        response = client.get(reverse(name, args=args), {"fields": "id,password"})
+        assert response.status_code == 400
+
+    def test_export_and_simple_respect_fields(self, client):
+        # Arrange
+        Task.objects.create(title="Task", is_completed=True)
+
+        # Act
+        export = client.get(reverse("tasks_api:task_export"), {"format": "ndjson", "fields": "title,is_completed"})
+        simple = client.get(reverse("tasks_api:task_list_simple"), {"fields": "title"}).json()
+
+        # Assert
+        assert json.loads(b"".join(export.streaming_content)) == {"title": "Task", "is_completed": True}
+        assert simple == [{"title": "Task"}]
+
+
+@pytest.mark.django_db
+class TestTaskExportApi:
+    """/api/tasks/export/ ストリーミングエクスポートのテスト"""
+
+    def test_json_export_streams_all_tasks(self, client, settings):
+        # Arrange: チャンクより多い件数を用意
+        settings.TASKS_EXPORT_CHUNK_SIZE = 2
+        tasks = [Task.objects.create(title=f"Task {i}") for i in range(5)]
+
+        # Act
+        response = client.get(reverse("tasks_api:task_export"))
+
+        # Assert: ストリーミングで返り、全件が新しい順に含まれる
+        assert response.streaming
+        data = json.loads(b"".join(response.streaming_content))
+        assert [t["id"] for t in data["tasks"]] == [t.pk for t in reversed(tasks)]
+
+    def test_ndjson_export_applies_filters(self, client):
+        # Arrange
+        Task.objects.create(title="Done", is_completed=True)
+        Task.objects.create(title="Todo", is_completed=False)
+
+        # Act
+        response = client.get(reverse("tasks_api:task_export"), {"format": "ndjson", "is_completed": "true"})
+
+        # Assert: 1行1タスクで、条件に合うものだけ
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert [json.loads(line)["title"] for line in lines] == ["Done"]
+
+    def test_unknown_format_returns_400(self, client):
+        response = client.get(reverse("tasks_api:task_export"), {"format": "xml"})
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncTaskListApi:
+    """/api/tasks/async/ 系（async ORM 版）のテスト"""
+
+    @pytest.mark.parametrize("sync_name, async_name, args", [
+        ("tasks_api:task_list", "tasks_api:task_list_async", []),
+        ("tasks_api:task_list_by_completion", "tasks_api:task_list_by_completion_async", ["true"]),
+        ("tasks_api:task_list_simple", "tasks_api:task_list_simple_async", []),
+    ])
+    def test_same_response_as_sync_view(self, client, sync_name, async_name, args):
+        # Arrange
+        for i in range(3):
+            Task.objects.create(title=f"Task {i}", is_completed=i % 2 == 0)
+
+        # Act
+        expected = client.get(reverse(sync_name, args=args), {"page_size": 2}).json()
+        actual = client.get(reverse(async_name, args=args), {"page_size": 2}).json()
+
+        # Assert: 同期版と同じ JSON（カーソルも互換）
+        assert actual == expected
+
+    def test_simple_filters_match_sync_view(self, client, user):
+        """簡素版の is_completed / user_id の絞り込みも同期版と同じ"""
+        Task.objects.create(title="自分の未完了", user=user)
+        Task.objects.create(title="自分の完了", user=user, is_completed=True)
+        Task.objects.create(title="所有者なし")
+        params = {"is_completed": "false", "user_id": user.pk}
+
+        expected = client.get(reverse("tasks_api:task_list_simple"), params).json()
+        actual = client.get(reverse("tasks_api:task_list_simple_async"), params).json()
+
+        assert [task["title"] for task in expected] == ["自分の未完了"]
+        assert actual == expected
+
+    def test_by_user_follows_cursor(self, client, user):
+        # Arrange
+        tasks = [Task.objects.create(title=f"Task {i}", user=user) for i in range(3)]
+        url = reverse("tasks_api:task_list_by_user_async", args=[user.pk])
+
+        # Act
+        first = client.get(url, {"page_size": 2}).json()
+        second = client.get(url, {"page_size": 2, "cursor": first["next"]}).json()
+
+        # Assert
+        assert [t["id"] for t in first["tasks"] + second["tasks"]] == [t.pk for t in reversed(tasks)]
+
+    def test_invalid_cursor_returns_400(self, client):
+        response = client.get(reverse("tasks_api:task_list_async"), {"cursor": "broken"})
+        assert response.status_code == 400
@@ -0,0 +1,144 @@
+# task_manager/tasks/tests/test_archive.py
+
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from tasks.models import ArchivedTask, Task, TaskClosure, TaskTombstone
+from tasks.pagination import paginate_merged
+from tasks.services import archivable_roots, archive_task_trees
+
+
+def _age(*tasks, days=100):
+    """updated_at を days 日前にする（auto_now を経由しない）"""
+    Task.objects.filter(pk__in=[t.pk for t in tasks]).update(updated_at=timezone.now() - timedelta(days=days))
+
+
+def _archived_tree(user=None, title="Old"):
+    root = Task.objects.create(title=title, is_archived=True, user=user)
+    child = Task.objects.create(title=f"{title} child", is_archived=True, parent=root, user=user)
+    _age(root, child)
+    return root, child
+
+
+@pytest.mark.django_db
+class TestArchiveTaskTrees:
+    """保管テーブルへの移動のテスト"""
+
+    def test_only_fully_archived_old_trees_are_archivable(self):
+        # Arrange
+        old, _ = _archived_tree()
+        mixed, _ = _archived_tree(title="Mixed")
+        Task.objects.create(title="Active child", parent=mixed)  # 未アーカイブの子がある
+        recent = Task.objects.create(title="Recent", is_archived=True)
+
+        # Act
+        roots = list(archivable_roots(timedelta(days=90)))
+
+        # Assert
+        assert roots == [old.pk]
+        assert recent.pk not in roots
+
+    def test_tree_is_moved_with_same_ids(self, user):
+        # Arrange
+        root, child = _archived_tree(user)
+
+        # Act
+        moved = archive_task_trees([root.pk])
+
+        # Assert: 行は同じ id・親子関係で保管テーブルに移り、Task と階層からは消える
+        assert moved == 2
+        assert not Task.objects.filter(pk__in=[root.pk, child.pk]).exists()
+        assert not TaskClosure.objects.filter(descendant_id__in=[root.pk, child.pk]).exists()
+        archived = ArchivedTask.objects.get(pk=child.pk)
+        assert archived.parent_id == root.pk
+        assert archived.user_id == user.pk
+        assert archived.title == "Old child"
+
+        # 差分同期のクライアントには削除として伝わる
+        assert set(TaskTombstone.objects.values_list("task_id", flat=True)) == {root.pk, child.pk}
+
+    def test_command_moves_in_batches(self):
+        # Arrange
+        roots = [_archived_tree(title=f"Old {i}")[0] for i in range(3)]
+        Task.objects.create(title="Active")
+
+        # Act
+        call_command("archive_tasks", "--days", "90", "--batch-size", "2")
+
+        # Assert
+        assert ArchivedTask.objects.filter(parent__isnull=True).count() == len(roots)
+        assert list(Task.objects.values_list("title", flat=True)) == ["Active"]
+
+
+@pytest.mark.django_db
+class TestArchiveReadThrough:
+    """is_archived=true 指定時に保管テーブルも読むことのテスト"""
+
+    def test_paginate_merged_interleaves_sources(self):
+        # Arrange: 作成順に 保管 → 通常 → 保管 → 通常 となるようにする
+        first, _ = _archived_tree(title="A")
+        second = Task.objects.create(title="B", is_archived=True)
+        third, _ = _archived_tree(title="C")
+        fourth = Task.objects.create(title="D", is_archived=True)
+        archive_task_trees([first.pk, third.pk])
+        sources = [
+            Task.objects.filter(parent__isnull=True),
+            ArchivedTask.objects.filter(parent__isnull=True),
+        ]
+
+        # Act
+        page1 = paginate_merged(sources, page_size=3)
+        page2 = paginate_merged(sources, cursor=page1.next_cursor, page_size=3)
+        back = paginate_merged(sources, cursor=page2.prev_cursor, page_size=3)
+
+        # Assert
+        assert [t.title for t in page1] == ["D", "C", "B"]
+        assert [t.title for t in page2] == ["A"]
+        assert page2.next_cursor is None
+        assert [t.title for t in back] == ["D", "C", "B"]
+
+    def test_api_includes_archive_only_for_archived_filter(self, client):
+        # Arrange
+        root, _ = _archived_tree()
+        archive_task_trees([root.pk])
+        hot = Task.objects.create(title="Hot", is_archived=True)
+        url = reverse("tasks_api:task_list")
+
+        # Act
+        archived = client.get(url, {"is_archived": "true"}).json()
+        everything = client.get(url).json()
+
+        # Assert
+        assert {t["title"] for t in archived["tasks"]} == {"Hot", "Old", "Old child"}
+        assert [t["id"] for t in everything["tasks"]] == [hot.pk]
+
+    def test_export_merges_archive(self, client):
+        # Arrange
+        root, child = _archived_tree()
+        archive_task_trees([root.pk])
+        hot = Task.objects.create(title="Hot", is_archived=True)
+
+        # Act
+        response = client.get(reverse("tasks_api:task_export"), {"is_archived": "true", "fields": "id"})
+        data = b"".join(response.streaming_content)
+
+        # Assert: 新しい順に併合される
+        ids = [t["id"] for t in json.loads(data)["tasks"]]
+        assert ids == [hot.pk, child.pk, root.pk]
+
+    def test_html_list_shows_archived_tasks_without_link(self, client, user):
+        # Arrange
+        root, _ = _archived_tree(user)
+        archive_task_trees([root.pk])
+        client.force_login(user)
+
+        # Act
+        response = client.get(reverse("tasks:task_list"), {"is_archived": "true"})
+
+        # Assert: トップレベルのみ表示し、詳細ページへのリンクは出さない
+        assert [t.title for t in response.context["tasks"]] == ["Old"]
+        assert reverse("tasks:task_detail", args=[root.pk]) not in response.content.decode()
@@ -0,0 +1,148 @@
+# task_manager/tasks/tests/test_bulk.py
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+from tasks.models import Task
+from tasks.services import (
+    bulk_complete_tasks,
+    bulk_create_tasks,
+    bulk_update_tasks,
+    get_descendants,
+)
+
+
+@pytest.mark.django_db
+class TestBulkServices:
+    """一括操作サービスのテスト"""
+
+    def test_bulk_create_maintains_hierarchy_and_counters(self, user):
+        """bulk_create でもクロージャテーブルと親のカウンタが更新される"""
+        parent = Task.objects.create(title="親", user=user)
+
+        tasks = bulk_create_tasks(user, [
+            {"title": "子1", "parent": parent.pk},
+            {"title": "子2", "parent": parent.pk, "is_completed": True},
+        ])
+
+        parent.refresh_from_db()
+        assert (parent.subtask_count, parent.incomplete_subtask_count) == (2, 1)
+        assert set(get_descendants(parent)) == set(tasks)
+
+    def test_bulk_create_rejects_foreign_parent(self, user, other):
+        """他人のタスクを親に指定すると拒否される"""
+        foreign = Task.objects.create(title="他人の親", user=other)
+
+        with pytest.raises(ValidationError):
+            bulk_create_tasks(user, [{"title": "子", "parent": foreign.pk}])
+
+    def test_bulk_complete_checks_subtasks_in_one_query(self, user, django_assert_max_num_queries):
+        """未完了の子を持つタスクがあれば全体を拒否する（件数によらずクエリ数一定）"""
+        parents = [Task.objects.create(title=f"親{i}", user=user) for i in range(5)]
+        Task.objects.create(title="未完了の子", parent=parents[0], user=user)
+
+        # SAVEPOINT 関連 3 + 所有者チェック 1 + 子タスク判定 1
+        with django_assert_max_num_queries(5):
+            with pytest.raises(ValidationError):
+                bulk_complete_tasks(user, [p.pk for p in parents])
+        assert not Task.objects.filter(is_completed=True).exists()
+
+    def test_bulk_complete_with_children_in_same_batch(self, user):
+        """子タスクも同時に完了するなら親も完了できる"""
+        parent = Task.objects.create(title="親", user=user)
+        child = Task.objects.create(title="子", parent=parent, user=user)
+
+        assert bulk_complete_tasks(user, [parent.pk, child.pk]) == 2
+
+        parent.refresh_from_db()
+        assert parent.is_completed is True
+        assert parent.incomplete_subtask_count == 0
+
+    def test_bulk_update_reparent_and_rename(self, user):
+        """bulk_update で付け替えた場合も階層とカウンタが整合する"""
+        a = Task.objects.create(title="A", user=user)
+        b = Task.objects.create(title="B", user=user)
+        child = Task.objects.create(title="子", parent=a, user=user)
+
+        bulk_update_tasks(user, [{"id": child.pk, "parent": b.pk, "title": "子（移動）"}])
+
+        child.refresh_from_db()
+        a.refresh_from_db()
+        b.refresh_from_db()
+        assert child.title == "子（移動）"
+        assert (a.subtask_count, b.subtask_count) == (0, 1)
+        assert list(get_descendants(b)) == [child]
+
+    def test_bulk_update_rejects_cycle(self, user):
+        """子孫を親に指定する更新は拒否される"""
+        a = Task.objects.create(title="A", user=user)
+        child = Task.objects.create(title="子", parent=a, user=user)
+
+        with pytest.raises(ValidationError):
+            bulk_update_tasks(user, [{"id": a.pk, "parent": child.pk}])
+
+    def test_bulk_update_rejects_cycle_within_batch(self, user):
+        """同じバッチ内で親を入れ替えて循環させる更新も拒否し、何も変更しない"""
+        a = Task.objects.create(title="A", user=user)
+        b = Task.objects.create(title="B", user=user)
+        top = Task.objects.create(title="最上位", user=user)
+        c = Task.objects.create(title="C", parent=top, user=user)
+
+        with pytest.raises(ValidationError):
+            bulk_update_tasks(user, [{"id": a.pk, "parent": b.pk}, {"id": b.pk, "parent": a.pk}])
+        # 移動先（C）の DB 上の祖先（最上位）を経由する循環
+        with pytest.raises(ValidationError):
+            bulk_update_tasks(user, [{"id": top.pk, "parent": a.pk}, {"id": a.pk, "parent": c.pk}])
+
+        assert not Task.objects.filter(pk__in=[a.pk, b.pk, top.pk], parent__isnull=False).exists()
+
+
+@pytest.mark.django_db
+class TestBulkApi:
+    """/api/tasks/bulk/ 系 API のテスト"""
+
+    def test_requires_login(self, client):
+        response = client.post(reverse("tasks_api:task_bulk_archive"), {"ids": [1]}, content_type="application/json")
+        assert response.status_code == 403
+
+    def test_bulk_create_and_archive(self, client, user):
+        client.force_login(user)
+
+        created = client.post(
+            reverse("tasks_api:task_bulk_create"),
+            {"tasks": [{"title": "A"}, {"title": "B"}]},
+            content_type="application/json",
+        )
+        ids = [t["id"] for t in created.json()["tasks"]]
+        archived = client.post(
+            reverse("tasks_api:task_bulk_archive"), {"ids": ids}, content_type="application/json"
+        )
+
+        assert created.status_code == 201
+        assert archived.json() == {"updated": 2}
+        assert Task.objects.filter(user=user, is_archived=True).count() == 2
+
+    def test_bulk_complete_with_open_subtask_returns_400(self, client, user):
+        client.force_login(user)
+        parent = Task.objects.create(title="親", user=user)
+        Task.objects.create(title="子", parent=parent, user=user)
+
+        response = client.post(
+            reverse("tasks_api:task_bulk_complete"), {"ids": [parent.pk]}, content_type="application/json"
+        )
+
+        assert response.status_code == 400
+
+    def test_bulk_update_swapping_parents_returns_400(self, client, user):
+        """バッチ内で循環する親の入れ替えは 500 ではなく 400"""
+        client.force_login(user)
+        a = Task.objects.create(title="A", user=user)
+        b = Task.objects.create(title="B", user=user)
+
+        response = client.post(
+            reverse("tasks_api:task_bulk_update"),
+            {"tasks": [{"id": a.pk, "parent": b.pk}, {"id": b.pk, "parent": a.pk}]},
+            content_type="application/json",
+        )
+
+        assert response.status_code == 400
@@ -0,0 +1,72 @@
+# task_manager/tasks/tests/test_cache.py
+
+import pytest
+from django.urls import reverse
+from tasks.models import Task
+from tasks.services import bulk_archive_tasks
+
+
+@pytest.mark.django_db
+class TestTaskListCache:
+    """タスク一覧レスポンスキャッシュのテスト"""
+
+    def test_second_request_is_served_from_cache(self, client, django_assert_num_queries):
+        # Arrange: 1回目でキャッシュを作る
+        Task.objects.create(title="Task")
+        url = reverse("tasks_api:task_list")
+        first = client.get(url)
+
+        # Act / Assert: 2回目は DB に問い合わせない
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second.content == first.content
+        assert second["Content-Type"] == first["Content-Type"]
+
+    def test_query_params_are_part_of_key(self, client):
+        # Arrange
+        Task.objects.create(title="Done", is_completed=True)
+        Task.objects.create(title="Todo", is_completed=False)
+        url = reverse("tasks_api:task_list")
+
+        # Act
+        done = client.get(url, {"is_completed": "true"}).json()
+        todo = client.get(url, {"is_completed": "false"}).json()
+
+        # Assert
+        assert [t["title"] for t in done["tasks"]] == ["Done"]
+        assert [t["title"] for t in todo["tasks"]] == ["Todo"]
+
+    def test_save_and_delete_invalidate(self, client, user):
+        # Arrange
+        task = Task.objects.create(title="Before", user=user)
+        url = reverse("tasks_api:task_list")
+        client.get(url, {"user_id": user.pk})
+
+        # Act / Assert: 保存後は新しい内容が返る
+        task.title = "After"
+        task.save()
+        assert client.get(url, {"user_id": user.pk}).json()["tasks"][0]["title"] == "After"
+
+        # Act / Assert: 削除後は空になる
+        task.delete()
+        assert client.get(url, {"user_id": user.pk}).json()["tasks"] == []
+
+    def test_bulk_update_invalidates(self, client, user):
+        # Arrange: シグナルを経由しない一括更新でも無効になること
+        task = Task.objects.create(title="Task", user=user)
+        url = reverse("tasks_api:task_list")
+        client.get(url)
+
+        # Act
+        bulk_archive_tasks(user, [task.pk])
+
+        # Assert
+        assert client.get(url).json()["tasks"][0]["is_archived"] is True
+
+    def test_error_responses_are_not_cached(self, client):
+        # Arrange
+        url = reverse("tasks_api:task_list")
+
+        # Act / Assert: 400 はキャッシュされず毎回ビューが実行される
+        assert client.get(url, {"cursor": "broken"}).status_code == 400
+        assert client.get(url, {"cursor": "broken"}).status_code == 400
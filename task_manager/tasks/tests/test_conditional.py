@@ -0,0 +1,139 @@
+# task_manager/tasks/tests/test_conditional.py
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from tasks.models import Task
+
+
+@pytest.mark.django_db
+class TestConditionalApi:
+    """JSON API の ETag / Last-Modified のテスト"""
+
+    def test_if_none_match_returns_304(self, client, django_assert_num_queries):
+        # Arrange: 1回目で ETag を受け取り、レスポンスキャッシュは空にしておく
+        Task.objects.create(title="Task")
+        url = reverse("tasks_api:task_list")
+        etag = client.get(url)["ETag"]
+        cache.clear()
+
+        # Act / Assert: 集計1クエリだけで 304
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_cached_response_answers_304_without_queries(self, client, django_assert_num_queries):
+        # Arrange
+        Task.objects.create(title="Task")
+        url = reverse("tasks_api:task_list")
+        etag = client.get(url)["ETag"]
+
+        # Act / Assert: キャッシュに保存した ETag で判定するため DB に問い合わせない
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_change_and_delete_update_etag(self, client, user):
+        # Arrange
+        task = Task.objects.create(title="A", user=user)
+        other = Task.objects.create(title="B", user=user)
+        url = reverse("tasks_api:task_list_by_user", args=[user.pk])
+        first = client.get(url)["ETag"]
+
+        # Act / Assert: 更新すると ETag が変わり 200 が返る
+        task.title = "A2"
+        task.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=first)
+        assert response.status_code == 200
+        second = response["ETag"]
+        assert second != first
+
+        # Act / Assert: 削除（最大 updated_at は不変）でも件数で変わる
+        Task.objects.filter(pk=other.pk).update(updated_at=task.updated_at.replace(year=2000))
+        third = client.get(url)["ETag"]
+        other.delete()
+        assert client.get(url, HTTP_IF_NONE_MATCH=third).status_code == 200
+
+    def test_query_params_change_etag(self, client):
+        # Arrange
+        Task.objects.create(title="Task", is_completed=True)
+        url = reverse("tasks_api:task_list_by_completion", args=["true"])
+
+        # Act
+        etag = client.get(url)["ETag"]
+        response = client.get(url, {"page_size": 1}, HTTP_IF_NONE_MATCH=etag)
+
+        # Assert: ページサイズが違えば別のレスポンスとして扱う
+        assert response.status_code == 200
+
+    def test_if_modified_since(self, client):
+        # Arrange
+        Task.objects.create(title="Task", is_completed=False)
+        url = reverse("tasks_api:task_list_by_completion", args=["false"])
+        last_modified = client.get(url)["Last-Modified"]
+
+        # Act
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        # Assert
+        assert response.status_code == 304
+
+
+@pytest.mark.django_db
+class TestConditionalDetail:
+    """タスク詳細ページの ETag のテスト"""
+
+    def test_subtask_change_updates_etag(self, client):
+        # Arrange
+        parent = Task.objects.create(title="親")
+        child = Task.objects.create(title="子", parent=parent)
+        grandchild = Task.objects.create(title="孫", parent=child)
+        url = reverse("tasks:task_detail", args=[parent.pk])
+        etag = client.get(url)["ETag"]
+
+        # Act / Assert: 変更がなければ 304
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        # Act / Assert: 孫タスクの変更でも ETag が変わる
+        grandchild.title = "孫（変更）"
+        grandchild.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert "孫（変更）" in response.content.decode()
+
+    def test_parent_rename_updates_child_etag(self, client):
+        # Arrange: 子の詳細ページには親タスク名が表示される
+        parent = Task.objects.create(title="親")
+        child = Task.objects.create(title="子", parent=parent)
+        url = reverse("tasks:task_detail", args=[child.pk])
+        etag = client.get(url)["ETag"]
+
+        # Act
+        parent.title = "親（変更）"
+        parent.save()
+
+        # Assert
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_relogin_updates_etag(self, client, user):
+        """フォームを含むページは、再ログインで CSRF シークレットが替わると 304 を返さない"""
+        # Arrange
+        task = Task.objects.create(title="タスク", user=user)
+        url = reverse("tasks:task_detail", args=[task.pk])
+        client.force_login(user)
+        first = client.get(url)
+        assert client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code == 304
+
+        # Act: ログインし直す（CSRF シークレットが作り直される）
+        client.logout()
+        client.login(email=user.email, password="pw")
+        response = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        # Assert: 新しいトークンのページが返り、Last-Modified による 304 も起きない
+        assert response.status_code == 200
+        assert "Last-Modified" not in first
+
+    def test_missing_task_is_404(self, client):
+        response = client.get(reverse("tasks:task_detail", args=[999]), HTTP_IF_NONE_MATCH='"x"')
+        assert response.status_code == 404
@@ -0,0 +1,85 @@
+# task_manager/tasks/tests/test_counters.py
+
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from tasks.models import Task
+from tasks.services import complete_task, reopen_task
+
+
+def _counters(task):
+    task.refresh_from_db()
+    return task.subtask_count, task.incomplete_subtask_count
+
+
+@pytest.mark.django_db
+class TestSubtaskCounters:
+    """子タスク数カウンタ（subtask_count / incomplete_subtask_count）のテスト"""
+
+    def test_create_and_delete_child(self):
+        """子の作成・削除でカウンタが増減する"""
+        parent = Task.objects.create(title="親")
+        child = Task.objects.create(title="子", parent=parent)
+        Task.objects.create(title="完了済みの子", parent=parent, is_completed=True)
+
+        assert _counters(parent) == (2, 1)
+
+        child.delete()
+        assert _counters(parent) == (1, 0)
+
+    def test_complete_and_reopen_child(self):
+        """子の完了・再開で未完了数が増減する"""
+        parent = Task.objects.create(title="親")
+        child = Task.objects.create(title="子", parent=parent)
+
+        complete_task(child)
+        assert _counters(parent) == (1, 0)
+
+        reopen_task(child)
+        assert _counters(parent) == (1, 1)
+
+    def test_reparent_child(self):
+        """付け替えで旧親・新親の両方が更新される"""
+        old_parent = Task.objects.create(title="旧親")
+        new_parent = Task.objects.create(title="新親")
+        child = Task.objects.create(title="子", parent=old_parent)
+
+        child.parent = new_parent
+        child.save()
+
+        assert _counters(old_parent) == (0, 0)
+        assert _counters(new_parent) == (1, 1)
+
+    def test_stale_parent_save_does_not_overwrite_counters(self):
+        """古いカウンタを持った親インスタンスを保存してもカウンタは壊れない"""
+        parent = Task.objects.create(title="親")
+        stale = Task.objects.get(pk=parent.pk)
+        Task.objects.create(title="子", parent=parent)
+
+        stale.title = "親（更新）"
+        stale.save()
+
+        assert _counters(parent) == (1, 1)
+
+    def test_complete_task_uses_counter(self, django_assert_num_queries):
+        """complete_task の子タスク判定は主キー検索1回で済む"""
+        parent = Task.objects.create(title="親")
+        Task.objects.create(title="子", parent=parent, is_completed=True)
+        parent = Task.objects.get(pk=parent.pk)
+
+        # 判定 1 + 保存（SAVEPOINT / UPDATE / RELEASE）
+        with django_assert_num_queries(4):
+            complete_task(parent)
+
+    def test_rebuild_command_fixes_drift(self):
+        """rebuild_subtask_counters がずれたカウンタを修正する"""
+        parent = Task.objects.create(title="親")
+        Task.objects.create(title="子", parent=parent)
+        Task.objects.filter(pk=parent.pk).update(subtask_count=5, incomplete_subtask_count=0)
+
+        out = StringIO()
+        call_command("rebuild_subtask_counters", stdout=out)
+
+        assert _counters(parent) == (1, 1)
+        assert "1 件" in out.getvalue()
@@ -0,0 +1,188 @@
+# task_manager/tasks/tests/test_events.py
+
+import asyncio
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from tasks import events
+from tasks.events import EventHub, TaskEvent
+from tasks.models import Task
+from tasks.services import bulk_complete_tasks, complete_subtree, complete_task, delete_subtree
+
+
+@pytest.fixture
+def published(monkeypatch):
+    """hub に送られたイベントを記録する"""
+    sent = []
+    monkeypatch.setattr(events.hub, "publish", sent.append)
+    return sent
+
+
+@pytest.mark.django_db
+class TestTaskEventSignals:
+    """シグナル・一括操作からの変更イベントのテスト"""
+
+    def test_events_are_published_after_commit(self, user, published, django_capture_on_commit_callbacks):
+        # Act
+        with django_capture_on_commit_callbacks(execute=True):
+            task = Task.objects.create(title="Task", user=user)
+            assert published == []  # コミット前は送らない
+        with django_capture_on_commit_callbacks(execute=True):
+            task.title = "Renamed"
+            task.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            complete_task(task)
+
+        # Assert
+        assert [e.type for e in published] == [events.CREATED, events.UPDATED, events.COMPLETED]
+        assert all(e.user_id == user.pk for e in published)
+        assert published[1].data["title"] == "Renamed"
+        assert published[2].data["is_completed"] is True
+
+    def test_cascade_delete_publishes_each_task(self, user, published, django_capture_on_commit_callbacks):
+        # Arrange
+        parent = Task.objects.create(title="Parent", user=user)
+        child = Task.objects.create(title="Child", parent=parent, user=user)
+        expected = {parent.pk, child.pk}
+
+        # Act
+        with django_capture_on_commit_callbacks(execute=True):
+            parent.delete()
+
+        # Assert
+        assert {e.data["id"] for e in published if e.type == events.DELETED} == expected
+
+    def test_tasks_without_owner_are_not_published(self, published, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            Task.objects.create(title="No owner")
+        assert published == []
+
+    def test_bulk_complete_publishes_completed(self, user, published, django_capture_on_commit_callbacks):
+        # Arrange
+        tasks = [Task.objects.create(title=f"Task {i}", user=user) for i in range(2)]
+        published.clear()
+
+        # Act
+        with django_capture_on_commit_callbacks(execute=True):
+            bulk_complete_tasks(user, [t.pk for t in tasks])
+
+        # Assert
+        assert sorted(e.data["id"] for e in published) == sorted(t.pk for t in tasks)
+        assert {e.type for e in published} == {events.COMPLETED}
+
+
+    def test_subtree_operations_publish_one_event_per_user(self, user, published, django_capture_on_commit_callbacks):
+        """サブツリー操作は子孫ごとではなく、ユーザーごとに1件の subtree イベントを送る"""
+        # Arrange
+        root = Task.objects.create(title="Root", user=user)
+        child = Task.objects.create(title="Child", parent=root, user=user)
+        Task.objects.create(title="Grandchild", parent=child, user=user)
+        published.clear()
+
+        # Act
+        with django_capture_on_commit_callbacks(execute=True):
+            complete_subtree(root)
+        with django_capture_on_commit_callbacks(execute=True):
+            delete_subtree(root)
+
+        # Assert
+        assert [(e.type, e.user_id, e.data) for e in published] == [
+            (events.SUBTREE, user.pk, {"id": root.pk, "action": "completed", "count": 3}),
+            (events.SUBTREE, user.pk, {"id": root.pk, "action": "deleted", "count": 3}),
+        ]
+
+class TestEventHub:
+    """EventHub のテスト"""
+
+    def test_publish_from_other_thread_reaches_subscriber(self):
+        hub = EventHub(replay_size=10, queue_size=10)
+
+        async def scenario():
+            mine = hub.subscribe(1)
+            other = hub.subscribe(2)
+            # 同期ビュー（別スレッド）から送られた場合を再現する
+            thread = threading.Thread(target=hub.publish, args=(TaskEvent("created", 1, {"id": 5}),))
+            thread.start()
+            thread.join()
+            event = await asyncio.wait_for(mine.get(), timeout=1)
+            return event, other.queue.qsize()
+
+        # Act
+        event, other_size = async_to_sync(scenario)()
+
+        # Assert: 所有ユーザーの購読者にだけ届く
+        assert event.data == {"id": 5}
+        assert event.id == 1
+        assert other_size == 0
+
+    def test_replay(self):
+        # Arrange
+        hub = EventHub(replay_size=2, queue_size=10)
+        for i in range(3):
+            hub.publish(TaskEvent("updated", 1, {"id": i}))
+
+        # Act / Assert
+        assert [e.data["id"] for e in hub.replay(1, after=1)] == [1, 2]
+        assert hub.replay(2, after=2) == []
+        assert hub.replay(1, after=0) is None  # 保持範囲より古い
+        assert hub.replay(1, after=99) is None  # この hub が発行していない id
+
+    def test_overflow_is_flagged(self):
+        hub = EventHub(replay_size=10, queue_size=1)
+
+        async def scenario():
+            subscription = hub.subscribe(1)
+            for i in range(2):
+                hub.publish(TaskEvent("updated", 1, {"id": i}))
+            await asyncio.sleep(0)  # call_soon_threadsafe の受け渡しを実行させる
+            return subscription.overflowed
+
+        assert async_to_sync(scenario)() is True
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTaskEventsStream:
+    """/api/tasks/events/（Server-Sent Events）のテスト"""
+
+    def test_anonymous_is_rejected(self):
+        response = async_to_sync(AsyncClient().get)(reverse("tasks_api:task_events"))
+        assert response.status_code == 403
+
+    def test_stream_sends_user_events(self, user):
+        async def scenario():
+            client = AsyncClient()
+            await client.aforce_login(user)
+            response = await client.get(reverse("tasks_api:task_events"))
+            stream = aiter(response.streaming_content)
+            chunks = [await anext(stream)]
+            events.hub.publish(TaskEvent(events.COMPLETED, user.pk, {"id": 7, "is_completed": True}))
+            chunks.append(await asyncio.wait_for(anext(stream), timeout=1))
+            await stream.aclose()
+            return response, chunks
+
+        # Act
+        response, chunks = async_to_sync(scenario)()
+
+        # Assert
+        assert response["Content-Type"] == "text/event-stream"
+        assert chunks[0].startswith(b"retry:")
+        assert b"event: completed\n" in chunks[1]
+        assert b'"id":7' in chunks[1]
+        # 切断で購読が解除される
+        assert events.hub.subscriber_count() == 0
+
+    def test_unknown_last_event_id_sends_reset(self, user):
+        async def scenario():
+            client = AsyncClient()
+            await client.aforce_login(user)
+            response = await client.get(reverse("tasks_api:task_events"), headers={"Last-Event-ID": "999999"})
+            return [chunk async for chunk in response.streaming_content]
+
+        # Act
+        chunks = async_to_sync(scenario)()
+
+        # Assert: 取りこぼしを補えないため、一覧の取り直しを求めて終了する
+        assert b"event: reset\n" in chunks[-1]
@@ -0,0 +1,93 @@
+# task_manager/tasks/tests/test_fragments.py
+
+import pytest
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.urls import reverse
+from tasks import fragments
+from tasks.fragments import render_fragments
+from tasks.models import Task
+from tasks.services import complete_task, get_tree
+
+ROW_TEMPLATE = "tasks/task_list_row.html"
+
+
+@pytest.fixture
+def render_count(monkeypatch):
+    """断片テンプレートのレンダリング回数を数える"""
+    counter = {"rendered": 0}
+
+    class CountingTemplate:
+        def __init__(self, name):
+            self.template = get_template(name)
+
+        def render(self, context):
+            counter["rendered"] += 1
+            return self.template.render(context)
+
+    monkeypatch.setattr(fragments, "get_template", CountingTemplate)
+    return counter
+
+
+@pytest.mark.django_db
+class TestRenderFragments:
+    """行の断片キャッシュ（tasks.fragments）のテスト"""
+
+    def test_renders_only_misses(self, user, render_count):
+        """2回目はキャッシュから返し、変更した行だけをレンダリングし直す"""
+        # Arrange
+        tasks = [Task.objects.create(title=f"タスク{i}", user=user) for i in range(3)]
+        first = render_fragments(ROW_TEMPLATE, tasks)
+        assert render_count["rendered"] == 3
+
+        # Act
+        tasks[1].title = "変更後"
+        tasks[1].save()
+        second = render_fragments(ROW_TEMPLATE, tasks)
+
+        # Assert
+        assert render_count["rendered"] == 4
+        assert second[0] == first[0] and second[2] == first[2]
+        assert "変更後" in second[1]
+
+    def test_single_bulk_lookup_per_page(self, user, monkeypatch):
+        """ページ全体を get_many 1回で読む"""
+        tasks = [Task.objects.create(title=f"タスク{i}", user=user) for i in range(5)]
+        render_fragments(ROW_TEMPLATE, tasks)
+        calls = []
+        get_many = cache.get_many
+        monkeypatch.setattr(cache, "get_many", lambda keys: calls.append(keys) or get_many(keys))
+        monkeypatch.setattr(fragments, "_cache", lambda: cache)
+
+        render_fragments(ROW_TEMPLATE, tasks)
+
+        assert len(calls) == 1 and len(calls[0]) == 5
+
+    def test_counter_change_rerenders_parent_row(self, client, user):
+        """子タスクの完了で、一覧の親の行（子タスクの進捗）が更新される"""
+        parent = Task.objects.create(title="親", user=user)
+        child = Task.objects.create(title="子", parent=parent, user=user)
+        client.force_login(user)
+        assert "1 件中 1 件未完了" in client.get(reverse("tasks:task_list")).content.decode()
+
+        complete_task(child)
+
+        assert "1 件中 0 件未完了" in client.get(reverse("tasks:task_list")).content.decode()
+
+    def test_subtask_depth_is_part_of_key(self, user):
+        """同じ子タスクでも深さが違えば別の断片になる"""
+        root = Task.objects.create(title="親", user=user)
+        child = Task.objects.create(title="子", parent=root, user=user)
+        grandchild = Task.objects.create(title="孫", parent=child, user=user)
+        nodes = list(get_tree(root).walk())[1:]
+
+        html = render_fragments(
+            "tasks/task_detail_subtask.html",
+            nodes,
+            name="node",
+            get_object=lambda node: node.task,
+            extra_key=lambda node: (node.depth,),
+        )
+
+        assert [node.task for node in nodes] == [child, grandchild]
+        assert "padding-left: 1rem" in html[0] and "padding-left: 2rem" in html[1]
@@ -0,0 +1,101 @@
+# task_manager/tasks/tests/test_hierarchy.py
+
+import pytest
+from django.core.exceptions import ValidationError
+from tasks.models import Task, TaskClosure
+from tasks.services import (
+    get_ancestors,
+    get_descendants,
+    get_tree,
+    rebuild_task_closure,
+)
+
+
+def _closure_rows():
+    return set(TaskClosure.objects.values_list("ancestor_id", "descendant_id", "depth"))
+
+
+@pytest.mark.django_db
+class TestTaskHierarchy:
+    """クロージャテーブルによる親子階層のテスト"""
+
+    def _build_tree(self):
+        """
+        root
+        ├── a
+        │   └── a1
+        │       └── a1x
+        └── b
+        """
+        root = Task.objects.create(title="root")
+        a = Task.objects.create(title="a", parent=root)
+        b = Task.objects.create(title="b", parent=root)
+        a1 = Task.objects.create(title="a1", parent=a)
+        a1x = Task.objects.create(title="a1x", parent=a1)
+        return root, a, b, a1, a1x
+
+    def test_descendants_and_ancestors(self, django_assert_num_queries):
+        """子孫・祖先を階層の深さに関係なく1クエリで取得できる"""
+        root, a, b, a1, a1x = self._build_tree()
+
+        with django_assert_num_queries(1):
+            assert set(get_descendants(root)) == {a, b, a1, a1x}
+        with django_assert_num_queries(1):
+            assert list(get_ancestors(a1x)) == [root, a, a1]
+        assert set(get_descendants(a, include_self=True)) == {a, a1, a1x}
+
+    def test_get_tree(self, django_assert_num_queries):
+        """get_tree は1クエリでツリーを組み立てる（兄弟は新しい順）"""
+        root, a, b, a1, a1x = self._build_tree()
+
+        with django_assert_num_queries(1):
+            tree = get_tree(root)
+
+        assert [child.task for child in tree.children] == [b, a]
+        assert [(node.task.title, node.depth) for node in tree.walk()] == [
+            ("root", 0), ("b", 1), ("a", 1), ("a1", 2), ("a1x", 3),
+        ]
+
+    def test_reparent_moves_subtree(self):
+        """親を付け替えるとサブツリーごと祖先が入れ替わる"""
+        root, a, b, a1, a1x = self._build_tree()
+
+        a1.parent = b
+        a1.save()
+
+        assert list(get_ancestors(a1x)) == [root, b, a1]
+        assert set(get_descendants(a)) == set()
+        assert set(get_descendants(b)) == {a1, a1x}
+
+    def test_reparent_to_descendant_is_rejected(self):
+        """子孫を親に指定すると ValidationError になり、変更は保存されない"""
+        root, a, b, a1, a1x = self._build_tree()
+
+        a.parent = a1x
+        with pytest.raises(ValidationError):
+            a.save()
+
+        a.refresh_from_db()
+        assert a.parent_id == root.pk
+        with pytest.raises(ValidationError):
+            a.parent = a1x
+            a.full_clean()
+
+    def test_delete_removes_closure_rows(self):
+        """サブツリーを削除するとクロージャの行も消える"""
+        root, a, b, a1, a1x = self._build_tree()
+
+        a.delete()
+
+        assert set(get_descendants(root)) == {b}
+        assert not TaskClosure.objects.filter(descendant_id__in=[a1.pk, a1x.pk]).exists()
+
+    def test_rebuild_matches_incremental_maintenance(self):
+        """rebuild_task_closure の結果はシグナルでの差分更新と一致する"""
+        self._build_tree()
+        expected = _closure_rows()
+
+        TaskClosure.objects.all().delete()
+        rebuild_task_closure()
+
+        assert _closure_rows() == expected
@@ -0,0 +1,192 @@
+# task_manager/tasks/tests/test_jobs.py
+
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from tasks import jobs
+from tasks.jobs import JOB_TYPES, JobType, claim_next, enqueue, requeue_stale_jobs, work
+from tasks.models import Job, Task
+
+
+@pytest.fixture
+def tree(user):
+    root = Task.objects.create(title="親", user=user)
+    Task.objects.create(title="子", parent=root, user=user)
+    return root
+
+
+def run_pending():
+    """待機中のジョブをこのスレッドで実行する"""
+    return work("test", threading.Event(), poll_interval=0, once=True)
+
+
+@pytest.mark.django_db
+class TestJobApi:
+    """/api/tasks/jobs/ のテスト"""
+
+    def test_enqueue_returns_immediately_and_reports_result(self, client, user, tree):
+        """登録は実行を待たずに 202 を返し、ワーカーの実行後に結果を確認できる"""
+        # Arrange
+        client.force_login(user)
+
+        # Act
+        response = client.post(
+            reverse("tasks_api:job_list"),
+            {"kind": "delete_subtree", "params": {"task_id": tree.pk}},
+            content_type="application/json",
+        )
+
+        # Assert: まだ実行されていない
+        assert response.status_code == 202
+        assert response.json()["status"] == Job.QUEUED
+        assert Task.objects.count() == 2
+
+        # Act / Assert: ワーカーが実行した後
+        assert run_pending() == 1
+        detail = client.get(response["Location"]).json()
+        assert detail["status"] == Job.SUCCEEDED
+        assert detail["result"] == {"deleted": 2}
+        assert (detail["progress"], detail["total"]) == (2, 2)
+        assert not Task.objects.exists()
+
+    @pytest.mark.parametrize("payload", [
+        {"kind": "unknown"},
+        {"kind": "delete_subtree", "params": {}},
+        {"kind": "archive_task_trees"},  # スタッフ専用
+    ])
+    def test_rejects_invalid_jobs(self, client, user, payload):
+        client.force_login(user)
+
+        response = client.post(reverse("tasks_api:job_list"), payload, content_type="application/json")
+
+        assert response.status_code == 400
+        assert not Job.objects.exists()
+
+    def test_other_users_jobs_are_hidden(self, client, user, tree, other):
+        """他人のジョブは一覧に出ず、詳細は 404、他人のタスクは登録できない"""
+        job = enqueue("archive_subtree", {"task_id": tree.pk}, user)
+        client.force_login(other)
+
+        assert client.get(reverse("tasks_api:job_list")).json() == {"jobs": []}
+        assert client.get(reverse("tasks_api:job_detail", args=[job.pk])).status_code == 404
+        response = client.post(
+            reverse("tasks_api:job_list"),
+            {"kind": "archive_subtree", "params": {"task_id": tree.pk}},
+            content_type="application/json",
+        )
+        assert response.status_code == 400
+
+    def test_export_and_download(self, client, user, tree, settings, tmp_path):
+        """書き出しジョブの出力は完了後にダウンロードでき、完了前は 409"""
+        settings.TASKS_JOBS_EXPORT_DIR = tmp_path
+        client.force_login(user)
+        job = enqueue("export_tasks", {"format": "csv"}, user)
+        url = reverse("tasks_api:job_download", args=[job.pk])
+        assert client.get(url).status_code == 409
+
+        run_pending()
+        response = client.get(url)
+
+        assert response.status_code == 200
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert lines[0].startswith("id,title")
+        assert len(lines) == 3
+        job.refresh_from_db()
+        assert (job.progress, job.total, job.result["rows"]) == (2, 2, 2)
+
+
+@pytest.mark.django_db
+class TestJobRunner:
+    """tasks.jobs のワーカー処理のテスト"""
+
+    def test_failure_is_recorded(self, user, tree):
+        """実行時の例外は failed として記録し、ワーカーは止まらない"""
+        failing = enqueue("complete_subtree", {"task_id": tree.pk}, user)
+        succeeding = enqueue("bulk_archive", {"ids": [tree.pk]}, user)
+        tree.delete()
+
+        run_pending()
+
+        failing.refresh_from_db()
+        succeeding.refresh_from_db()
+        assert failing.status == Job.FAILED
+        assert "DoesNotExist" in failing.error
+        assert succeeding.status == Job.FAILED  # 削除済みのタスクは操作できない
+        assert "ValidationError" in succeeding.error
+
+    def test_job_is_claimed_once(self, user, tree):
+        enqueue("archive_subtree", {"task_id": tree.pk}, user)
+
+        assert claim_next("a") is not None
+        assert claim_next("b") is None
+
+    def test_requeue_stale_jobs(self, user, tree):
+        """進捗のないまま running で残ったジョブを queued に戻す"""
+        job = enqueue("archive_subtree", {"task_id": tree.pk}, user)
+        claim_next("crashed")
+        Job.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+
+        assert requeue_stale_jobs(timedelta(minutes=10)) == 1
+        job.refresh_from_db()
+        assert (job.status, job.worker) == (Job.QUEUED, "")
+
+
+@pytest.mark.django_db(transaction=True)
+class TestJobHeartbeat:
+    """実行中のジョブのハートビートのテスト（ハートビートのスレッドから DB に書くため、トランザクションを使わない）"""
+
+    def test_long_job_without_report_is_not_requeued(self, user, settings, monkeypatch):
+        """report() を呼ばない長い処理の間も updated_at が進み、requeue_stale_jobs に戻されない"""
+        # Arrange: 最後の進捗を1時間前にしてから、進捗を書き込まずに待つだけのジョブ
+        # （待つ間は DB に触れず、ハートビートのスレッドと書き込みを競合させない）
+        settings.TASKS_JOBS_HEARTBEAT_INTERVAL = 0.05
+
+        def sleep(job, report):
+            Job.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+            time.sleep(0.5)
+
+        monkeypatch.setitem(JOB_TYPES, "sleep", JobType(sleep))
+        job = Job.objects.create(kind="sleep")
+        requeued = []
+
+        def touch_then_check(job):
+            touch(job)
+            # ハートビートのスレッドで、その時点で他のワーカーが戻すかを調べる
+            requeued.append(Job.objects.filter(
+                pk=job.pk, updated_at__lt=timezone.now() - timedelta(minutes=10)
+            ).exists())
+
+        touch = jobs._touch
+        monkeypatch.setattr(jobs, "_touch", touch_then_check)
+
+        # Act
+        run_pending()
+
+        # Assert
+        assert requeued and not any(requeued)
+        job.refresh_from_db()
+        assert job.status == Job.SUCCEEDED
+
+
+@pytest.mark.django_db(transaction=True)
+class TestRunWorkersCommand:
+    """run_workers コマンドのテスト（ワーカーのスレッドから DB を読むため、トランザクションを使わない）"""
+
+    def test_once_runs_all_queued_jobs(self, user):
+        roots = [Task.objects.create(title=f"タスク{i}", user=user) for i in range(3)]
+        for root in roots:
+            enqueue("archive_subtree", {"task_id": root.pk}, user)
+        out = StringIO()
+
+        # テスト用のインメモリ DB（共有キャッシュ）はテーブル単位でロックし、busy_timeout で待たないため1スレッド
+        call_command("run_workers", "--once", "--workers", "1", stdout=out)
+
+        assert "実行したジョブ: 3 件" in out.getvalue()
+        assert set(Job.objects.values_list("status", flat=True)) == {Job.SUCCEEDED}
+        assert Task.objects.filter(is_archived=True).count() == 3
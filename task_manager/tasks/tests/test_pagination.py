@@ -0,0 +1,88 @@
+# task_manager/tasks/tests/test_pagination.py
+
+import pytest
+from django.test import override_settings
+from tasks.models import Task
+from tasks.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    first_page,
+    get_page_size,
+    paginate_by_cursor,
+)
+from tasks.services import get_filtered_tasks
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+    """(created_at, id) キーセットページネーションのテスト"""
+
+    def _create_tasks(self, count):
+        return [Task.objects.create(title=f"タスク{i}") for i in range(count)]
+
+    def test_first_page_returns_newest_tasks(self):
+        """カーソル未指定時は新しい順に page_size 件と next カーソルを返す"""
+        tasks = self._create_tasks(5)
+
+        page = paginate_by_cursor(get_filtered_tasks(), page_size=2)
+
+        assert page.items == [tasks[4], tasks[3]]
+        assert page.next_cursor is not None
+        assert page.prev_cursor is None
+
+    def test_walk_forward_and_back(self):
+        """next カーソルで最後まで進み、prev カーソルで戻れる"""
+        tasks = self._create_tasks(5)
+        qs = get_filtered_tasks()
+
+        page1 = paginate_by_cursor(qs, page_size=2)
+        page2 = paginate_by_cursor(qs, page1.next_cursor, page_size=2)
+        page3 = paginate_by_cursor(qs, page2.next_cursor, page_size=2)
+
+        assert page2.items == [tasks[2], tasks[1]]
+        assert page3.items == [tasks[0]]
+        assert page3.next_cursor is None
+
+        back = paginate_by_cursor(qs, page3.prev_cursor, page_size=2)
+        assert back.items == page2.items
+        first = paginate_by_cursor(qs, back.prev_cursor, page_size=2)
+        assert first.items == page1.items
+        assert first.prev_cursor is None
+
+    def test_same_created_at_is_ordered_by_id(self):
+        """created_at が同値の行も id でタイブレークされ、重複・欠落しない"""
+        tasks = self._create_tasks(3)
+        Task.objects.update(created_at=tasks[0].created_at)
+        qs = get_filtered_tasks()
+
+        page1 = paginate_by_cursor(qs, page_size=2)
+        page2 = paginate_by_cursor(qs, page1.next_cursor, page_size=2)
+
+        assert [t.pk for t in page1] + [t.pk for t in page2] == [
+            tasks[2].pk, tasks[1].pk, tasks[0].pk,
+        ]
+
+    def test_first_page_concatenates_sources_in_order(self):
+        """first_page は取得元の並び順のまま連結し、次ページのカーソルは返さない"""
+        tasks = self._create_tasks(3)
+        sources = [Task.objects.filter(pk=tasks[0].pk), Task.objects.order_by("-id")]
+
+        page = first_page(sources, page_size=3)
+
+        assert page.items == [tasks[0], tasks[2], tasks[1]]
+        assert (page.next_cursor, page.prev_cursor) == (None, None)
+
+    def test_invalid_cursor_raises(self):
+        """壊れたカーソルは InvalidCursor になる"""
+        with pytest.raises(InvalidCursor):
+            decode_cursor("not-a-cursor")
+
+    @override_settings(TASKS_PAGE_SIZE=10, TASKS_MAX_PAGE_SIZE=20)
+    def test_page_size_is_capped(self):
+        """page_size は既定値・上限値で丸められる"""
+        assert get_page_size(None) == 10
+        assert get_page_size("5") == 5
+        assert get_page_size("1000") == 20
+        assert get_page_size("0") == 1
+        with pytest.raises(ValueError):
+            get_page_size("abc")
@@ -0,0 +1,120 @@
+# task_manager/tasks/tests/test_search.py
+
+import sqlite3
+
+import pytest
+from django.urls import reverse
+from tasks.models import Task
+from tasks.search import build_match_expression
+from tasks.services import get_filtered_tasks
+
+
+def _sqlite_has_trigram() -> bool:
+    try:
+        sqlite3.connect(":memory:").execute("CREATE VIRTUAL TABLE t USING fts5(a, tokenize='trigram')")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+pytestmark = pytest.mark.skipif(not _sqlite_has_trigram(), reason="FTS5 (trigram) が利用できない環境")
+
+
+@pytest.mark.django_db
+class TestFullTextSearch:
+    """FTS5 索引による get_filtered_tasks のキーワード検索テスト"""
+
+    def test_matches_description(self):
+        """description に含まれるキーワードでも検索できる"""
+        match = Task.objects.create(title="週次作業", description="売上レポートを作成する")
+        Task.objects.create(title="打ち合わせ", description="議事録")
+
+        assert list(get_filtered_tasks(q="レポート")) == [match]
+
+    def test_index_follows_update_and_delete(self):
+        """更新・削除がトリガーで索引に反映される"""
+        task = Task.objects.create(title="古いタイトル")
+        task.title = "新しいタイトル"
+        task.save()
+
+        assert list(get_filtered_tasks(q="新しい")) == [task]
+        assert list(get_filtered_tasks(q="古いタ")) == []
+
+        task.delete()
+        assert list(get_filtered_tasks(q="新しい")) == []
+
+    def test_short_query_falls_back_to_icontains(self):
+        """trigram で扱えない2文字以下のキーワードは部分一致検索になる"""
+        match = Task.objects.create(title="報告書作成")
+        Task.objects.create(title="打ち合わせ")
+
+        assert list(get_filtered_tasks(q="報告")) == [match]
+
+    def test_short_query_fallback_searches_description(self):
+        """部分一致へのフォールバックでも、索引と同じく詳細（description）を検索する"""
+        match = Task.objects.create(title="会議", description="議事録を共有")
+        Task.objects.create(title="打ち合わせ")
+
+        assert list(get_filtered_tasks(q="議事")) == [match]
+
+    def test_ranked_results(self):
+        """ranked=True の場合は適合度の高い順に並ぶ"""
+        weak = Task.objects.create(title="python", description="メモ")
+        strong = Task.objects.create(title="python python", description="python の勉強")
+
+        tasks = list(get_filtered_tasks(q="python", ranked=True))
+        assert tasks == [strong, weak]
+
+    def test_fts_operators_are_escaped(self):
+        """キーワード中の二重引用符や演算子はフレーズとして扱われる"""
+        assert build_match_expression('a "b" OR c') == '"a ""b"" OR c"'
+        Task.objects.create(title='引用 "符号" を含む')
+
+        assert len(get_filtered_tasks(q='"符号"')) == 1
+
+
+@pytest.mark.django_db
+class TestRankedListViews:
+    """検索フォーム（sort=relevance）・ViewSet の適合度順のテスト"""
+
+    @pytest.fixture
+    def tasks(self, client, user):
+        """新しいほど適合度が低い2件（新しい順と適合度順で並びが逆になる）"""
+        client.force_login(user)
+        strong = Task.objects.create(title="python python", description="python の勉強", user=user)
+        weak = Task.objects.create(title="python", description="メモ", user=user)
+        return strong, weak
+
+    def test_task_list_sorts_by_relevance(self, client, tasks):
+        """一覧ページは適合度順で先頭ページだけを表示する"""
+        # Arrange
+        strong, weak = tasks
+
+        # Act
+        newest = client.get(reverse("tasks:task_list"), {"q": "python", "page_size": 1})
+        ranked = client.get(reverse("tasks:task_list"), {"q": "python", "sort": "relevance", "page_size": 1})
+
+        # Assert
+        assert [task.pk for task in newest.context["tasks"]] == [weak.pk]
+        assert newest.context["next_query"] is not None
+        assert [task.pk for task in ranked.context["tasks"]] == [strong.pk]
+        assert ranked.context["next_query"] is None
+
+    def test_viewset_sorts_by_relevance(self, client, tasks):
+        """/api/tasks/mine/ も sort=relevance で適合度順の先頭ページを返す"""
+        strong, weak = tasks
+
+        response = client.get(reverse("tasks_api:task-list"), {"q": "python", "sort": "relevance"})
+
+        data = response.json()
+        assert [task["id"] for task in data["tasks"]] == [strong.pk, weak.pk]
+        assert (data["next"], data["prev"]) == (None, None)
+
+    def test_relevance_without_keyword_keeps_keyset_order(self, client, tasks):
+        """キーワードがなければ sort=relevance でも新しい順でページ分割する"""
+        strong, weak = tasks
+
+        response = client.get(reverse("tasks:task_list"), {"sort": "relevance", "page_size": 1})
+
+        assert [task.pk for task in response.context["tasks"]] == [weak.pk]
+        assert response.context["next_query"] is not None
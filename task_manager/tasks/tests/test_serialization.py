@@ -0,0 +1,95 @@
+# task_manager/tasks/tests/test_serialization.py
+
+import json
+
+import pytest
+from django.urls import reverse
+from tasks.api.fields import TASK_FIELDS
+from tasks.api.serialization import (
+    StdlibEncoder,
+    TaskRowSerializer,
+    get_encoder,
+    register_encoder,
+)
+from tasks.models import Task
+
+
+@pytest.mark.django_db
+class TestTaskRowSerializer:
+    """values_list() の行を JSON にするシリアライザのテスト"""
+
+    def test_matches_model_based_output(self):
+        # Arrange
+        parent = Task.objects.create(title="親", description="説明")
+        task = Task.objects.create(title="子", parent=parent, completed_comment="メモ")
+        serializer = TaskRowSerializer(TASK_FIELDS, encoder=StdlibEncoder())
+
+        # Act
+        rows = list(serializer.rows(Task.objects.filter(pk=task.pk)))
+        data = json.loads(serializer.dumps(serializer.to_dicts(rows)))
+
+        # Assert: 従来の1行ずつの dict 組み立てと同じ内容
+        assert data == [{
+            "id": task.id,
+            "title": "子",
+            "description": "",
+            "is_completed": False,
+            "is_archived": False,
+            "completed_comment": "メモ",
+            "created_at": task.created_at.isoformat(),
+            "updated_at": task.updated_at.isoformat(),
+            "parent_id": parent.id,
+            "user_id": None,
+        }]
+
+    def test_cursor_columns_are_read_but_not_output(self):
+        # Arrange
+        task = Task.objects.create(title="Task")
+        serializer = TaskRowSerializer(["title"], encoder=StdlibEncoder())
+
+        # Act
+        row = serializer.rows(Task.objects.all()).get()
+
+        # Assert
+        assert serializer.position(row) == (task.created_at, task.pk)
+        assert serializer.to_dicts([row]) == [{"title": "Task"}]
+
+    def test_stream_json_joins_chunks(self):
+        # Arrange
+        tasks = [Task.objects.create(title=f"Task {i}") for i in range(5)]
+        serializer = TaskRowSerializer(["id"], encoder=StdlibEncoder())
+
+        # Act
+        rows = serializer.rows(Task.objects.order_by("id"))
+        body = b"".join(serializer.stream_json(rows, chunk_size=2))
+
+        # Assert
+        assert json.loads(body) == {"tasks": [{"id": t.pk} for t in tasks]}
+
+
+class TestEncoders:
+    """エンコーダの選択・差し替えのテスト"""
+
+    def test_unknown_encoder_raises(self):
+        with pytest.raises(ValueError):
+            get_encoder("no-such-encoder")
+
+    def test_register_encoder(self):
+        register_encoder("test-stdlib", lambda: StdlibEncoder())
+        assert isinstance(get_encoder("test-stdlib"), StdlibEncoder)
+
+    @pytest.mark.django_db
+    def test_encoders_produce_same_api_response(self, client, settings):
+        # Arrange
+        pytest.importorskip("orjson")
+        Task.objects.create(title="日本語のタスク", completed_comment='"引用符"')
+        url = reverse("tasks_api:task_list")
+
+        # Act
+        settings.TASKS_JSON_ENCODER = "json"
+        stdlib = client.get(url).json()
+        settings.TASKS_JSON_ENCODER = "orjson"
+        fast = client.get(url, {"page_size": 50}).json()  # キャッシュを避けるため条件を変える
+
+        # Assert
+        assert fast == stdlib
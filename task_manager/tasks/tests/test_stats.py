@@ -0,0 +1,165 @@
+# task_manager/tasks/tests/test_stats.py
+
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from tasks.models import Task, UserTaskStats
+from tasks.services import (
+    archive_subtree,
+    archive_task_trees,
+    bulk_archive_tasks,
+    bulk_complete_tasks,
+    bulk_create_tasks,
+    bulk_update_tasks,
+    complete_subtree,
+    complete_task,
+    delete_subtree,
+)
+from tasks.stats import get_user_stats, refresh_user_stats
+
+
+def assert_in_sync():
+    """増分で更新した集計が、実際に集計した値と一致している"""
+    assert refresh_user_stats() == []
+
+
+@pytest.mark.django_db
+class TestUserTaskStats:
+    """ユーザー別タスク集計の増分更新のテスト"""
+
+    def test_signals_track_create_complete_archive_and_delete(self, user):
+        """通常の保存・削除（シグナル経由）で集計が増減する"""
+        # Arrange
+        parent = Task.objects.create(title="親", user=user)
+        child = Task.objects.create(title="子", parent=parent, user=user)
+        assert get_user_stats(user) == {
+            "task_count": 2, "completed_count": 0, "archived_count": 0, "open_subtask_count": 1,
+        }
+
+        # Act
+        complete_task(child)
+        parent.is_archived = True
+        parent.save()
+
+        # Assert
+        assert get_user_stats(user) == {
+            "task_count": 2, "completed_count": 1, "archived_count": 1, "open_subtask_count": 0,
+        }
+        parent.delete()  # 子はカスケード削除
+        assert get_user_stats(user)["task_count"] == 0
+        assert_in_sync()
+
+    def test_owner_change_moves_counts(self, user, other):
+        """所有者を変えると、元の所有者から新しい所有者へ件数が移る"""
+        task = Task.objects.create(title="移動", user=user)
+
+        task.user = other
+        task.save()
+
+        assert get_user_stats(user)["task_count"] == 0
+        assert get_user_stats(other)["task_count"] == 1
+
+    def test_bulk_and_subtree_services_keep_stats_in_sync(self, user):
+        """シグナルを経由しない一括操作・サブツリー操作でも集計がずれない"""
+        root = Task.objects.create(title="ルート", user=user)
+        tasks = bulk_create_tasks(user, [{"title": f"子{i}", "parent": root.pk} for i in range(4)])
+        assert_in_sync()
+
+        bulk_update_tasks(user, [{"id": tasks[0].pk, "parent": None}, {"id": tasks[1].pk, "is_archived": True}])
+        assert_in_sync()
+        bulk_complete_tasks(user, [tasks[2].pk])
+        assert_in_sync()
+        bulk_archive_tasks(user, [tasks[3].pk, tasks[1].pk])
+        assert_in_sync()
+        archive_subtree(root)
+        assert_in_sync()
+        complete_subtree(root)
+        assert_in_sync()
+        archive_task_trees([root.pk])  # 保管テーブルへの移動では変わらない
+        assert_in_sync()
+        delete_subtree(tasks[0])
+        assert_in_sync()
+
+    def test_delete_subtree_with_mixed_states_keeps_stats_in_sync(self, user, other):
+        """完了・アーカイブ・所有者が混在するサブツリーの削除でも集計がずれない"""
+        top = Task.objects.create(title="最上位", user=user)
+        root = Task.objects.create(title="ルート", parent=top, user=user)
+        Task.objects.create(title="完了", parent=root, user=user, is_completed=True)
+        child = Task.objects.create(title="アーカイブ", parent=root, user=user, is_archived=True)
+        Task.objects.create(title="他人の孫", parent=child, user=other)
+
+        assert delete_subtree(root) == 4
+
+        assert_in_sync()
+        assert get_user_stats(user)["task_count"] == 1
+        assert get_user_stats(other)["task_count"] == 0
+
+    def test_import_keeps_stats_in_sync(self, user, tmp_path):
+        """取り込み（前方参照の付け替えを含む）でも集計がずれない"""
+        path = tmp_path / "tasks.csv"
+        path.write_text("id,title,parent\n2,子,1\n1,親,\n", encoding="utf-8")
+
+        call_command("import_tasks", str(path), "--batch-size", "1", "--user", user.email, stdout=StringIO())
+
+        assert get_user_stats(user)["open_subtask_count"] == 1
+        assert_in_sync()
+
+    def test_user_deletion_does_not_recreate_stats(self, user):
+        """ユーザーを削除しても、カスケード削除されたタスクの反映で集計行が作り直されない"""
+        Task.objects.create(title="タスク", user=user)
+
+        user.delete()
+
+        assert not UserTaskStats.objects.exists()
+
+
+@pytest.mark.django_db
+class TestRebuildUserTaskStats:
+    """rebuild_user_task_stats コマンドのテスト"""
+
+    def test_reports_and_fixes_drift(self, user):
+        """ずれていたユーザーを報告して修正する"""
+        # Arrange
+        Task.objects.create(title="タスク", user=user)
+        UserTaskStats.objects.filter(user=user).update(task_count=10)
+        out = StringIO()
+
+        # Act
+        call_command("rebuild_user_task_stats", verbosity=2, stdout=out)
+
+        # Assert
+        assert "task_count 10 → 1" in out.getvalue()
+        assert "1 件" in out.getvalue()
+        assert get_user_stats(user)["task_count"] == 1
+        assert_in_sync()
+
+
+@pytest.mark.django_db
+class TestTaskStatsApi:
+    """/api/tasks/stats/ と ホーム画面のテスト"""
+
+    def test_returns_own_stats_without_counting_tasks(self, client, user, django_assert_max_num_queries):
+        """集計行を1回読むだけで件数を返す"""
+        Task.objects.create(title="タスク", user=user, is_completed=True)
+        client.force_login(user)
+
+        # セッション・ユーザー取得（キャッシュにない場合）最大 2 + 集計 1
+        with django_assert_max_num_queries(3):
+            response = client.get(reverse("tasks_api:task_stats"))
+
+        assert response.json() == {
+            "task_count": 1, "completed_count": 1, "archived_count": 0, "open_subtask_count": 0,
+        }
+
+    def test_requires_login(self, client):
+        assert client.get(reverse("tasks_api:task_stats")).status_code == 403
+
+    def test_home_shows_stats(self, client, user):
+        Task.objects.create(title="タスク", user=user)
+        client.force_login(user)
+
+        response = client.get(reverse("user_home"))
+
+        assert response.context["stats"]["task_count"] == 1
@@ -0,0 +1,137 @@
+# task_manager/tasks/tests/test_subtree.py
+
+import pytest
+from django.urls import reverse
+from tasks.models import Task, TaskClosure, TaskTombstone
+from tasks.services import archive_subtree, complete_subtree, delete_subtree, get_descendants
+
+
+@pytest.fixture
+def tree(user):
+    """親 ─ 子 ─ 孫（すべて未完了）と、親の兄弟"""
+    top = Task.objects.create(title="最上位", user=user)
+    root = Task.objects.create(title="親", parent=top, user=user)
+    child = Task.objects.create(title="子", parent=root, user=user)
+    grandchild = Task.objects.create(title="孫", parent=child, user=user)
+    sibling = Task.objects.create(title="兄弟", parent=top, user=user)
+    return top, root, child, grandchild, sibling
+
+
+@pytest.mark.django_db
+class TestSubtreeServices:
+    """サブツリー操作サービスのテスト"""
+
+    def test_complete_subtree_completes_all_descendants(self, tree, django_assert_max_num_queries):
+        """未完了の子孫があってもまとめて完了にし、親のカウンタも更新する"""
+        # Arrange
+        top, root, child, grandchild, sibling = tree
+
+        # Act（件数によらず一定：SAVEPOINT 2 + ユーザーごとの集約 1 + UPDATE 1 + 親のカウンタ 1 + 集計の反映 1）
+        with django_assert_max_num_queries(6):
+            count = complete_subtree(root)
+
+        # Assert
+        assert count == 3
+        assert set(Task.objects.filter(is_completed=True)) == {root, child, grandchild}
+        assert set(Task.objects.filter(incomplete_subtask_count__gt=0).values_list("pk", flat=True)) == {top.pk}
+        top.refresh_from_db()
+        assert top.incomplete_subtask_count == 1  # 兄弟の分だけ残る
+
+    def test_complete_subtree_is_idempotent(self, tree):
+        """完了済みのサブツリーを再度完了にしても件数 0 で、カウンタは変わらない"""
+        top, root, *_ = tree
+        complete_subtree(root)
+
+        assert complete_subtree(root) == 0
+        top.refresh_from_db()
+        assert top.incomplete_subtask_count == 1
+
+    def test_archive_subtree(self, tree):
+        """サブツリーだけがアーカイブされる"""
+        top, root, child, grandchild, sibling = tree
+
+        assert archive_subtree(root) == 3
+        assert set(Task.objects.filter(is_archived=True)) == {root, child, grandchild}
+
+    def test_delete_subtree_removes_tree_and_side_tables(self, tree, django_assert_max_num_queries):
+        """子孫・階層・カウンタ・削除記録をまとめて処理し、兄弟は残す"""
+        # Arrange
+        top, root, child, grandchild, sibling = tree
+        ids = {root.pk, child.pk, grandchild.pk}
+
+        # Act（件数によらず一定。SAVEPOINT 2 + 一時テーブルの作成・削除 2 + ユーザーごとの集約 1
+        # + 削除記録・階層・タスク 3 + 親のカウンタ 1 + 集計の反映 1。子孫は読み込まない）
+        with django_assert_max_num_queries(10):
+            count = delete_subtree(root)
+
+        # Assert
+        assert count == 3
+        assert set(Task.objects.values_list("pk", flat=True)) == {top.pk, sibling.pk}
+        assert not TaskClosure.objects.filter(descendant_id__in=ids).exists()
+        assert set(TaskTombstone.objects.values_list("task_id", flat=True)) == ids
+        assert list(get_descendants(top)) == [sibling]
+        top.refresh_from_db()
+        assert (top.subtask_count, top.incomplete_subtask_count) == (1, 1)
+
+
+@pytest.mark.django_db
+class TestSubtreeViews:
+    """サブツリー操作の画面・API のテスト"""
+
+    def test_html_complete_subtree(self, client, user, tree):
+        """詳細画面の「子タスクごと完了にする」で子孫も完了になる"""
+        _, root, *_ = tree
+        client.force_login(user)
+
+        response = client.post(reverse("tasks:task_complete_subtree", args=[root.pk]))
+
+        assert response.status_code == 302
+        assert not Task.objects.filter(pk__in=get_descendants(root, include_self=True), is_completed=False).exists()
+
+    def test_html_delete_removes_descendants(self, client, user, tree):
+        """削除画面の削除は子孫もまとめて削除する"""
+        top, root, *_ = tree
+        client.force_login(user)
+
+        client.post(reverse("tasks:task_delete", args=[root.pk]))
+
+        assert Task.objects.count() == 2
+
+    @pytest.mark.parametrize("name", ["tasks:task_complete_subtree", "tasks:task_archive_subtree", "tasks:task_delete"])
+    def test_html_rejects_foreign_task_and_anonymous(self, client, other, tree, name):
+        """画面のサブツリー操作も、未ログインはログイン画面へ、他人のタスクは 404 で何も変更しない"""
+        _, root, *_ = tree
+        url = reverse(name, args=[root.pk])
+
+        anonymous = client.post(url)
+        client.force_login(other)
+        foreign = client.post(url)
+
+        assert anonymous.status_code == 302 and "login" in anonymous["Location"]
+        assert foreign.status_code == 404
+        assert Task.objects.filter(is_completed=True).count() == 0
+        assert Task.objects.filter(is_archived=True).count() == 0
+        assert Task.objects.count() == 5
+
+    def test_api_subtree_actions(self, client, user, tree):
+        """API の各操作は件数を返す"""
+        _, root, child, *_ = tree
+        client.force_login(user)
+
+        archived = client.post(reverse("tasks_api:task_subtree_archive", args=[child.pk]))
+        completed = client.post(reverse("tasks_api:task_subtree_complete", args=[root.pk]))
+        deleted = client.post(reverse("tasks_api:task_subtree_delete", args=[root.pk]))
+
+        assert archived.json() == {"updated": 2}
+        assert completed.json() == {"updated": 3}
+        assert deleted.json() == {"deleted": 3}
+
+    def test_api_rejects_foreign_task(self, client, other, tree):
+        """他人のタスクは 404"""
+        _, root, *_ = tree
+        client.force_login(other)
+
+        response = client.post(reverse("tasks_api:task_subtree_delete", args=[root.pk]))
+
+        assert response.status_code == 404
+        assert Task.objects.filter(pk=root.pk).exists()
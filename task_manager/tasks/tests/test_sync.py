@@ -0,0 +1,134 @@
+# task_manager/tasks/tests/test_sync.py
+
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from tasks.models import Task, TaskTombstone
+from tasks.sync import ChangesCursor, encode_changes_cursor
+
+
+def _changes(client, **params):
+    return client.get(reverse("tasks_api:task_changes"), params)
+
+
+@pytest.mark.django_db
+class TestTaskChangesApi:
+    """/api/tasks/changes/ 差分同期のテスト"""
+
+    def test_initial_sync_returns_all_tasks(self, client):
+        # Arrange: 既存の削除記録は初回同期には含めない
+        Task.objects.create(title="Gone").delete()
+        tasks = [Task.objects.create(title=f"Task {i}") for i in range(2)]
+
+        # Act
+        data = _changes(client).json()
+
+        # Assert
+        assert [t["id"] for t in data["tasks"]] == [t.pk for t in tasks]
+        assert data["deleted"] == []
+        assert data["has_more"] is False
+
+    def test_only_changes_after_cursor_are_returned(self, client):
+        # Arrange: 初回同期のあとに1件更新・1件作成
+        untouched = Task.objects.create(title="Untouched")
+        edited = Task.objects.create(title="Before")
+        cursor = _changes(client).json()["cursor"]
+        edited.title = "After"
+        edited.save()
+        created = Task.objects.create(title="New")
+
+        # Act
+        data = _changes(client, since=cursor).json()
+
+        # Assert: 変更分だけが updated_at 順に返る
+        assert [t["id"] for t in data["tasks"]] == [edited.pk, created.pk]
+        assert data["tasks"][0]["title"] == "After"
+        assert untouched.pk not in [t["id"] for t in data["tasks"]]
+
+        # 返されたカーソルでもう一度取ると空
+        again = _changes(client, since=data["cursor"]).json()
+        assert again["tasks"] == [] and again["deleted"] == []
+
+    def test_deleted_tasks_are_reported_including_cascade(self, client):
+        # Arrange: 親を削除すると子もカスケードで削除される
+        parent = Task.objects.create(title="Parent")
+        child = Task.objects.create(title="Child", parent=parent)
+        expected = sorted([parent.pk, child.pk])
+        cursor = _changes(client).json()["cursor"]
+        parent.delete()
+
+        # Act
+        data = _changes(client, since=cursor).json()
+
+        # Assert
+        assert sorted(data["deleted"]) == expected
+        assert data["tasks"] == []
+
+    def test_user_filter_applies_to_tasks_and_deletions(self, client, user):
+        # Arrange
+        cursor = _changes(client, user_id=user.pk).json()["cursor"]
+        mine = Task.objects.create(title="Mine", user=user)
+        Task.objects.create(title="Other").delete()
+        Task.objects.create(title="Gone", user=user).delete()
+
+        # Act
+        data = _changes(client, since=cursor, user_id=user.pk).json()
+
+        # Assert
+        assert [t["id"] for t in data["tasks"]] == [mine.pk]
+        assert len(data["deleted"]) == 1
+
+    def test_has_more_until_all_changes_are_fetched(self, client):
+        # Arrange
+        tasks = [Task.objects.create(title=f"Task {i}") for i in range(3)]
+
+        # Act: page_size=2 で has_more が False になるまで取得
+        first = _changes(client, page_size=2).json()
+        second = _changes(client, page_size=2, since=first["cursor"]).json()
+
+        # Assert
+        assert first["has_more"] is True
+        assert second["has_more"] is False
+        assert [t["id"] for t in first["tasks"] + second["tasks"]] == [t.pk for t in tasks]
+
+    def test_expired_cursor_returns_410(self, client, settings):
+        # Arrange: 保持期間より前に発行されたカーソル
+        settings.TASKS_TOMBSTONE_RETENTION_DAYS = 7
+        old = ChangesCursor(
+            updated_at=None, pk=0, tombstone_id=0, issued_at=timezone.now() - timedelta(days=8)
+        )
+
+        # Act
+        response = _changes(client, since=encode_changes_cursor(old))
+
+        # Assert
+        assert response.status_code == 410
+
+    def test_broken_cursor_returns_400(self, client):
+        # Act
+        response = _changes(client, since="broken")
+
+        # Assert
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestPruneTaskTombstones:
+    """prune_task_tombstones コマンドのテスト"""
+
+    def test_old_tombstones_are_removed(self):
+        # Arrange
+        Task.objects.create(title="Old").delete()
+        Task.objects.create(title="Recent").delete()
+        old = TaskTombstone.objects.order_by("id").first()
+        TaskTombstone.objects.filter(pk=old.pk).update(deleted_at=timezone.now() - timedelta(days=40))
+
+        # Act
+        call_command("prune_task_tombstones", "--days", "30")
+
+        # Assert
+        assert not TaskTombstone.objects.filter(pk=old.pk).exists()
+        assert TaskTombstone.objects.count() == 1
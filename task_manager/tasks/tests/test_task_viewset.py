@@ -0,0 +1,117 @@
+# task_manager/tasks/tests/test_task_viewset.py
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from tasks.api.serializers import TaskSerializer
+from tasks.models import Task
+
+LIST = "tasks_api:task-list"
+DETAIL = "tasks_api:task-detail"
+
+
+@pytest.fixture
+def api(client, user):
+    client.force_login(user)
+    return client
+
+
+@pytest.mark.django_db
+class TestTaskViewSetRead:
+    """/api/tasks/mine/ の一覧・詳細のテスト"""
+
+    def test_list_is_scoped_and_paginated(self, api, user, other):
+        """自分のタスクだけを新しい順にカーソルで分割し、TaskSerializer と同じ JSON を返す"""
+        # Arrange
+        parent = Task.objects.create(title="親", user=user)
+        child = Task.objects.create(title="子", parent=parent, user=user)
+        Task.objects.create(title="他人のタスク", user=other)
+
+        # Act
+        first = api.get(reverse(LIST), {"page_size": 1}).json()
+        second = api.get(reverse(LIST), {"page_size": 1, "cursor": first["next"]}).json()
+
+        # Assert
+        assert first["tasks"] == [TaskSerializer(child).data]
+        assert second["tasks"] == [TaskSerializer(parent).data]
+        assert second["next"] is None
+        assert second["prev"] is not None
+
+    def test_list_filters_like_task_list_page(self, api, user):
+        Task.objects.create(title="請求書の確認", user=user)
+        Task.objects.create(title="請求書の送付", user=user, is_completed=True)
+        Task.objects.create(title="デプロイ", user=user)
+
+        response = api.get(reverse(LIST), {"q": "請求書", "is_completed": "false"})
+
+        assert [task["title"] for task in response.json()["tasks"]] == ["請求書の確認"]
+
+    @pytest.mark.parametrize("params", [{"is_completed": "maybe"}, {"cursor": "broken"}, {"page_size": "x"}])
+    def test_invalid_params_return_400(self, api, params):
+        assert api.get(reverse(LIST), params).status_code == 400
+
+    def test_list_reads_one_query(self, api, user):
+        """行数によらずページの読み出しは1クエリ（セッション・ユーザー取得を除く）"""
+        Task.objects.bulk_create([Task(title=f"タスク{i}", user=user) for i in range(20)])
+        api.get(reverse(LIST))
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = api.get(reverse(LIST))
+
+        assert len(response.json()["tasks"]) == 20
+        task_queries = [query for query in ctx.captured_queries if '"tasks_task"' in query["sql"]]
+        assert len(task_queries) == 1
+
+    def test_other_users_task_is_404(self, api, other):
+        task = Task.objects.create(title="他人のタスク", user=other)
+
+        assert api.get(reverse(DETAIL, args=[task.pk])).status_code == 404
+        assert api.delete(reverse(DETAIL, args=[task.pk])).status_code == 404
+
+
+@pytest.mark.django_db
+class TestTaskViewSetWrite:
+    """/api/tasks/mine/ の作成・更新・削除のテスト"""
+
+    def test_create_update_and_delete(self, api, user):
+        """作成は自分のタスクになり、更新・削除は親のカウンタにも反映する"""
+        # Arrange
+        parent = Task.objects.create(title="親", user=user)
+
+        # Act: 子を作成
+        response = api.post(reverse(LIST), {"title": "子", "parent": parent.pk}, content_type="application/json")
+
+        # Assert
+        assert response.status_code == 201
+        child = Task.objects.get(pk=response.json()["id"])
+        assert child.user == user
+        parent.refresh_from_db()
+        assert parent.incomplete_subtask_count == 1
+
+        # Act / Assert: 未完了の子が残る親は完了にできない
+        response = api.patch(reverse(DETAIL, args=[parent.pk]), {"is_completed": True}, content_type="application/json")
+        assert response.status_code == 400
+
+        # Act / Assert: 子を完了にすると親も完了にできる
+        api.patch(reverse(DETAIL, args=[child.pk]), {"is_completed": True}, content_type="application/json")
+        response = api.patch(reverse(DETAIL, args=[parent.pk]), {"is_completed": True}, content_type="application/json")
+        assert response.json()["is_completed"] is True
+
+        # Act / Assert: 削除は子孫ごと
+        assert api.delete(reverse(DETAIL, args=[parent.pk])).status_code == 204
+        assert not Task.objects.exists()
+
+    def test_rejects_invalid_parent(self, api, user, other):
+        """他人のタスクや、自分の子孫は親にできない"""
+        parent = Task.objects.create(title="親", user=user)
+        child = Task.objects.create(title="子", parent=parent, user=user)
+        foreign = Task.objects.create(title="他人のタスク", user=other)
+
+        foreign_parent = api.post(reverse(LIST), {"title": "子", "parent": foreign.pk}, content_type="application/json")
+        cycle = api.patch(reverse(DETAIL, args=[parent.pk]), {"parent": child.pk}, content_type="application/json")
+
+        assert foreign_parent.status_code == 400
+        assert cycle.status_code == 400
+        parent.refresh_from_db()
+        assert parent.parent_id is None
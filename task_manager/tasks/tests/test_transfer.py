@@ -0,0 +1,88 @@
+# task_manager/tasks/tests/test_transfer.py
+
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from tasks.models import Task
+from tasks.services import get_descendants
+
+
+def _write_jsonl(path, rows):
+    path.write_text("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows), encoding="utf-8")
+
+
+@pytest.mark.django_db
+class TestExportImportCommands:
+    """export_tasks / import_tasks コマンドのテスト"""
+
+    @pytest.mark.parametrize("suffix", ["csv", "jsonl"])
+    def test_round_trip(self, tmp_path, user, suffix):
+        """書き出したファイルを取り込むと、階層・状態・作成日時が再現される"""
+        # Arrange
+        parent = Task.objects.create(title="親, \"引用符\"", description="改行\nあり", user=user)
+        Task.objects.create(title="子", parent=parent, is_completed=True, completed_comment="済", user=user)
+        path = tmp_path / f"tasks.{suffix}"
+        call_command("export_tasks", str(path), stdout=StringIO())
+        created_at = parent.created_at
+        Task.objects.all().delete()
+
+        # Act
+        call_command("import_tasks", str(path), "--batch-size", "1", stdout=StringIO())
+
+        # Assert
+        imported = Task.objects.get(parent__isnull=True)
+        child = Task.objects.get(parent=imported)
+        assert (imported.title, imported.description, imported.user) == (parent.title, "改行\nあり", user)
+        assert imported.created_at == created_at
+        assert (child.is_completed, child.completed_comment) == (True, "済")
+        assert (imported.subtask_count, imported.incomplete_subtask_count) == (1, 0)
+        assert list(get_descendants(imported)) == [child]
+
+    def test_forward_references_across_batches(self, tmp_path, user):
+        """親が後ろの行（別のバッチ）にあっても、孫まで階層と件数が正しくなる"""
+        # Arrange
+        path = tmp_path / "tasks.jsonl"
+        _write_jsonl(path, [
+            {"id": "c", "title": "孫", "parent": "b"},
+            {"id": "b", "title": "子", "parent": "a"},
+            {"id": "a", "title": "親"},
+        ])
+
+        # Act
+        call_command("import_tasks", str(path), "--batch-size", "1", "--user", user.email, stdout=StringIO())
+
+        # Assert
+        root = Task.objects.get(title="親")
+        assert [t.title for t in get_descendants(root)] == ["子", "孫"]
+        assert root.subtask_count == 1 and root.incomplete_subtask_count == 1
+        assert Task.objects.filter(user=user).count() == 3
+
+    def test_cycle_is_rejected(self, tmp_path):
+        """parent が循環しているファイルはエラーにする"""
+        path = tmp_path / "tasks.jsonl"
+        _write_jsonl(path, [{"id": 1, "title": "A", "parent": 2}, {"id": 2, "title": "B", "parent": 1}])
+
+        with pytest.raises(CommandError, match="循環"):
+            call_command("import_tasks", str(path))
+        assert not Task.objects.exists()
+
+    def test_invalid_row_reports_record_and_keeps_committed_batches(self, tmp_path):
+        """不正な行は何件目かを示してエラーにし、それ以前のバッチは残る"""
+        path = tmp_path / "tasks.csv"
+        path.write_text("id,title,is_completed\n1,有効,false\n2,,false\n", encoding="utf-8")
+
+        with pytest.raises(CommandError, match="2 件目"):
+            call_command("import_tasks", str(path), "--batch-size", "1")
+        assert list(Task.objects.values_list("title", flat=True)) == ["有効"]
+
+    def test_unresolved_parent_becomes_top_level(self, tmp_path, capsys):
+        """ファイル内にない親を参照した行は最上位として登録し、警告を出す"""
+        path = tmp_path / "tasks.jsonl"
+        _write_jsonl(path, [{"id": 1, "title": "迷子", "parent": 99}])
+
+        call_command("import_tasks", str(path))
+
+        assert Task.objects.get().parent_id is None
+        assert "99" in capsys.readouterr().err
@@ -48,3 +48,24 @@ class TestTaskListView:
         # Assert: 検索結果に Django タスクのみ表示されること
         assert "Learn Django" in response.content.decode()
         assert "Flask" not in response.content.decode()
+
+
+@pytest.mark.django_db
+class TestTaskListPagination:
+    """ログインユーザーのタスク一覧ページ送りの確認"""
+
+    def test_next_page_link(self, client, user):
+        # Arrange: ログインユーザーのタスクを3件作成
+        client.force_login(user)
+        for title in ("Task A", "Task B", "Task C"):
+            Task.objects.create(title=title, user=user)
+
+        # Act: 1ページ2件で取得し、次ページのリンクを辿る
+        url = reverse("tasks:task_list")
+        first = client.get(url, {"page_size": 2})
+        second = client.get(f"{url}?{first.context['next_query']}")
+
+        # Assert: 新しい順に分割されていること
+        assert [t.title for t in first.context["tasks"]] == ["Task C", "Task B"]
+        assert [t.title for t in second.context["tasks"]] == ["Task A"]
+        assert second.context["next_query"] is None
@@ -22,6 +22,22 @@ class TestTaskCRUDViews:
         assert "詳細確認タスク" in response.content.decode()
         assert response.context["task"].pk == task.pk
 
+    def test_task_detail_shows_nested_subtasks(self, client):
+        # Arrange: 孫タスクまであるツリーを作成
+        root = Task.objects.create(title="親タスク")
+        child = Task.objects.create(title="子タスク", parent=root)
+        Task.objects.create(title="孫タスク", parent=child)
+
+        # Act
+        response = client.get(reverse("tasks:task_detail", args=[root.pk]))
+
+        # Assert: 孫タスクまで深さ付きで表示される
+        assert [(n.task.title, n.depth) for n in response.context["subtree"]] == [
+            ("子タスク", 1), ("孫タスク", 2),
+        ]
+        assert "孫タスク" in response.content.decode()
+        assert response.context["has_incomplete_subtasks"] is True
+
     def test_task_create_view_get(self, client):
         # Act: GETリクエストでタスク作成ページを表示
         url = reverse("tasks:task_create")
@@ -84,9 +100,10 @@ class TestTaskCRUDViews:
         assert task.is_completed is True
         assert task.completed_comment == "完了"
 
-    def test_task_delete_view_get(self, client):
-        # Arrange: タスク作成
-        task = Task.objects.create(title="削除確認タスク")
+    def test_task_delete_view_get(self, client, user):
+        # Arrange: ログインユーザーのタスク作成（削除は子孫ごとのため、所有者のみ操作できる）
+        client.force_login(user)
+        task = Task.objects.create(title="削除確認タスク", user=user)
 
         # Act: GETリクエストで削除確認ページを表示
         url = reverse("tasks:task_delete", args=[task.pk])
@@ -97,9 +114,10 @@ class TestTaskCRUDViews:
         assert "削除確認タスク" in response.content.decode()
         assert response.context["task"].pk == task.pk
 
-    def test_task_delete_view_post(self, client):
-        # Arrange: タスク作成
-        task = Task.objects.create(title="削除対象タスク")
+    def test_task_delete_view_post(self, client, user):
+        # Arrange: ログインユーザーのタスク作成（削除は子孫ごとのため、所有者のみ操作できる）
+        client.force_login(user)
+        task = Task.objects.create(title="削除対象タスク", user=user)
 
         # Act: POSTリクエストでタスク削除
         url = reverse("tasks:task_delete", args=[task.pk])
@@ -0,0 +1,384 @@
+# task_manager/tasks/transfer.py
+
+"""
+タスクの一括取り込み・書き出し（import_tasks / export_tasks コマンド）。
+
+形式は CSV（1行目が見出し）と JSONL（1行1タスクの JSON）。列は TRANSFER_FIELDS。
+- id: ファイル内でタスクを識別する値。取り込み時は新しい id が採番され、parent の参照にだけ使う
+- parent: 親タスクの id（ファイル内の id）。空なら最上位
+- user: 所有者のメールアドレス
+
+どちらの方向も行をストリームで処理し、ファイル全体をメモリに読み込まない
+（取り込み時に保持するのは「ファイル内の id → 新しい id」の対応表だけ）。
+
+取り込みは batch_size 件ずつ bulk_create し、1バッチを1トランザクションで確定する。
+途中で失敗した場合、それまでのバッチは取り込まれたまま残る。
+親がまだ出てきていない行（前方参照）は親なしで登録しておき、親を登録したバッチで付け替える。
+
+created_at はファイルの値を保つ。updated_at は取り込んだ日時にする
+（差分同期 API のクライアントが、取り込んだタスクを変更として受け取れるように）。
+管理コマンドは Web サーバーとは別のプロセスで動くため、変更フィード（tasks.events）には流さない。
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import chain, islice
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, TextIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import stats
+from .cache import invalidate_all
+from .models import ArchivedTask, Task, TaskClosure
+from .services import rebuild_task_closure, refresh_subtask_counters
+
+# 取り込み・書き出しの列（この順で書き出す）
+TRANSFER_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "is_completed",
+    "completed_comment",
+    "is_archived",
+    "parent",
+    "user",
+    "created_at",
+)
+
+FORMATS = ("csv", "jsonl")
+
+# 書き出し時に values_list() で読む列（TRANSFER_FIELDS と同じ順）
+_EXPORT_COLUMNS = (
+    "id",
+    "title",
+    "description",
+    "is_completed",
+    "completed_comment",
+    "is_archived",
+    "parent_id",
+    "user__email",
+    "created_at",
+)
+
+_TRUE = frozenset({"true", "1", "yes", "y", "t"})
+_FALSE = frozenset({"false", "0", "no", "n", "f", ""})
+
+
+def format_from_path(path: str) -> str | None:
+    """ファイルの拡張子から形式を決める（"-"（標準入出力）は jsonl、判断できなければ None）"""
+    if path == "-":
+        return "jsonl"
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".jsonl", ".ndjson"):
+        return "jsonl"
+    return None
+
+
+class TaskImportError(ValueError):
+    """取り込むファイルの内容が不正な場合の例外（record は何件目のデータか。特定できなければ None）"""
+
+    def __init__(self, record: int | None, message: str) -> None:
+        super().__init__(message if record is None else f"{record} 件目: {message}")
+        self.record = record
+
+
+# ------------------------------------
+# 書き出し
+# ------------------------------------
+def _export_rows(include_archived: bool, chunk_size: int, user_id: int | None = None) -> Iterator[tuple[Any, ...]]:
+    """Task（と保管テーブル）の行を id 順に、サーバーサイドカーソルでチャンク単位に読み出す"""
+    sources = [Task.objects.all()]
+    if include_archived:
+        sources.append(ArchivedTask.objects.all())
+    if user_id is not None:
+        sources = [tasks.filter(user_id=user_id) for tasks in sources]
+    return chain.from_iterable(
+        tasks.order_by("id").values_list(*_EXPORT_COLUMNS).iterator(chunk_size=chunk_size)
+        for tasks in sources
+    )
+
+
+def _report_chunks(
+    rows: Iterator[tuple[Any, ...]], chunk_size: int, on_chunk: Callable[[int], None]
+) -> Iterator[tuple[Any, ...]]:
+    """rows をそのまま返しつつ、chunk_size 件ごとにそれまでの件数を on_chunk に渡す"""
+    count = 0
+    while chunk := list(islice(rows, chunk_size)):
+        yield from chunk
+        count += len(chunk)
+        on_chunk(count)
+
+
+def _export_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def export_tasks(
+    stream: TextIO,
+    output_format: str,
+    chunk_size: int,
+    include_archived: bool = False,
+    user_id: int | None = None,
+    on_chunk: Callable[[int], None] | None = None,
+) -> int:
+    """
+    タスクを stream に書き出し、書き出した件数を返す。
+
+    Args:
+        stream (TextIO): 書き出し先（CSV の場合は newline="" で開いたもの）
+        output_format (str): "csv" または "jsonl"
+        chunk_size (int): 1回に DB から読み出す件数
+        include_archived (bool): 保管テーブル（ArchivedTask）のタスクも書き出す
+        user_id (int | None): 指定した場合は、そのユーザーのタスクだけを書き出す
+        on_chunk (Callable | None): chunk_size 件書き出すたびに、それまでの件数を受け取る関数
+    """
+    rows = _export_rows(include_archived, chunk_size, user_id)
+    if on_chunk is not None:
+        rows = _report_chunks(rows, chunk_size, on_chunk)
+    count = 0
+    if output_format == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(TRANSFER_FIELDS)
+        for row in rows:
+            writer.writerow(["" if value is None else _export_value(value) for value in row])
+            count += 1
+    else:
+        dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        for row in rows:
+            stream.write(dumps(dict(zip(TRANSFER_FIELDS, map(_export_value, row)))) + "\n")
+            count += 1
+    return count
+
+
+# ------------------------------------
+# 取り込み
+# ------------------------------------
+def read_rows(stream: TextIO, input_format: str) -> Iterator[dict[str, Any]]:
+    """stream から1行ずつ dict として読み出す（JSONL の空行は読み飛ばす）"""
+    if input_format == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for record, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise TaskImportError(record, f"JSON として読めません（{e.msg}）") from e
+
+
+@dataclass
+class ImportResult:
+    """
+    取り込みの結果。
+
+    Attributes:
+        created (int): 登録したタスクの件数
+        batches (int): 確定したバッチ（トランザクション）の数
+        unresolved (dict[str, list[int]]): ファイル内に見つからなかった親の id と、
+            それを参照していたタスクの新しい id（これらは最上位のタスクとして登録される）
+    """
+
+    created: int = 0
+    batches: int = 0
+    unresolved: dict[str, list[int]] = field(default_factory=dict)
+
+
+def _ref(value: Any) -> str | None:
+    """id / parent の値を比較用の文字列にする（CSV は文字列、JSONL は数値のため）"""
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def _bool(value: Any, record: int, name: str) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = "" if value is None else str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise TaskImportError(record, f"{name} は true / false で指定してください: {value!r}")
+
+
+def _text(row: dict[str, Any], name: str, record: int) -> str:
+    value = row.get(name) or ""
+    max_length = Task._meta.get_field(name).max_length
+    if max_length is not None and len(value) > max_length:
+        raise TaskImportError(record, f"{name} は {max_length} 文字以内にしてください。")
+    return value
+
+
+class _UserResolver:
+    """メールアドレス → ユーザー id（問い合わせ結果を覚えておく）"""
+
+    def __init__(self, user: AbstractBaseUser | None) -> None:
+        self.user_id = user.pk if user is not None else None
+        self._ids: dict[str, int] = {}
+
+    def __call__(self, email: Any, record: int) -> int | None:
+        if self.user_id is not None or not email:
+            return self.user_id
+        if email not in self._ids:
+            model = get_user_model()
+            pk = model.objects.filter(**{model.USERNAME_FIELD: email}).values_list("pk", flat=True).first()
+            if pk is None:
+                raise TaskImportError(record, f"ユーザーが見つかりません: {email}")
+            self._ids[email] = pk
+        return self._ids[email]
+
+
+def _build_task(row: dict[str, Any], record: int, user_id: int | None) -> Task:
+    title = _text(row, "title", record)
+    if not title.strip():
+        raise TaskImportError(record, "title は必須です。")
+    task = Task(
+        title=title,
+        description=row.get("description") or "",
+        is_completed=_bool(row.get("is_completed"), record, "is_completed"),
+        completed_comment=_text(row, "completed_comment", record),
+        is_archived=_bool(row.get("is_archived"), record, "is_archived"),
+        user_id=user_id,
+    )
+    created_at = row.get("created_at")
+    if created_at:
+        parsed = parse_datetime(str(created_at))
+        if parsed is None:
+            raise TaskImportError(record, f"created_at は ISO 8601 形式で指定してください: {created_at!r}")
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        # bulk_create が auto_now_add で上書きするため、登録後に書き戻す
+        task._imported_created_at = parsed
+    return task
+
+
+def _find_cycle(task_ids: list[int]) -> int | None:
+    """
+    task_ids から親を辿って自分に戻るタスクがあれば、その id を返す。
+    UNION（重複を除く）で辿るため、循環していても再帰は終わる。
+    """
+    table = Task._meta.db_table
+    with connection.cursor() as cursor:
+        for start in range(0, len(task_ids), 500):
+            batch = task_ids[start:start + 500]
+            placeholders = ", ".join(["%s"] * len(batch))
+            cursor.execute(
+                f"""
+                WITH RECURSIVE up(start, id) AS (
+                    SELECT id, parent_id FROM {table} WHERE id IN ({placeholders})
+                    UNION
+                    SELECT up.start, t.parent_id FROM up JOIN {table} t ON t.id = up.id
+                    WHERE t.parent_id IS NOT NULL
+                )
+                SELECT start FROM up WHERE id = start LIMIT 1
+                """,
+                batch,
+            )
+            row = cursor.fetchone()
+            if row is not None:
+                return row[0]
+    return None
+
+
+def import_tasks(
+    rows: Iterable[dict[str, Any]],
+    batch_size: int,
+    user: AbstractBaseUser | None = None,
+    on_batch: Callable[[ImportResult], None] | None = None,
+) -> ImportResult:
+    """
+    行を batch_size 件ずつ bulk_create で登録する。
+
+    Args:
+        rows (Iterable[dict]): read_rows() の結果など。TRANSFER_FIELDS の列を持つ dict
+        batch_size (int): 1回の bulk_create（1トランザクション）で登録する件数
+        user: 指定した場合は、ファイルの user 列に関係なくすべてこのユーザーの所有にする
+        on_batch (Callable | None): バッチを確定するたびに途中経過を受け取る関数
+
+    Raises:
+        TaskImportError: 行の内容が不正な場合（それまでのバッチは登録済み）
+    """
+    result = ImportResult()
+    resolve_user = _UserResolver(user)
+    new_ids: dict[str, int] = {}                # ファイル内の id → 新しい id
+    waiting: dict[str, list[int]] = {}          # まだ出てきていない親の id → 子の新しい id
+    records = enumerate(rows, start=1)
+
+    while batch := list(islice(records, batch_size)):
+        with transaction.atomic():
+            tasks = []
+            for record, row in batch:
+                task = _build_task(row, record, resolve_user(row.get("user"), record))
+                parent = _ref(row.get("parent"))
+                task.parent_id = new_ids.get(parent) if parent is not None else None
+                tasks.append((task, _ref(row.get("id")), parent, record))
+            Task.objects.bulk_create([task for task, *_ in tasks])
+
+            dated = [task for task, *_ in tasks if hasattr(task, "_imported_created_at")]
+            for task in dated:
+                task.created_at = task._imported_created_at
+            if dated:
+                Task.objects.bulk_update(dated, ["created_at"])
+
+            for task, source_id, parent, record in tasks:
+                if parent is not None and task.parent_id is None:
+                    waiting.setdefault(parent, []).append(task.pk)
+                if source_id is not None:
+                    if source_id in new_ids:
+                        raise TaskImportError(record, f"id が重複しています: {source_id}")
+                    new_ids[source_id] = task.pk
+
+            # このバッチで登録された親を待っていた子（前方参照）を付け替える
+            moved = [
+                Task(pk=child_id, parent_id=new_ids[parent])
+                for parent in [parent for parent in waiting if parent in new_ids]
+                for child_id in waiting.pop(parent)
+            ]
+            delta = stats.StatsDelta()
+            for task, *_ in tasks:
+                delta.add(task.user_id, stats.task_stats_row(task))
+            if moved:
+                Task.objects.bulk_update(moved, ["parent_id"])
+                if _find_cycle([task.pk for task in moved]) is not None:
+                    raise TaskImportError(None, "parent の参照が循環しています。")
+                # 親なしで登録していた未完了のタスクが、未完了の子タスクになる
+                opened = Task.objects.filter(pk__in=[task.pk for task in moved], is_completed=False)
+                for user_id in opened.values_list("user_id", flat=True):
+                    delta.add(user_id, (0, 0, 0, 1))
+            delta.apply()
+
+            # 付け替えた子が前のバッチで持っていた子孫も、祖先が変わるため作り直す
+            affected = {task.pk for task, *_ in tasks}
+            if moved:
+                affected.update(
+                    TaskClosure.objects.filter(ancestor_id__in=[task.pk for task in moved])
+                    .values_list("descendant_id", flat=True)
+                )
+            rebuild_task_closure(affected)
+            refresh_subtask_counters(
+                {task.parent_id for task, *_ in tasks if task.parent_id is not None}
+                | {task.parent_id for task in moved}
+            )
+
+        result.created += len(tasks)
+        result.batches += 1
+        if on_batch is not None:
+            on_batch(result)
+
+    result.unresolved = waiting
+    if result.created:
+        invalidate_all()
+    return result
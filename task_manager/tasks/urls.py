@@ -13,4 +13,6 @@ urlpatterns = [
     path('<int:pk>/update/', views.task_update, name='task_update'),
     path('<int:pk>/delete/', views.task_delete, name='task_delete'),
     path('<int:pk>/complete/', views.task_complete, name='task_complete'),
+    path('<int:pk>/complete-subtree/', views.task_complete_subtree, name='task_complete_subtree'),
+    path('<int:pk>/archive-subtree/', views.task_archive_subtree, name='task_archive_subtree'),
 ]
\ No newline at end of file
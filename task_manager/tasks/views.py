@@ -5,17 +5,28 @@ from django.http import HttpRequest, HttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.core.exceptions import ValidationError
 from django.contrib import messages 
-from django.db.models import Q
+from django.db.models import Q, QuerySet
 from .models import Task
 from .forms import TaskForm, TaskSearchForm
-from .services import get_filtered_tasks, complete_task 
-
-
-def task_list(request: HttpRequest) -> HttpResponse:
+from .services import (
+    archive_subtree,
+    complete_subtree,
+    complete_task,
+    delete_subtree,
+    get_task_sources,
+    get_tree,
+)
+from .pagination import InvalidCursor, first_page, paginate_merged
+from .cache import cache_task_list, request_user_scope
+from .fragments import render_fragments
+from .conditional import conditional_task_view, task_list_validator, task_tree_validator
+
+
+def _task_list_queryset(request: HttpRequest) -> tuple[TaskSearchForm, str, list[QuerySet]]:
     """
-    タスク一覧を表示する。
-    TaskSearchFormで検索条件をバリデートし、get_filtered_tasksで
-    条件に合うタスクを取得する。
+    TaskSearchFormで検索条件をバリデートし、一覧に表示するタスク（ページ分割前）を返す。
+    タスクは取得元（Task / アーカイブ済みなら保管テーブル）ごとのクエリセットのリスト。
+    task_list と、その条件付き GET の検証子で共通に使う。
     """
 
     # フォームにGETパラメータをバインド
@@ -26,33 +37,96 @@ def task_list(request: HttpRequest) -> HttpResponse:
         is_completed = form.cleaned_data.get('is_completed')
         is_archived = form.cleaned_data.get('is_archived')
         query = form.cleaned_data.get('q', "")
+        ranked = form.is_ranked()
     else:
         # 無効な場合も安全にデフォルト値を使用
         is_completed = None
         is_archived = None
         query = ""
+        ranked = False
 
     # 条件に合致するタスクを取得し、親がないタスクのみに絞る
-    tasks = get_filtered_tasks(
+    sources = get_task_sources(
         is_completed=is_completed,
         is_archived=is_archived,
-        q=query
-    ).filter(parent__isnull=True, user=request.user) # ユーザーで絞る
+        q=query,
+        ranked=ranked,
+    )
+    tasks = [
+        source.filter(parent__isnull=True, user=request.user) # ユーザーで絞る
+        for source in sources
+    ]
+    return form, query, tasks
+
+
+@cache_task_list("task_list", request_user_scope)
+@conditional_task_view(task_list_validator(lambda request: _task_list_queryset(request)[2]))
+def task_list(request: HttpRequest) -> HttpResponse:
+    """
+    タスク一覧を表示する。
+    TaskSearchFormで検索条件をバリデートし、get_task_sourcesで
+    条件に合うタスクを取得する。
+
+    一覧は (created_at, id) のキーセットでページ分割する。
+    GETパラメータ cursor / page_size でページを指定し、
+    不正なカーソルが渡された場合は先頭ページを表示する。
+    sort=relevance（適合度順）の場合はキーセットで分割できないため、先頭 page_size 件だけを表示する。
+    アーカイブ済み（is_archived=true）を指定した場合は、保管テーブルのタスクも併せて表示する。
+
+    レスポンスはユーザー・検索条件ごとにキャッシュし、タスクの変更で無効にする（tasks.cache）。
+    各行の HTML は pk・updated_at ごとにキャッシュし、変わった行だけをレンダリングする（tasks.fragments）。
+    ETag / Last-Modified が一致すればレンダリングせずに 304 を返す（tasks.conditional）。
+    """
+    form, query, tasks = _task_list_queryset(request)
+
+    # キーセットページネーション
+    try:
+        page_size = int(request.GET.get("page_size") or 0) or None
+    except ValueError:
+        page_size = None
+    if form.is_valid() and form.is_ranked():
+        page = first_page(tasks, page_size)
+    else:
+        try:
+            page = paginate_merged(tasks, request.GET.get("cursor"), page_size)
+        except InvalidCursor:
+            page = paginate_merged(tasks, None, page_size)
 
     return render(request, "tasks/task_list.html", {
-        "tasks": tasks,
+        "tasks": page.items,
+        "rows": render_fragments("tasks/task_list_row.html", page.items),
+        "page": page,
+        "next_query": _page_query(request, page.next_cursor),
+        "prev_query": _page_query(request, page.prev_cursor),
         "form": form,
         "query": query,
         "is_completed": form.data.get("is_completed"),
         "is_archived": form.data.get("is_archived"),
+        "sort": form.data.get("sort"),
     })
 
 
+def _page_query(request: HttpRequest, cursor: str | None) -> str | None:
+    """
+    現在の検索条件を保ったまま cursor だけを差し替えたクエリ文字列を返す。
+    cursor が None の場合（前後ページなし）は None。
+    """
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params["cursor"] = cursor
+    return params.urlencode()
+
+
+@conditional_task_view(task_tree_validator)
 def task_detail(request: HttpRequest, pk: int) -> HttpResponse:
     """
     タスク詳細を表示する。
 
     指定された主キーに対応するタスクを取得し、詳細ページをレンダリングします。
+    子タスクは孫以下も含めてクロージャテーブルから一括取得し、入れ子で表示します。
+    子タスク各行の HTML は pk・updated_at・深さごとにキャッシュします（tasks.fragments）。
+    タスク・子孫・親の更新がなければ、レンダリングせずに 304 を返します（tasks.conditional）。
 
     Args:
         request (HttpRequest): リクエストオブジェクト
@@ -62,8 +136,11 @@ def task_detail(request: HttpRequest, pk: int) -> HttpResponse:
         HttpResponse: タスク詳細ページのレスポンス
     """
     task = get_object_or_404(Task, pk=pk)
-    subtasks = task.subtasks.all().order_by('-created_at')  # 子タスク一覧（作成日降順）
-    has_incomplete_subtasks = task.subtasks.filter(is_completed=False).exists()
+    # 子孫タスクをまとめて1クエリで取得（階層ごとのクエリは発生しない）
+    tree = get_tree(task)
+    subtree = list(tree.walk())[1:]  # 行きがけ順の子孫ノード（自分自身は除く）
+    subtasks = [node.task for node in tree.children]  # 直下の子タスク一覧（作成日降順）
+    has_incomplete_subtasks = task.incomplete_subtask_count > 0  # 非正規化カラムを読むだけ
 
     return render(
         request,
@@ -71,6 +148,14 @@ def task_detail(request: HttpRequest, pk: int) -> HttpResponse:
         {
             'task': task,
             'subtasks': subtasks,
+            'subtree': subtree,
+            'subtask_items': render_fragments(
+                'tasks/task_detail_subtask.html',
+                subtree,
+                name='node',
+                get_object=lambda node: node.task,
+                extra_key=lambda node: (node.depth,),
+            ),
             'has_incomplete_subtasks': has_incomplete_subtasks,  # ← 渡す
         }
     )
@@ -136,11 +221,12 @@ def task_update(request: HttpRequest, pk: int) -> HttpResponse:
     return render(request, 'tasks/task_form.html', {'form': form})
 
 
+@login_required
 def task_delete(request: HttpRequest, pk: int) -> HttpResponse:
     """
     タスクを削除する。
 
-    指定された主キーに対応するタスクを取得し、POSTリクエストで削除してタスク一覧へリダイレクト。
+    指定された主キーに対応するタスクを子孫ごと削除し（delete_subtree）、タスク一覧へリダイレクト。
     GETリクエストの場合は削除確認ページを表示します。
 
     Args:
@@ -150,9 +236,9 @@ def task_delete(request: HttpRequest, pk: int) -> HttpResponse:
     Returns:
         HttpResponse: 削除確認ページまたはリダイレクト先のレスポンス
     """
-    task = get_object_or_404(Task, pk=pk)
+    task = get_object_or_404(Task, pk=pk, user=request.user)
     if request.method == 'POST':
-        task.delete()
+        delete_subtree(task)
         return redirect('tasks:task_list')
     return render(request, 'tasks/task_confirm_delete.html', {'task': task})
 
@@ -173,4 +259,32 @@ def task_complete(request: HttpRequest, pk: int) -> HttpResponse:
         return redirect("tasks:task_detail", pk=pk)
 
     # POST 以外は詳細画面へ
-    return redirect("tasks:task_detail", pk=pk)
\ No newline at end of file
+    return redirect("tasks:task_detail", pk=pk)
+
+
+@login_required
+def task_complete_subtree(request: HttpRequest, pk: int) -> HttpResponse:
+    """
+    タスクと子孫をまとめて完了状態に変更する（未完了の子タスクがあっても完了にする）。
+    """
+    task = get_object_or_404(Task, pk=pk, user=request.user)
+
+    if request.method == "POST":
+        count = complete_subtree(task)
+        messages.success(request, f"{count} 件のタスクを完了にしました。")
+
+    return redirect("tasks:task_detail", pk=pk)
+
+
+@login_required
+def task_archive_subtree(request: HttpRequest, pk: int) -> HttpResponse:
+    """
+    タスクと子孫をまとめてアーカイブする。
+    """
+    task = get_object_or_404(Task, pk=pk, user=request.user)
+
+    if request.method == "POST":
+        count = archive_subtree(task)
+        messages.success(request, f"{count} 件のタスクをアーカイブしました。")
+
+    return redirect("tasks:task_detail", pk=pk)